@@ -12,6 +12,7 @@ a = Analysis(
         ('name_import.json', '.'),
         ('deformer_import.json', '.'),
         ('exps.json', '.'),
+        ('mtn.json', '.'),
         ('icon.png', '.'),
     ],
     hiddenimports=[],
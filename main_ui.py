@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import multiprocessing
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QCloseEvent
@@ -18,6 +19,7 @@ from pages.import_table_page import ImportTablePage
 from pages.jsonl_editor_page import JsonlEditorPage
 from pages.jsonl_generator_page import JsonlGeneratorPage
 from pages.part_editor_page import PartEditorPage
+from sections.py_live2d_editor import shutdown_introspector
 from version_info import check_for_update_gui
 
 CONFIG_PATH = "config.json"
@@ -290,10 +292,19 @@ class ToolBox(QWidget):
         if hasattr(self.page_opacity_preset, '_close_preview_window'):
             self.page_opacity_preset._close_preview_window()
         
+        # 停止透明度预设页面的后台扫描
+        if hasattr(self.page_opacity_preset, '_cancel_scan'):
+            self.page_opacity_preset._cancel_scan()
+        if hasattr(self.page_opacity_preset, '_cancel_apply'):
+            self.page_opacity_preset._cancel_apply(wait=True)
+        
         # 关闭略爱区编辑器的预览窗口
         if hasattr(self.page_part_editor, '_close_preview_window'):
             self.page_part_editor._close_preview_window()
         
+        # 释放常驻解析线程的 GL 上下文
+        shutdown_introspector(timeout=2.0)
+        
         # 保存当前选择的页面
         current_index = self.stack.currentIndex()
         self.save_selected_page(current_index)
@@ -305,6 +316,8 @@ class ToolBox(QWidget):
 
 
 if __name__ == '__main__':
+    # 打包后批量解析用 spawn 启动工作进程，没有这一行每个工作进程都会重新打开整个界面
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = ToolBox()
     window.show()
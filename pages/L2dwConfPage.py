@@ -7,6 +7,27 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton,
     QFileDialog, QMessageBox
 )
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class ConfConvertThread(QThread):
+    """后台批量 conf 转 JSONL，避免大量 conf/model.json 时卡住界面"""
+    finished_convert = pyqtSignal(list, str)  # (逐文件结果, 出错信息；成功时为空)
+
+    def __init__(self, conf_dir: str, figure_dir: str, output_dir: str, parent=None):
+        super().__init__(parent)
+        self.conf_dir = conf_dir
+        self.figure_dir = figure_dir
+        self.output_dir = output_dir
+
+    def run(self):
+        try:
+            from sections.gen_jsonl import batch_conf_to_jsonl
+            results = batch_conf_to_jsonl(self.conf_dir, self.figure_dir, self.output_dir)
+        except Exception as e:
+            self.finished_convert.emit([], str(e))
+            return
+        self.finished_convert.emit(results, "")
 
 
 class L2dwConfPage(QWidget):
@@ -38,6 +59,7 @@ class L2dwConfPage(QWidget):
         self.layout().addWidget(self.select_output_btn)
 
         self.conf_path = ""
+        self.convert_thread = None  # 后台批量转换线程
 
         self.select_conf_btn = QPushButton("📄 选择 conf 文件")
         self.select_conf_btn.clicked.connect(self.select_conf_file)
@@ -47,6 +69,9 @@ class L2dwConfPage(QWidget):
         self.convert_conf_btn.clicked.connect(self.convert_conf_to_jsonl)
         self.layout().addWidget(self.convert_conf_btn)
 
+        self.batch_convert_btn = QPushButton("📚 批量 conf 转 JSONL（选择 conf 目录）")
+        self.batch_convert_btn.clicked.connect(self.batch_convert_conf_to_jsonl)
+        self.layout().addWidget(self.batch_convert_btn)
 
     def select_figure_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "选择 figure 文件夹")
@@ -180,3 +205,37 @@ class L2dwConfPage(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "出错了喵", f"转换失败：\n{str(e)}")
 
+    def batch_convert_conf_to_jsonl(self):
+        if not self.figure_path:
+            QMessageBox.warning(self, "未完成选择", "请先选择 figure 文件夹喵～")
+            return
+        if self.convert_thread is not None and self.convert_thread.isRunning():
+            return
+        default_dir = os.path.join(os.path.abspath("."), "output_conf")
+        conf_dir = QFileDialog.getExistingDirectory(self, "选择 conf 所在目录", default_dir)
+        if not conf_dir:
+            return
+        # 指定了输出目录就用它，否则输出到 conf 目录下的 converted_jsonl
+        output_dir = self.output_dir or os.path.join(conf_dir, "converted_jsonl")
+
+        self.convert_thread = ConfConvertThread(conf_dir, self.figure_path, output_dir, parent=self)
+        self.convert_thread.finished_convert.connect(self._on_batch_convert_finished)
+        self.batch_convert_btn.setEnabled(False)
+        self.batch_convert_btn.setText("⏳ 正在批量转换…")
+        self.convert_thread.start()
+
+    def _on_batch_convert_finished(self, results: list, error: str):
+        thread = self.convert_thread
+        self.convert_thread = None
+        self.batch_convert_btn.setEnabled(True)
+        self.batch_convert_btn.setText("📚 批量 conf 转 JSONL（选择 conf 目录）")
+        if error:
+            QMessageBox.critical(self, "出错了喵", f"批量转换失败：\n{error}")
+            return
+        if not results:
+            QMessageBox.information(self, "没有找到喵", "该目录下没有 .conf 文件")
+            return
+        from pages.apply_report_dialog import ApplyReportDialog
+        ok = sum(r["status"] == "exported" for r in results)
+        summary = f"已转换 {ok}/{len(results)} 个 conf，输出到：{thread.output_dir}"
+        ApplyReportDialog(results, thread.conf_dir, summary, self).exec_()
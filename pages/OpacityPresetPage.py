@@ -1,24 +1,28 @@
 import os
 import json
-import shutil
-import pygame
-import live2d.v2 as live2d
-import errno
 import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog,
-    QMessageBox, QListWidget, QListWidgetItem, QHBoxLayout, QTableWidget,
-    QHeaderView, QTableWidgetItem, QCheckBox, QLineEdit, QComboBox,
-    QGroupBox, QFormLayout, QRadioButton, QDialog
+    QMessageBox, QListWidget, QListWidgetItem, QHBoxLayout, QTableView,
+    QHeaderView, QAbstractItemView, QCheckBox, QLineEdit, QComboBox,
+    QGroupBox, QFormLayout, QRadioButton, QDialog, QProgressBar
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QThread, pyqtSignal
 
+from sections.export_engine import MODE_LABELS, ExportEngine
 from sections.gen_jsonl import is_valid_live2d_json
+from sections.preset_index import PresetIndex
 from sections.py_live2d_editor import get_all_parts
 from pages.single_model_preview_window import SingleModelPreviewWindow
 from pages.opacity_detail_editor_dialog import OpacityDetailEditorDialog
-from utils.common import get_resource_path
+from pages.apply_report_dialog import ApplyReportDialog
+from pages.opacity_preset_table import (
+    OpacityPresetTableModel, PresetComboDelegate, RowButtonsDelegate,
+    COL_CHECK, COL_PATH, COL_DETECTED, COL_PRESET, COL_ACTIONS
+)
+from utils.common import atomic_write_json, get_resource_path
 
 PARTS_JSON_PATH = get_resource_path(os.path.join("resource", "parts.json"))
 
@@ -27,30 +31,6 @@ PARTS_JSON_PATH = get_resource_path(os.path.join("resource", "parts.json"))
 def _ensure_dir(path: str):
     os.makedirs(path, exist_ok=True)
 
-def _ensure_parent_dir(path: str):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-
-def _same_volume(src: str, dst: str) -> bool:
-    """Windows: 比较盘符；POSIX: 比较 st_dev。"""
-    try:
-        src_drive = os.path.splitdrive(os.path.abspath(src))[0].lower()
-        dst_drive = os.path.splitdrive(os.path.abspath(dst))[0].lower()
-        if src_drive or dst_drive:
-            return src_drive == dst_drive
-    except Exception:
-        pass
-    try:
-        return os.stat(os.path.abspath(src)).st_dev == os.stat(os.path.abspath(os.path.dirname(dst))).st_dev
-    except Exception:
-        return False
-
-def _fsync_file(path: str):
-    try:
-        with open(path, 'rb') as f:
-            os.fsync(f.fileno())
-    except Exception:
-        pass
-
 def _display_relpath(abs_path: str, base: str) -> str:
     """用于 UI 显示的相对路径；跨盘失败则退化为文件名"""
     try:
@@ -59,65 +39,220 @@ def _display_relpath(abs_path: str, base: str) -> str:
     except ValueError:
         return os.path.basename(abs_path)
 
-def _fsync_dir(dir_path: str):
+
+def _inspect_preset(json_path: str, preset_index: PresetIndex):
+    """返回 (检测到的预设, 相近预设提示)；只有「自定义」时才会给出提示"""
     try:
-        if os.name == "nt":
-            return
-        fd = os.open(dir_path, os.O_DIRECTORY)
-        try:
-            os.fsync(fd)
-        finally:
-            os.close(fd)
+        with open(json_path, encoding="utf-8") as f:
+            model = json.load(f)
+        if "init_opacities" not in model:
+            return "无", ""
+        used_parts = [entry["id"] for entry in model["init_opacities"] if entry["value"] == 1.0]
+        matched = preset_index.detect(used_parts)
+        if matched is not None:
+            return matched, ""
+        closest, score = preset_index.closest(used_parts)
+        return "自定义", (f"{closest} {score:.0%}" if closest else "")
     except Exception:
-        pass
-
-def _dedup_target_path(dst_path: str) -> str:
-    """若目标重名，自动追加 _1/_2/..."""
-    base = os.path.basename(dst_path)
-    name, ext = os.path.splitext(base)
-    folder = os.path.dirname(dst_path)
-    final_dst = dst_path
-    i = 1
-    while os.path.exists(final_dst):
-        final_dst = os.path.join(folder, f"{name}_{i}{ext}")
-        i += 1
-    return final_dst
-
-def safe_move(src: str, dst: str) -> str:
+        return "未知", ""
+
+
+def _detect_preset(json_path: str, preset_index: PresetIndex) -> str:
+    return _inspect_preset(json_path, preset_index)[0]
+
+
+# ========= 后台扫描 =========
+class ModelScanThread(QThread):
     """
-    可靠移动：
-      - 先尝试 shutil.move
-      - 跨盘或失败则 copy2 + fsync + unlink
-      - 返回最终目标（含重名去重）
+    在后台线程中枚举 model.json 并检测预设：
+      - 先列出候选 .json（只看文件名，很快），再逐个校验 + 检测
+      - 每找到一个模型就发出 model_found，表格边扫边出
+      - requestInterruption() 可随时取消
     """
-    _ensure_parent_dir(dst)
-    final_dst = _dedup_target_path(dst)
+    model_found = pyqtSignal(str, str, str)  # (绝对路径, 检测到的预设, 相近预设提示)
+    progress = pyqtSignal(int, int)      # (已处理, 候选总数)
+    finished_scan = pyqtSignal(int, bool)  # (找到的模型数, 是否被取消)
 
-    try:
-        shutil.move(src, final_dst)
-        return final_dst
-    except Exception as e:
-        is_exdev = getattr(e, 'errno', None) == errno.EXDEV
-        if is_exdev or not _same_volume(src, final_dst):
+    def __init__(self, root_dir: str, preset_index: PresetIndex, max_depth: int = 2, parent=None):
+        super().__init__(parent)
+        self.root_dir = root_dir
+        self.preset_index = preset_index
+        self.max_depth = max_depth
+
+    def _list_candidates(self):
+        candidates = []
+
+        def _collect(path, depth=0):
+            if depth > self.max_depth or self.isInterruptionRequested():
+                return
             try:
-                shutil.copy2(src, final_dst)
-                _fsync_file(final_dst)
-                _fsync_dir(os.path.dirname(final_dst))
-                os.unlink(src)
-                _fsync_dir(os.path.dirname(src))
-                return final_dst
-            except Exception as e2:
-                raise RuntimeError(f"跨盘复制删除失败：{src} -> {final_dst}, 错误: {e2}") from e2
-        else:
+                for name in sorted(os.listdir(path)):
+                    full = os.path.join(path, name)
+                    if os.path.isdir(full):
+                        _collect(full, depth + 1)
+                    elif name.endswith(".json"):
+                        candidates.append(full)
+            except Exception as e:
+                print(f"❌ 错误: {e}")
+
+        _collect(self.root_dir)
+        return candidates
+
+    def run(self):
+        candidates = self._list_candidates()
+        total = len(candidates)
+        found = 0
+        for i, full in enumerate(candidates, 1):
+            if self.isInterruptionRequested():
+                break
+            if is_valid_live2d_json(full):
+                detected, suggestion = _inspect_preset(full, self.preset_index)
+                self.model_found.emit(full, detected or "无", suggestion)
+                found += 1
+            self.progress.emit(i, total)
+        self.finished_scan.emit(found, self.isInterruptionRequested())
+
+
+# ========= 批量套用预设 / 集中动作表情 =========
+def _job_result(path: str, action: str, status: str, reason: str = "") -> dict:
+    return {"file": path, "action": action, "status": status, "reason": reason}
+
+
+def _apply_preset_to_json(json_path: str, choice: str, target_parts: set) -> dict:
+    all_parts = get_all_parts(json_path)
+    init_opacities = [
+        {"id": pid, "value": 1.0 if pid in target_parts else 0.0}
+        for pid in all_parts
+    ]
+    with open(json_path, "r", encoding="utf-8") as f:
+        model_data = json.load(f)
+    model_data.pop("motions", None)
+    model_data.pop("expressions", None)
+    model_data["init_opacities"] = init_opacities
+    atomic_write_json(json_path, model_data)
+    return _job_result(json_path, "写入预设", "updated", choice)
+
+
+def _list_export_sources(root_dir: str, traverse_all: bool, chosen_subdir: str):
+    """返回 [(源文件, 目标 expnmtn 子目录)]"""
+    sources = []
+    if traverse_all:
+        walk_base = root_dir
+    else:
+        walk_base = os.path.join(root_dir, chosen_subdir)
+        if not os.path.isdir(walk_base):
+            print(f"⚠️ 来源子目录不存在：{os.path.normpath(walk_base)}")
+            return sources
+    export_root = os.path.join(root_dir, "expnmtn")
+    for dirpath, dirnames, filenames in os.walk(walk_base):
+        # 已集中的结果不再重复集中
+        if os.path.normpath(dirpath) == os.path.normpath(root_dir) and "expnmtn" in dirnames:
+            dirnames.remove("expnmtn")
+        for file in filenames:
+            low = file.lower()
+            if not (low.endswith(".mtn") or low.endswith(".exp.json")):
+                continue
+            if traverse_all:
+                rel = os.path.relpath(dirpath, root_dir)
+                top = rel.split(os.sep)[0] if rel != "." else "_root"
+            else:
+                top = chosen_subdir
+            sources.append((os.path.join(dirpath, file), os.path.join(export_root, top)))
+    return sources
+
+
+class ApplyPresetThread(QThread):
+    """
+    后台并行执行：各行写入 init_opacities（原子写入），并把 .mtn/.exp.json 集中到 expnmtn。
+    requestInterruption() 后不再开始新任务，未开始的记为「已取消」。
+    """
+    progress = pyqtSignal(int, int)          # (已完成, 总数)
+    finished_apply = pyqtSignal(list, bool)  # (逐文件结果, 是否被取消)
+
+    def __init__(self, preset_jobs, root_dir, traverse_all, chosen_subdir, export_mode="copy",
+                 max_workers=None, parent=None):
+        super().__init__(parent)
+        self.preset_jobs = list(preset_jobs)  # [(json_path, 预设名, 目标部件集合)]
+        self.root_dir = root_dir
+        self.traverse_all = traverse_all
+        self.chosen_subdir = chosen_subdir
+        self.export_mode = export_mode
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.pre_results = []
+
+    def run(self):
+        results = []
+        cancelled = False
+        try:
+            cancelled = self._run_jobs(results)
+        except Exception as e:
+            print(f"❌ 套用失败：{e}")
+            results.append(_job_result(self.root_dir, "套用", "failed", str(e)))
+        finally:
+            # 无论成败都要通知页面，否则界面会一直停在「套用中」
+            self.finished_apply.emit(results, cancelled)
+
+    def _run_jobs(self, results: list) -> bool:
+        """执行全部任务，结果追加到 results；返回是否被取消"""
+        try:
+            export_sources = _list_export_sources(self.root_dir, self.traverse_all, self.chosen_subdir)
+        except Exception as e:
+            print(f"❌ 遍历错误：{e}")
+            results.append(_job_result(self.root_dir, "遍历", "failed", str(e)))
+            export_sources = []
+
+        # 目标目录创建失败时，该目录的来源文件不再导出
+        failed_dirs = set()
+        for export_dir in sorted({d for _, d in export_sources}):
             try:
-                shutil.copy2(src, final_dst)
-                _fsync_file(final_dst)
-                _fsync_dir(os.path.dirname(final_dst))
-                os.unlink(src)
-                _fsync_dir(os.path.dirname(src))
-                return final_dst
-            except Exception as e3:
-                raise RuntimeError(f"复制删除兜底失败：{src} -> {final_dst}, 错误: {e3}") from e3
+                _ensure_dir(export_dir)
+            except OSError as e:
+                print(f"❌ 创建目录失败：{export_dir} 错误：{e}")
+                results.append(_job_result(export_dir, "创建目录", "failed", str(e)))
+                failed_dirs.add(export_dir)
+        if failed_dirs:
+            export_sources = [(src, d) for src, d in export_sources if d not in failed_dirs]
+
+        engine = ExportEngine(self.export_mode)
+        export_action = MODE_LABELS[self.export_mode]
+        total = len(self.preset_jobs) + len(export_sources)
+        done = 0
+        cancelled = False
+        self.progress.emit(0, total)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {}
+                for json_path, choice, target_parts in self.preset_jobs:
+                    fut = pool.submit(_apply_preset_to_json, json_path, choice, target_parts)
+                    futures[fut] = (json_path, "写入预设")
+                for src, export_dir in export_sources:
+                    fut = pool.submit(engine.export, src, export_dir)
+                    futures[fut] = (src, export_action)
+
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    if not cancelled and self.isInterruptionRequested():
+                        cancelled = True
+                        for fut in pending:
+                            fut.cancel()
+                    for fut in finished:
+                        path, action = futures[fut]
+                        if fut.cancelled():
+                            results.append(_job_result(path, action, "skipped", "已取消"))
+                        else:
+                            try:
+                                results.append(fut.result())
+                            except Exception as e:
+                                print(f"❌ 处理失败: {path} 错误: {e}")
+                                results.append(_job_result(path, action, "failed", str(e)))
+                        done += 1
+                    self.progress.emit(done, total)
+        finally:
+            # 导出过程中不逐个 fsync，最后每个目录统一落盘一次（中途出错也要把已写入的落盘）
+            engine.finish()
+        return cancelled
 
 
 # ========= 主页面 =========
@@ -152,6 +287,15 @@ class OpacityPresetPage(QWidget):
         self.copy_mode_checkbox.setChecked(True)
         top_btn_layout.addWidget(self.copy_mode_checkbox)
 
+        # 复制方式：同一文件系统下可用硬链接 / 写时复制，省空间也更快
+        self.copy_method_combo = QComboBox()
+        for mode in ("copy", "hardlink", "reflink"):
+            self.copy_method_combo.addItem(MODE_LABELS[mode], mode)
+        self.copy_method_combo.setToolTip("硬链接：与源文件共用同一份数据，修改任一处另一处也会变\n"
+                                          "写时复制：需要 Btrfs/XFS 等支持 reflink 的文件系统，不支持时自动改为普通复制")
+        self.copy_mode_checkbox.toggled.connect(self.copy_method_combo.setEnabled)
+        top_btn_layout.addWidget(self.copy_method_combo)
+
         # 批量设为（作用于“勾选的行”）
         self.bulk_preset_combo = QComboBox()
         self.bulk_apply_btn = QPushButton("批量设为")
@@ -166,18 +310,54 @@ class OpacityPresetPage(QWidget):
 
         layout.addLayout(top_btn_layout)
 
+        # 扫描进度（后台扫描时显示）
+        scan_layout = QHBoxLayout()
+        self.scan_progress = QProgressBar()
+        self.scan_progress.setFormat("正在扫描模型… %v / %m")
+        self.cancel_scan_btn = QPushButton("取消扫描")
+        self.cancel_scan_btn.clicked.connect(self._cancel_scan)
+        scan_layout.addWidget(self.scan_progress)
+        scan_layout.addWidget(self.cancel_scan_btn)
+        self.scan_progress.hide()
+        self.cancel_scan_btn.hide()
+        layout.addLayout(scan_layout)
+
+        # 套用进度（后台套用预设时显示）
+        apply_layout = QHBoxLayout()
+        self.apply_progress = QProgressBar()
+        self.apply_progress.setFormat("正在套用预设… %v / %m")
+        self.cancel_apply_btn = QPushButton("取消套用")
+        self.cancel_apply_btn.clicked.connect(self._cancel_apply)
+        apply_layout.addWidget(self.apply_progress)
+        apply_layout.addWidget(self.cancel_apply_btn)
+        self.apply_progress.hide()
+        self.cancel_apply_btn.hide()
+        layout.addLayout(apply_layout)
+
         # 预设说明
         layout.addWidget(QLabel("提示：在下表中逐行选择预设；“保持不变”将跳过该行，“清空(全0)”会把所有部件设为0。"))
 
         # ✅ 表格：按行选择预设
-        self.json_table = QTableWidget()
-        self.json_table.setColumnCount(5)
-        self.json_table.setHorizontalHeaderLabels(["✔", "model.json 路径", "检测到的预设", "选择预设", "操作"])
-        self.json_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.json_table.setColumnWidth(0, 44)
-        self.json_table.setColumnWidth(2, 120)
-        self.json_table.setColumnWidth(3, 160)
-        self.json_table.setColumnWidth(4, 130)  # 增加操作列宽度，确保两个按钮能显示
+        #    模型 + 委托绘制，不再给每行创建控件
+        self.table_model = OpacityPresetTableModel(self)
+        self.json_table = QTableView()
+        self.json_table.setModel(self.table_model)
+        self.json_table.setEditTriggers(QAbstractItemView.AllEditTriggers)
+        self.json_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.json_table.verticalHeader().setDefaultSectionSize(32)
+
+        self.preset_delegate = PresetComboDelegate(self._preset_options, self.json_table)
+        self.json_table.setItemDelegateForColumn(COL_PRESET, self.preset_delegate)
+        self.buttons_delegate = RowButtonsDelegate(self.json_table)
+        self.buttons_delegate.preview_clicked.connect(self.preview_row_preset)
+        self.buttons_delegate.detail_clicked.connect(self.open_detail_editor)
+        self.json_table.setItemDelegateForColumn(COL_ACTIONS, self.buttons_delegate)
+
+        self.json_table.horizontalHeader().setSectionResizeMode(COL_PATH, QHeaderView.Stretch)
+        self.json_table.setColumnWidth(COL_CHECK, 44)
+        self.json_table.setColumnWidth(COL_DETECTED, 120)
+        self.json_table.setColumnWidth(COL_PRESET, 160)
+        self.json_table.setColumnWidth(COL_ACTIONS, 130)  # 增加操作列宽度，确保两个按钮能显示
         layout.addWidget(self.json_table)
 
         # === 新增：从单一源 JSON 复制 motions/expressions 到勾选目标 ===
@@ -216,12 +396,15 @@ class OpacityPresetPage(QWidget):
         layout.addWidget(copy_group)
 
         self.parts_data = {}
+        self.preset_index = PresetIndex()
         self.root_dir = ""
         self.preset_names = []  # parts.json 的 key 列表（加载后填充）
         # 预览窗口相关
         self.preview_thread = None  # 预览窗口线程引用
         self.preview_window = None  # 预览窗口实例引用（用于关闭）
         self.main_window = None  # 主窗口引用
+        self.scan_thread = None  # 后台扫描线程
+        self.apply_thread = None  # 后台套用线程
         self.load_parts_json()
 
     def load_parts_json(self):
@@ -230,6 +413,7 @@ class OpacityPresetPage(QWidget):
             return
         with open(PARTS_JSON_PATH, encoding="utf-8") as f:
             self.parts_data = json.load(f)
+        self.preset_index = PresetIndex(self.parts_data)
 
         # 预设下拉的可选项（顺序可按需调整）
         self.preset_names = list(self.parts_data.keys())
@@ -238,6 +422,9 @@ class OpacityPresetPage(QWidget):
         self.bulk_preset_combo.clear()
         self.bulk_preset_combo.addItems(specials + self.preset_names)
 
+    def _preset_options(self):
+        return ["保持不变", "清空(全0)"] + self.preset_names
+
     def _list_first_level_subdirs(self, base):
         try:
             return sorted(
@@ -253,7 +440,7 @@ class OpacityPresetPage(QWidget):
 
         self.root_dir = folder
         self.label.setText(f"✅ 已选择：{folder}")
-        self.json_table.setRowCount(0)
+        self.table_model.clear()
 
         # 填充来源子目录
         subdirs = self._list_first_level_subdirs(folder)
@@ -263,71 +450,58 @@ class OpacityPresetPage(QWidget):
             self.source_subdir_combo.addItems(subdirs)
             self.source_subdir_combo.setEnabled(not self.all_subdirs_checkbox.isChecked())
 
-        # 枚举 model.json
-        json_files = []
-        def _collect_jsons(path, depth=0):
-            if depth > 2:
-                return
-            try:
-                for name in sorted(os.listdir(path)):
-                    full = os.path.join(path, name)
-                    if os.path.isdir(full):
-                        _collect_jsons(full, depth + 1)
-                    elif name.endswith(".json") and is_valid_live2d_json(full):
-                        json_files.append(full)
-            except Exception as e:
-                print(f"❌ 错误: {e}")
-        _collect_jsons(folder)
-
-        # 填充表格（逐行可选预设）
-        for i, abs_path in enumerate(json_files):
-            self.json_table.insertRow(i)
-
-            # ✔ 是否处理
-            checkbox = QCheckBox()
-            checkbox.setChecked(True)
-            self.json_table.setCellWidget(i, 0, checkbox)
-
-            # 路径列：显示相对路径，但把绝对路径放到 UserRole
-            disp = _display_relpath(abs_path, self.root_dir)
-            path_item = QTableWidgetItem(disp)
-            path_item.setData(Qt.UserRole, abs_path)  # ← 存绝对路径，后面读这个
-            path_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            self.json_table.setItem(i, 1, path_item)
-
-            # 检测到的预设（用绝对路径进行检测）
-            detected = self.detect_preset(abs_path) or "无"
-            detected_item = QTableWidgetItem(detected)
-            detected_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            self.json_table.setItem(i, 2, detected_item)
-
-            # 选择预设
-            preset_combo = QComboBox()
-            options = ["保持不变", "清空(全0)"] + self.preset_names
-            preset_combo.addItems(options)
-            preset_combo.setCurrentText(detected if detected in self.preset_names else "保持不变")
-            self.json_table.setCellWidget(i, 3, preset_combo)
-
-            # 预览和详细编辑按钮
-            btn_layout = QHBoxLayout()
-            btn_layout.setContentsMargins(4, 2, 4, 2)
-            btn_layout.setSpacing(4)
-            
-            preview_btn = QPushButton("查看")
-            preview_btn.setMinimumSize(50, 24)
-            preview_btn.setMaximumSize(60, 28)
-            preview_btn.clicked.connect(lambda _, row=i: self.preview_row_preset(row))
-            btn_layout.addWidget(preview_btn)
-            
-            detail_btn = QPushButton("详细")
-            detail_btn.setMinimumSize(50, 24)
-            detail_btn.setMaximumSize(60, 28)
-            detail_btn.clicked.connect(lambda _, row=i: self.open_detail_editor(row))
-            btn_layout.addWidget(detail_btn)
-            
-            btn_widget = QWidget()
-            btn_widget.setLayout(btn_layout)
-            self.json_table.setCellWidget(i, 4, btn_widget)
+        # 后台枚举 model.json，边扫边填表
+        self._cancel_scan()
+        self.scan_thread = ModelScanThread(folder, self.preset_index, parent=self)
+        self.scan_thread.model_found.connect(self._append_model_row)
+        self.scan_thread.progress.connect(self._on_scan_progress)
+        self.scan_thread.finished_scan.connect(self._on_scan_finished)
+        self.scan_progress.setRange(0, 0)  # 候选数未知前显示忙碌状态
+        self.scan_progress.show()
+        self.cancel_scan_btn.show()
+        self.apply_btn.setEnabled(False)
+        self.scan_thread.start()
+
+    def _cancel_scan(self):
+        """取消正在进行的后台扫描（等待线程退出）"""
+        thread = self.scan_thread
+        if thread is None:
+            return
+        if thread.isRunning():
+            thread.requestInterruption()
+            thread.wait()
+            self.label.setText(f"✅ 已选择：{self.root_dir}（已取消扫描，共 {self.table_model.rowCount()} 个模型）")
+        self.scan_thread = None
+        self.scan_progress.hide()
+        self.cancel_scan_btn.hide()
+        self.apply_btn.setEnabled(True)
+
+    def _on_scan_progress(self, done: int, total: int):
+        if self.sender() is not self.scan_thread:
+            return
+        self.scan_progress.setRange(0, total)
+        self.scan_progress.setValue(done)
+
+    def _on_scan_finished(self, found: int, cancelled: bool):
+        if self.sender() is not self.scan_thread:
+            return
+        self.scan_progress.hide()
+        self.cancel_scan_btn.hide()
+        self.apply_btn.setEnabled(True)
+        status = "已取消扫描" if cancelled else "扫描完成"
+        self.label.setText(f"✅ 已选择：{self.root_dir}（{status}，共 {found} 个模型）")
+
+    def _append_model_row(self, abs_path: str, detected: str, suggestion: str = ""):
+        if self.sender() is not self.scan_thread:
+            return  # 已被取消的旧扫描残留的信号
+        # 路径列显示相对路径，绝对路径存在行数据里；检测到的预设已在扫描线程中算好
+        self.table_model.append_row(
+            path=abs_path,
+            display=_display_relpath(abs_path, self.root_dir),
+            detected=detected,
+            preset=detected if detected in self.preset_names else "保持不变",
+            suggestion=suggestion,
+        )
 
     def preview_row_preset(self, row: int):
         """预览该行模型（根据选中的预设创建虚拟 JSON 并打开预览窗口）"""
@@ -336,23 +510,18 @@ class OpacityPresetPage(QWidget):
             self._close_preview_window()
         
         # 获取模型路径
-        path_item = self.json_table.item(row, 1)
-        if not path_item:
+        if not (0 <= row < self.table_model.rowCount()):
             QMessageBox.warning(self, "错误", "无法获取模型路径")
             return
+        row_data = self.table_model.row(row)
         
-        model_json_path = path_item.data(Qt.UserRole)  # 绝对路径
+        model_json_path = row_data["path"]  # 绝对路径
         if not model_json_path or not os.path.isfile(model_json_path):
             QMessageBox.warning(self, "错误", f"模型文件不存在：{model_json_path}")
             return
         
         # 获取选中的预设
-        combo = self.json_table.cellWidget(row, 3)
-        if not combo:
-            QMessageBox.warning(self, "错误", "无法获取预设选择")
-            return
-        
-        preset_name = combo.currentText()
+        preset_name = row_data["preset"]
         print(f"🔍 预览预设: {preset_name}, 模型路径: {model_json_path}")
         
         # 根据预设创建 init_opacities
@@ -454,23 +623,18 @@ class OpacityPresetPage(QWidget):
     def open_detail_editor(self, row: int):
         """打开详细编辑对话框"""
         # 获取模型路径
-        path_item = self.json_table.item(row, 1)
-        if not path_item:
+        if not (0 <= row < self.table_model.rowCount()):
             QMessageBox.warning(self, "错误", "无法获取模型路径")
             return
+        row_data = self.table_model.row(row)
         
-        model_json_path = path_item.data(Qt.UserRole)  # 绝对路径
+        model_json_path = row_data["path"]  # 绝对路径
         if not model_json_path or not os.path.isfile(model_json_path):
             QMessageBox.warning(self, "错误", f"模型文件不存在：{model_json_path}")
             return
         
         # 获取当前的预设和 init_opacities
-        combo = self.json_table.cellWidget(row, 3)
-        if not combo:
-            QMessageBox.warning(self, "错误", "无法获取预设选择")
-            return
-        
-        preset_name = combo.currentText()
+        preset_name = row_data["preset"]
         
         # 根据预设创建当前的 init_opacities
         current_init_opacities = None
@@ -538,9 +702,8 @@ class OpacityPresetPage(QWidget):
                 # 更新 init_opacities
                 model_data["init_opacities"] = new_init_opacities
                 
-                # 写回文件
-                with open(model_json_path, "w", encoding="utf-8") as f:
-                    json.dump(model_data, f, ensure_ascii=False, indent=2)
+                # 写回文件（原子替换，中途崩溃不会截断 model.json）
+                atomic_write_json(model_json_path, model_data)
                 
                 print(f"✅ 已保存透明度设置到文件: {model_json_path}")
             except Exception as e:
@@ -550,14 +713,13 @@ class OpacityPresetPage(QWidget):
                 return
             
             # 更新表格中该行的"检测到的预设"列
-            detected = self.detect_preset(model_json_path) or "无"
-            detected_item = self.json_table.item(row, 2)
-            if detected_item:
-                detected_item.setText(detected)
+            detected, suggestion = _inspect_preset(model_json_path, self.preset_index)
+            detected = detected or "无"
+            self.table_model.set_detected(row, detected, suggestion)
             
             # 如果编辑后的设置不匹配当前预设，将预设选择更新为检测到的预设或"自定义"
             if detected in self.preset_names:
-                combo.setCurrentText(detected)
+                self.table_model.set_preset(row, detected)
             elif detected == "自定义":
                 # 如果检测到是自定义，保持当前选择不变（可能是"保持不变"或其他预设）
                 pass
@@ -616,33 +778,19 @@ class OpacityPresetPage(QWidget):
             self.main_window.enable_main_window()
 
     def detect_preset(self, json_path):
-        try:
-            with open(json_path, encoding="utf-8") as f:
-                model = json.load(f)
-            if "init_opacities" not in model:
-                return "无"
-            used_parts = [entry["id"] for entry in model["init_opacities"] if entry["value"] == 1.0]
-            for category, parts in self.parts_data.items():
-                if set(used_parts) == set(parts):
-                    return category
-            return "自定义"
-        except Exception:
-            return "未知"
+        return _detect_preset(json_path, self.preset_index)
 
     # 批量把 bulk_preset_combo 选中的预设，应用到“勾选的行”的“选择预设”下拉框
     def apply_bulk_preset_to_checked_rows(self):
         preset_name = self.bulk_preset_combo.currentText().strip()
-        for row in range(self.json_table.rowCount()):
-            cb = self.json_table.cellWidget(row, 0)
-            if cb and cb.isChecked():
-                combo = self.json_table.cellWidget(row, 3)
-                if combo:
-                    combo.setCurrentText(preset_name)
+        for row, _ in self.table_model.checked_rows():
+            self.table_model.set_preset(row, preset_name)
         QMessageBox.information(self, "完成", f"已将 {preset_name} 应用于勾选行的“选择预设”下拉。")
 
     def apply_preset(self):
         # 逐行处理
         traverse_all = self.all_subdirs_checkbox.isChecked()
+        chosen_subdir = ""
         if not traverse_all:
             if self.source_subdir_combo.count() == 0:
                 QMessageBox.warning(self, "警告", "未找到可用的来源子目录，请勾选“遍历全部子目录”或选择有子目录的根目录")
@@ -651,111 +799,75 @@ class OpacityPresetPage(QWidget):
             if not chosen_subdir:
                 QMessageBox.warning(self, "警告", "请先选择来源子目录")
                 return
+        if self.apply_thread is not None and self.apply_thread.isRunning():
+            return
 
-        use_copy_only = self.copy_mode_checkbox.isChecked()
-
-        updated = 0
-        exported = 0
-        skipped = 0
-
-        # —— 写入各自预设
-        for row in range(self.json_table.rowCount()):
-            cb = self.json_table.cellWidget(row, 0)
-            if not (cb and cb.isChecked()):
-                continue
-
-            path_item = self.json_table.item(row, 1)
-            combo = self.json_table.cellWidget(row, 3)
-            if not path_item or not combo:
-                continue
-
-            json_path = path_item.data(Qt.UserRole)  # 绝对路径
-            choice = combo.currentText().strip()
-
+        # —— 收集各行要写入的预设（"保持不变" 直接记为跳过）
+        preset_jobs = []
+        skipped_rows = []
+        for _, row_data in self.table_model.checked_rows():
+            json_path = row_data["path"]  # 绝对路径
+            choice = row_data["preset"].strip()
             if choice == "保持不变":
+                skipped_rows.append(_job_result(json_path, "写入预设", "skipped", "保持不变"))
                 continue
+            target_parts = set() if choice == "清空(全0)" else set(self.parts_data.get(choice, []))
+            preset_jobs.append((json_path, choice, target_parts))
 
-            try:
-                all_parts = get_all_parts(json_path)
-                if choice == "清空(全0)":
-                    target_parts = set()
-                else:
-                    target_parts = set(self.parts_data.get(choice, []))
-
-                init_opacities = [
-                    {"id": pid, "value": 1.0 if pid in target_parts else 0.0}
-                    for pid in all_parts
-                ]
-
-                with open(json_path, "r", encoding="utf-8") as f:
-                    model_data = json.load(f)
-                model_data.pop("motions", None)
-                model_data.pop("expressions", None)
-                model_data["init_opacities"] = init_opacities
-                with open(json_path, "w", encoding="utf-8") as f:
-                    json.dump(model_data, f, ensure_ascii=False, indent=2)
-                updated += 1
-            except Exception as e:
-                print(f"❌ 处理失败: {json_path} 错误: {e}")
-
-        # —— 集中动作/表情
-        try:
-            if traverse_all:
-                for dirpath, _, filenames in os.walk(self.root_dir):
-                    for file in filenames:
-                        low = file.lower()
-                        if not (low.endswith(".mtn") or low.endswith(".exp.json")):
-                            continue
-                        src = os.path.join(dirpath, file)
-                        rel = os.path.relpath(dirpath, self.root_dir)
-                        top = rel.split(os.sep)[0] if rel != "." else "_root"
-                        export_dir = os.path.join(self.root_dir, "expnmtn", top)
-                        _ensure_dir(export_dir)
-                        try:
-                            if use_copy_only:
-                                final_dst = _dedup_target_path(os.path.join(export_dir, file))
-                                shutil.copy2(src, final_dst)
-                                _fsync_file(final_dst); _fsync_dir(export_dir)
-                            else:
-                                _ = safe_move(src, os.path.join(export_dir, file))
-                            exported += 1
-                        except Exception as e:
-                            print(f"❌ 集中失败：{src} -> {export_dir}，错误: {e}")
-                            skipped += 1
-            else:
-                source_base = os.path.join(self.root_dir, chosen_subdir)
-                if not os.path.isdir(source_base):
-                    print(f"⚠️ 来源子目录不存在：{os.path.normpath(source_base)}")
-                else:
-                    export_dir = os.path.join(self.root_dir, "expnmtn", chosen_subdir)
-                    _ensure_dir(export_dir)
-                    for dirpath, _, filenames in os.walk(source_base):
-                        for file in filenames:
-                            low = file.lower()
-                            if not (low.endswith(".mtn") or low.endswith(".exp.json")):
-                                continue
-                            src = os.path.join(dirpath, file)
-                            try:
-                                if use_copy_only:
-                                    final_dst = _dedup_target_path(os.path.join(export_dir, file))
-                                    shutil.copy2(src, final_dst)
-                                    _fsync_file(final_dst); _fsync_dir(export_dir)
-                                else:
-                                    _ = safe_move(src, os.path.join(export_dir, file))
-                                exported += 1
-                            except Exception as e:
-                                print(f"❌ 集中失败：{src} -> {export_dir}，错误: {e}")
-                                skipped += 1
-        except Exception as e:
-            print(f"❌ 遍历错误：{e}")
-
-        QMessageBox.information(
-            self,
-            "完成",
-            f"已更新 init_opacities：{updated} 个\n"
-            f"{'复制' if use_copy_only else '移动'}了 {exported} 个动作/表情到 expnmtn\\(按首层目录分组)\n"
-            f"跳过/失败：{skipped}"
+        self.apply_thread = ApplyPresetThread(
+            preset_jobs, self.root_dir, traverse_all, chosen_subdir,
+            self._export_mode(), parent=self,
         )
+        self.apply_thread.pre_results = skipped_rows
+        self.apply_thread.progress.connect(self._on_apply_progress)
+        self.apply_thread.finished_apply.connect(self._on_apply_finished)
+
+        self.apply_progress.setRange(0, 0)
+        self.apply_progress.show()
+        self.cancel_apply_btn.show()
+        self.apply_btn.setEnabled(False)
+        self.select_btn.setEnabled(False)
+        self.apply_thread.start()
+
+    def _export_mode(self) -> str:
+        if not self.copy_mode_checkbox.isChecked():
+            return "move"
+        return self.copy_method_combo.currentData() or "copy"
+
+    def _cancel_apply(self, wait: bool = False):
+        """请求取消正在进行的套用（已开始的文件会处理完，未开始的记为跳过）"""
+        if self.apply_thread is not None and self.apply_thread.isRunning():
+            self.apply_thread.requestInterruption()
+            self.cancel_apply_btn.setEnabled(False)
+            if wait:
+                self.apply_thread.wait()
+
+    def _on_apply_progress(self, done: int, total: int):
+        self.apply_progress.setRange(0, total)
+        self.apply_progress.setValue(done)
+
+    def _on_apply_finished(self, results: list, cancelled: bool):
+        thread = self.apply_thread
+        self.apply_thread = None
+        self.apply_progress.hide()
+        self.cancel_apply_btn.hide()
+        self.cancel_apply_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        self.select_btn.setEnabled(True)
+
+        results = (thread.pre_results if thread else []) + results
+        updated = sum(1 for r in results if r["status"] == "updated")
+        exported = sum(1 for r in results if r["status"] == "exported")
+        skipped = sum(1 for r in results if r["status"] == "skipped")
+        failed = sum(1 for r in results if r["status"] == "failed")
+        export_label = MODE_LABELS[thread.export_mode] if thread else "复制"
+        summary = (
+            f"{'⚠️ 已取消，以下为取消前的结果。' if cancelled else ''}"
+            f"已更新 init_opacities：{updated} 个；"
+            f"{export_label}了 {exported} 个动作/表情到 expnmtn（按首层目录分组）；"
+            f"跳过 {skipped} 个，失败 {failed} 个"
+        )
+        ApplyReportDialog(results, self.root_dir, summary, self).exec_()
 
     # ========= 新增：从单一源 JSON 复制到勾选目标 =========
     def _browse_src_json(self):
@@ -784,14 +896,8 @@ class OpacityPresetPage(QWidget):
         success, fail = 0, 0
 
         # 对勾选行执行复制
-        for row in range(self.json_table.rowCount()):
-            cb = self.json_table.cellWidget(row, 0)
-            if not (cb and cb.isChecked()):
-                continue
-            path_item = self.json_table.item(row, 1)
-            if not path_item:
-                continue
-            dst_path = path_item.data(Qt.UserRole)
+        for _, row_data in self.table_model.checked_rows():
+            dst_path = row_data["path"]
             if not (dst_path and os.path.isfile(dst_path)):
                 continue
 
@@ -805,8 +911,7 @@ class OpacityPresetPage(QWidget):
                     dst_obj = self._apply_copy_for_field("expressions", src_obj, dst_obj, mode)
 
                 self._safe_backup(dst_path)
-                with open(dst_path, "w", encoding="utf-8") as f:
-                    json.dump(dst_obj, f, ensure_ascii=False, indent=2)
+                atomic_write_json(dst_path, dst_obj)
                 success += 1
             except Exception as e:
                 print(f"[复制失败] {dst_path}: {e}")
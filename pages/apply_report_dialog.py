@@ -0,0 +1,87 @@
+"""
+批量操作结果报告对话框：逐个文件列出 成功 / 跳过 / 失败 及原因
+"""
+import os
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QHeaderView, QDialogButtonBox, QCheckBox
+)
+from PyQt5.QtGui import QColor
+
+STATUS_TEXT = {
+    "updated": "✅ 已更新",
+    "exported": "📦 已集中",
+    "skipped": "⏭ 跳过",
+    "failed": "❌ 失败",
+}
+STATUS_COLOR = {
+    "failed": QColor(220, 60, 60),
+    "skipped": QColor(150, 150, 150),
+}
+# 失败排最前，便于排查
+_STATUS_ORDER = {"failed": 0, "skipped": 1, "updated": 2, "exported": 3}
+
+
+class ApplyReportDialog(QDialog):
+    def __init__(self, results: list, base_dir: str = "", summary: str = "", parent=None):
+        """
+        Args:
+            results: [{"file": 路径, "action": 操作, "status": updated/exported/skipped/failed, "reason": 原因}]
+            base_dir: 用于显示相对路径
+            summary: 顶部的汇总文字
+        """
+        super().__init__(parent)
+        self.setWindowTitle("处理结果")
+        self.resize(900, 600)
+        self.results = sorted(results, key=lambda r: (_STATUS_ORDER.get(r["status"], 9), r["file"]))
+        self.base_dir = base_dir
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(summary))
+
+        self.only_problems_checkbox = QCheckBox("只显示跳过/失败")
+        self.only_problems_checkbox.toggled.connect(self.refresh_table)
+        layout.addWidget(self.only_problems_checkbox)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(4)
+        self.table.setHorizontalHeaderLabels(["状态", "操作", "文件", "原因"])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.setColumnWidth(0, 90)
+        self.table.setColumnWidth(1, 90)
+        self.table.setColumnWidth(3, 260)
+        layout.addWidget(self.table)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok)
+        buttons.accepted.connect(self.accept)
+        layout.addWidget(buttons)
+
+        self.refresh_table()
+
+    def _display_path(self, path: str) -> str:
+        if not self.base_dir:
+            return path
+        try:
+            return os.path.relpath(path, self.base_dir).replace("\\", "/")
+        except ValueError:
+            return path
+
+    def refresh_table(self):
+        only_problems = self.only_problems_checkbox.isChecked()
+        rows = [r for r in self.results if not only_problems or r["status"] in ("skipped", "failed")]
+        self.table.setRowCount(len(rows))
+        for i, r in enumerate(rows):
+            cells = [
+                STATUS_TEXT.get(r["status"], r["status"]),
+                r.get("action", ""),
+                self._display_path(r["file"]),
+                r.get("reason", ""),
+            ]
+            color = STATUS_COLOR.get(r["status"])
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setToolTip(r["file"] if col == 2 else text)
+                if color is not None:
+                    item.setForeground(color)
+                self.table.setItem(i, col, item)
@@ -2,7 +2,7 @@ import json
 import os
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
-    QFileDialog, QGroupBox, QMessageBox, QDialog
+    QFileDialog, QGroupBox, QMessageBox, QDialog, QCheckBox, QSpinBox
 )
 from PyQt5.QtCore import Qt
 
@@ -11,8 +11,14 @@ from sections.live2d_tool import (
     scan_live2d_directory,
     update_model_json_bulk,
     remove_duplicates_and_check_files,
-    batch_update_mtn_param_text, _resolve_model_path
+    _resolve_model_path,
+    DirListingCache, merge_scanned_model_json
 )
+from sections.batch_add_engine import BatchAddError, batch_add_to_jsonl
+from sections.mtn_rewrite import rewrite_mtn_files, format_rewrite_stats
+from sections.mtn_compress import DEFAULT_TOLERANCE, batch_compress_mtn, format_compress_totals
+from sections.mtn_resample import batch_transform_mtn
+from pages.apply_report_dialog import ApplyReportDialog
 from utils.common import save_config
 
 
@@ -93,11 +99,11 @@ class BatchToolPage(QWidget):
         row4.addWidget(self.mtn_dir_btn)
 
         self.param_name_input = QLineEdit()
-        self.param_name_input.setPlaceholderText("参数名（如 PARAM_IMPORT）")
+        self.param_name_input.setPlaceholderText("参数名（如 PARAM_IMPORT，多个用 ; 分隔）")
         self.param_name_input.setText("PARAM_IMPORT")
 
         self.param_value_input = QLineEdit()
-        self.param_value_input.setPlaceholderText("新值（可参考import参数表）")
+        self.param_value_input.setPlaceholderText("新值（可参考import参数表，多个用 ; 分隔）")
 
         row5 = QHBoxLayout()
         row5.addWidget(QLabel("参数名"))
@@ -111,13 +117,58 @@ class BatchToolPage(QWidget):
         self.delete_btn = QPushButton("❌ 删除参数")
         self.delete_btn.clicked.connect(self.delete_param)
 
+        self.dry_run_checkbox = QCheckBox("仅预览（不写入文件）")
+
         row_buttons = QHBoxLayout()
         row_buttons.addWidget(self.update_btn)
         row_buttons.addWidget(self.delete_btn)
+        row_buttons.addWidget(self.dry_run_checkbox)
+
+        self.compress_tol_input = QLineEdit(f"{DEFAULT_TOLERANCE:g}")
+        self.compress_tol_input.setFixedWidth(80)
+        self.compress_tol_input.setToolTip("允许的最大逐帧误差，越大压缩越多")
+        self.compress_btn = QPushButton("🗜️ 压缩动作")
+        self.compress_btn.clicked.connect(self.compress_motions)
+
+        row_compress = QHBoxLayout()
+        row_compress.addWidget(QLabel("压缩容差"))
+        row_compress.addWidget(self.compress_tol_input)
+        row_compress.addWidget(self.compress_btn)
+        row_compress.addStretch()
 
         param_layout.addLayout(row4)
         param_layout.addLayout(row5)
         param_layout.addLayout(row_buttons)
+        param_layout.addLayout(row_compress)
+
+        self.target_fps_input = QLineEdit()
+        self.target_fps_input.setPlaceholderText("目标帧率（如 60）")
+        self.trim_start_input = QLineEdit()
+        self.trim_start_input.setPlaceholderText("起始秒")
+        self.trim_end_input = QLineEdit()
+        self.trim_end_input.setPlaceholderText("结束秒")
+        self.loop_spin = QSpinBox()
+        self.loop_spin.setRange(1, 100)
+        self.loop_spin.setPrefix("循环 ×")
+
+        row_resample = QHBoxLayout()
+        row_resample.addWidget(QLabel("🎞️ 帧率"))
+        row_resample.addWidget(self.target_fps_input)
+        row_resample.addWidget(self.trim_start_input)
+        row_resample.addWidget(self.trim_end_input)
+        row_resample.addWidget(self.loop_spin)
+
+        self.resample_output_input = QLineEdit()
+        self.resample_output_input.setPlaceholderText("输出目录（留空则覆盖原文件）")
+        self.resample_btn = QPushButton("重采样 / 裁剪")
+        self.resample_btn.clicked.connect(self.resample_motions)
+
+        row_resample_out = QHBoxLayout()
+        row_resample_out.addWidget(self.resample_output_input)
+        row_resample_out.addWidget(self.resample_btn)
+
+        param_layout.addLayout(row_resample)
+        param_layout.addLayout(row_resample_out)
 
         group_param.setLayout(param_layout)
         layout.addWidget(group_param)
@@ -128,18 +179,100 @@ class BatchToolPage(QWidget):
 
     def delete_param(self):
         dir_path = self.mtn_dir_input.text().strip()
-        param = self.param_name_input.text().strip()
+        params = self._split_multi(self.param_name_input.text())
 
-        if not dir_path or not param:
+        if not dir_path or not params:
             QMessageBox.warning(self, "缺少信息", "请填写完整的目录和参数名")
             return
 
+        self._run_mtn_rewrite(dir_path, {p: None for p in params}, f"删除参数：{'、'.join(params)}")
+
+    @staticmethod
+    def _split_multi(text):
+        return [t.strip() for t in text.split(";") if t.strip()]
+
+    def _run_mtn_rewrite(self, dir_path, edits, title):
+        if not os.path.isdir(dir_path):
+            QMessageBox.warning(self, "路径错误", "mtn 目录不存在")
+            return
+        dry_run = self.dry_run_checkbox.isChecked()
+        try:
+            stats = rewrite_mtn_files(dir_path, edits, dry_run=dry_run)
+        except Exception as e:
+            QMessageBox.critical(self, "出错", f"处理失败：\n{str(e)}")
+            return
+
+        msg = f"{title}\n\n{format_rewrite_stats(stats, dry_run)}"
+        if dry_run and stats["changed_files"]:
+            preview = [os.path.relpath(p, dir_path) for p in stats["changed_files"][:20]]
+            if len(stats["changed_files"]) > 20:
+                preview.append("……")
+            msg += "\n\n将修改的文件：\n" + "\n".join(preview)
+        if stats["errors"]:
+            msg += "\n\n失败：\n" + "\n".join(f"{os.path.relpath(p, dir_path)}: {err}" for p, err in stats["errors"][:10])
+        QMessageBox.information(self, "预览结果" if dry_run else "完成", msg)
+
+    def compress_motions(self):
+        dir_path = self.mtn_dir_input.text().strip()
+        if not os.path.isdir(dir_path):
+            QMessageBox.warning(self, "路径错误", "mtn 目录不存在")
+            return
+        try:
+            tolerance = float(self.compress_tol_input.text().strip())
+            if tolerance < 0:
+                raise ValueError
+        except ValueError:
+            QMessageBox.warning(self, "参数错误", "压缩容差必须是不小于 0 的数字")
+            return
+
+        dry_run = self.dry_run_checkbox.isChecked()
+        try:
+            results, totals = batch_compress_mtn(dir_path, tolerance, dry_run=dry_run)
+        except Exception as e:
+            QMessageBox.critical(self, "出错", f"压缩失败：\n{str(e)}")
+            return
+        ApplyReportDialog(results, dir_path, format_compress_totals(totals, dry_run), self).exec_()
+
+    def resample_motions(self):
+        dir_path = self.mtn_dir_input.text().strip()
+        if not os.path.isdir(dir_path):
+            QMessageBox.warning(self, "路径错误", "mtn 目录不存在")
+            return
+
+        def _number(widget, name):
+            text = widget.text().strip()
+            if not text:
+                return None
+            value = float(text)
+            if value < 0:
+                raise ValueError(f"{name}不能为负数")
+            return value
+
         try:
-            from sections.live2d_tool import batch_remove_mtn_param_text
-            batch_remove_mtn_param_text(dir_path, param)
-            QMessageBox.information(self, "完成", f"已删除参数：{param}")
+            target_fps = _number(self.target_fps_input, "目标帧率")
+            start = _number(self.trim_start_input, "起始秒") or 0.0
+            end = _number(self.trim_end_input, "结束秒")
+        except ValueError as e:
+            QMessageBox.warning(self, "参数错误", f"请输入有效的数字\n{e}")
+            return
+        loop = self.loop_spin.value()
+        if not target_fps and not start and end is None and loop == 1:
+            QMessageBox.warning(self, "缺少信息", "请至少填写目标帧率、裁剪范围或循环次数之一")
+            return
+
+        output_dir = self.resample_output_input.text().strip() or None
+        dry_run = self.dry_run_checkbox.isChecked()
+        try:
+            results = batch_transform_mtn(dir_path, output_dir, dry_run=dry_run,
+                                          target_fps=target_fps, start=start, end=end, loop=loop)
         except Exception as e:
-            QMessageBox.critical(self, "出错", f"删除失败：\n{str(e)}")
+            QMessageBox.critical(self, "出错", f"处理失败：\n{str(e)}")
+            return
+        updated = sum(r["status"] == "updated" for r in results)
+        failed = sum(r["status"] == "failed" for r in results)
+        verb = "将处理" if dry_run else "已处理"
+        summary = f"共 {len(results)} 个 .mtn，{verb} {updated} 个，失败 {failed} 个"
+        ApplyReportDialog(results, dir_path, summary, self).exec_()
 
     def select_batch_model_json(self):
         initial_dir = os.path.dirname(self.batch_model_json_path) if hasattr(self, "batch_model_json_path") else ""
@@ -168,12 +301,30 @@ class BatchToolPage(QWidget):
         dir_path = QFileDialog.getExistingDirectory(self, "选择 Live2D 资源目录")
         if not dir_path:
             return
-        model = scan_live2d_directory(dir_path)
+        model = scan_live2d_directory(dir_path, incremental=True)
         save_path = os.path.join(dir_path, "model.json")
+        merged = False
+        if os.path.isfile(save_path):
+            reply = QMessageBox.question(
+                self, "已存在 model.json",
+                "目录中已有 model.json。\n"
+                "是：只合并新增的贴图/动作/表情，保留手动修改的字段\n"
+                "否：重新生成并覆盖",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if reply == QMessageBox.Cancel:
+                return
+            if reply == QMessageBox.Yes:
+                try:
+                    with open(save_path, "r", encoding="utf-8") as f:
+                        model = merge_scanned_model_json(json.load(f), model)
+                    merged = True
+                except Exception as e:
+                    QMessageBox.critical(self, "❌ 出错", f"读取已有 model.json 失败：\n{e}")
+                    return
         with open(save_path, "w", encoding="utf-8") as f:
-            import json
             json.dump(model, f, indent=2, ensure_ascii=False)
-        QMessageBox.information(self, "完成", f"model.json 已生成：\n{save_path}")
+        QMessageBox.information(self, "完成", f"model.json 已{'合并更新' if merged else '生成'}：\n{save_path}")
 
     def clean_model_json(self):
         initial_dir = os.path.dirname(self.batch_model_json_path) if hasattr(self, "batch_model_json_path") else ""
@@ -194,6 +345,8 @@ class BatchToolPage(QWidget):
 
                 jsonl_dir = os.path.dirname(path)
                 success = 0
+                # 所有模型共用一份目录列表缓存，共享的动作目录只列一次
+                listing_cache = DirListingCache()
 
                 for idx, line in enumerate(lines):
                     try:
@@ -213,7 +366,8 @@ class BatchToolPage(QWidget):
                         continue
 
                     # 无交互、自动删除缺失项
-                    remove_duplicates_and_check_files(abs_path, skip_check=False, auto_remove_missing=True)
+                    remove_duplicates_and_check_files(abs_path, skip_check=False, auto_remove_missing=True,
+                                                      listing_cache=listing_cache)
                     success += 1
 
                 QMessageBox.information(self, "完成", f"已清理 {success} 个 model.json")
@@ -244,78 +398,31 @@ class BatchToolPage(QWidget):
             selected_full_paths = [os.path.join(self.batch_file_or_dir, f) for f in selected_files]
 
             if self.batch_model_json_path.endswith(".jsonl"):
+                # 事务方式：全部 model.json 与 summary 行要么一起更新，要么全部保持原样
                 try:
-                    with open(self.batch_model_json_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                    success = 0
-
-                    jsonl_dir = os.path.dirname(self.batch_model_json_path)
-
-                    for idx, line in enumerate(lines):
-                        try:
-                            obj = json.loads(line)
-                            model_path = obj.get("path")
-                            if not model_path:
-                                continue
-
-                            abs_model_path = os.path.normpath(os.path.join(jsonl_dir, model_path))
-                            if not os.path.isfile(abs_model_path):
-                                print(f"⚠️ 第 {idx + 1} 行 path 无效：{abs_model_path}")
-                                continue
-
-                            update_model_json_bulk(abs_model_path, selected_full_paths, prefix=prefix)
-                            print(f"✅ 已处理: {model_path}")
-                            success += 1
-
-                        except Exception as e:
-                            print(f"❌ 第 {idx + 1} 行处理失败: {e}")
-
-                    QMessageBox.information(self, "完成", f"已批量更新 {success} 个 model.json！")
-
-                    if success > 0:
-                        new_motions = set()
-                        new_expressions = set()
-                        for f in selected_files:
-                            name = os.path.splitext(os.path.basename(f))[0]
-                            if f.endswith(".mtn"):
-                                new_motions.add(prefix + name)
-                            elif f.endswith(".exp.json"):
-                                exp_name = os.path.splitext(name)[0]
-                                new_expressions.add(prefix + exp_name)
-
-                        # 原逻辑（存在就读取 motions / expressions）
-                        if lines and '"motions"' in lines[-1] and '"expressions"' in lines[-1]:
-                            try:
-                                old_summary = json.loads(lines[-1])
-                                old_motions = set(old_summary.get("motions", []))
-                                old_expressions = set(old_summary.get("expressions", []))
-                                old_import = old_summary.get("import")  # ✅ 加上这一行
-                            except Exception:
-                                old_motions = set()
-                                old_expressions = set()
-                                old_import = None  # ✅
-                            lines = lines[:-1]
-                        else:
-                            old_motions = set()
-                            old_expressions = set()
-                            old_import = None  # ✅
-
-                        merged_summary = {
-                            "motions": sorted(old_motions.union(new_motions)),
-                            "expressions": sorted(old_expressions.union(new_expressions))
-                        }
-                        if old_import is not None:  # ✅ 如果原来有 import 字段，保留
-                            merged_summary["import"] = old_import
-
-                        lines.append(json.dumps(merged_summary, ensure_ascii=False) + '\n')
-
-                        with open(self.batch_model_json_path, "w", encoding="utf-8") as f:
-                            f.writelines(lines)
-
-                        print("✅ 已更新 JSONL 末尾 summary 行")
-
+                    result = batch_add_to_jsonl(self.batch_model_json_path, selected_full_paths, prefix=prefix)
+                except BatchAddError as e:
+                    QMessageBox.critical(self, "❌ 出错", str(e))
+                    return
                 except Exception as e:
                     QMessageBox.critical(self, "❌ 出错", f"读取 JSONL 失败：\n{str(e)}")
+                    return
+
+                for line_no, model_path in result.get("invalid_lines", []):
+                    print(f"⚠️ 第 {line_no} 行 path 无效：{model_path}")
+                for file_path, reason in result["skipped_files"]:
+                    print(f"警告：{file_path} {reason}，跳过。")
+                for model_path in result["updated"]:
+                    print(f"✅ 已处理: {model_path}")
+                if result["summary_updated"]:
+                    print("✅ 已更新 JSONL 末尾 summary 行")
+
+                QMessageBox.information(
+                    self, "完成",
+                    f"已批量更新 {len(result['updated'])} 个 model.json！\n"
+                    f"共新增 {sum(result['added_per_model'].values())} 个条目（已登记的跳过），"
+                    f"无效行 {len(result.get('invalid_lines', []))} 个"
+                )
 
             else:
                 # 普通单个 model.json 模式
@@ -346,16 +453,19 @@ class BatchToolPage(QWidget):
 
     def update_param(self):
         dir_path = self.mtn_dir_input.text().strip()
-        param = self.param_name_input.text().strip()
-        value = self.param_value_input.text().strip()
+        params = self._split_multi(self.param_name_input.text())
+        values = self._split_multi(self.param_value_input.text())
 
-        if not dir_path or not param or not value:
+        if not dir_path or not params or not values:
             QMessageBox.warning(self, "缺少信息", "请填写完整的目录、参数名和新值")
             return
+        if len(values) == 1:
+            values = values * len(params)
+        if len(values) != len(params):
+            QMessageBox.warning(self, "参数不匹配", "参数名和新值的个数不一致")
+            return
 
-        try:
-            batch_update_mtn_param_text(dir_path, param, value)
-            QMessageBox.information(self, "完成", f"{param} 已更新为 {value}")
-        except Exception as e:
-            QMessageBox.critical(self, "出错", f"更新失败：\n{str(e)}")
+        edits = dict(zip(params, values))
+        title = "、".join(f"{k}={v}" for k, v in edits.items())
+        self._run_mtn_rewrite(dir_path, edits, f"更新参数：{title}")
 
@@ -8,6 +8,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from utils.common import save_config, load_config
+from sections.jsonl_document import JsonlDocument, write_jsonl
+from sections.jsonl_summary import (
+    summary_for_records, compare_summary, format_verify_result,
+    resolve_record_path, load_model_names
+)
 
 
 class JsonlEditorPage(QWidget):
@@ -16,6 +21,11 @@ class JsonlEditorPage(QWidget):
         self.jsonl_path = ""
         self.data = []
         self.summary_line = None  # 保存 summary 行（包含 motions/expressions/import）
+        # summary 增量计算：第一次校验时按全部模型建立，之后只重算 path 改过的行
+        self.summary_engine = None
+        self._engine_paths = []
+        self._engine_problems = []
+        self._saved_records = []  # 上次读取/保存时每条记录的序列化结果，用于只写改动的行
         # 预览窗口相关
         self.preview_thread = None  # 预览窗口线程引用
         self.preview_window = None  # 预览窗口实例引用（用于关闭）
@@ -33,10 +43,13 @@ class JsonlEditorPage(QWidget):
         self.save_as_btn.clicked.connect(self.save_as_jsonl)
         self.preview_btn = QPushButton("👁️ 预览模型")
         self.preview_btn.clicked.connect(self.preview_models)
+        self.verify_btn = QPushButton("🧮 校验 summary")
+        self.verify_btn.clicked.connect(self.verify_summary)
         btn_layout.addWidget(self.load_btn)
         btn_layout.addWidget(self.save_btn)
         btn_layout.addWidget(self.save_as_btn)
         btn_layout.addWidget(self.preview_btn)
+        btn_layout.addWidget(self.verify_btn)
 
 
         self.layout.addLayout(btn_layout)
@@ -87,32 +100,27 @@ class JsonlEditorPage(QWidget):
             save_config({"jsonl_last_open_dir": open_dir})
 
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            doc = JsonlDocument(path)
+            records = doc.records()
+            summary = doc.summary()
 
             self.jsonl_path = path
             self.path_label.setText(f"当前文件：{path}")
-            self.data = []
-            self.summary_line = None
+            self.data = records
+            self._saved_records = [json.dumps(obj, ensure_ascii=False) for obj in records]
+            self.summary_line = summary
+            self.summary_engine = None
+            self._engine_paths = []
+            self._engine_problems = []
 
             self.table.setRowCount(0)
 
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                obj = json.loads(line)
-                if "motions" in obj or "expressions" in obj:
-                    # 保存 summary 行
-                    self.summary_line = obj
-                    # 读取 import 参数并显示
-                    import_val = obj.get("import")
-                    if import_val is not None:
-                        self.import_input.setText(str(import_val))
-                    else:
-                        self.import_input.clear()
-                    continue
-                self.data.append(obj)
+            # 读取 import 参数并显示
+            import_val = summary.get("import") if summary else None
+            if import_val is not None:
+                self.import_input.setText(str(import_val))
+            else:
+                self.import_input.clear()
 
             self.refresh_table()
         except Exception as e:
@@ -128,6 +136,86 @@ class JsonlEditorPage(QWidget):
                     item.setTextAlignment(Qt.AlignCenter)
                 self.table.setItem(row, col, item)
 
+    def _sync_summary_engine(self):
+        """让 summary_engine 与当前表格中的 path 一致：首次全量建立，之后只重算改过 path 的行"""
+        jsonl_dir = os.path.dirname(os.path.abspath(self.jsonl_path))
+        paths = [obj.get("path", "") for obj in self.data]
+        if self.summary_engine is None or len(paths) != len(self._engine_paths):
+            import_value = (self.summary_line or {}).get("import")
+            self.summary_engine, self._engine_problems = summary_for_records(self.data, jsonl_dir, import_value)
+            self._engine_paths = paths
+            return
+
+        problems = {i: p for i, *p in self._engine_problems}
+        for i, (old, new) in enumerate(zip(self._engine_paths, paths)):
+            if old == new:
+                continue
+            problems.pop(i, None)
+            model_path = resolve_record_path(jsonl_dir, new)
+            try:
+                if not model_path:
+                    raise FileNotFoundError("找不到 model.json")
+                self.summary_engine.update_model(i, *load_model_names(model_path))
+            except Exception as e:
+                self.summary_engine.update_model(i)
+                problems[i] = [new, str(e)]
+        self._engine_problems = [(i, *p) for i, p in sorted(problems.items())]
+        self._engine_paths = paths
+
+    def verify_summary(self):
+        if not self.jsonl_path or not os.path.isfile(self.jsonl_path):
+            QMessageBox.warning(self, "未加载文件", "请先导入 JSONL 文件")
+            return
+        try:
+            self._read_table_into_data(["path"])
+            self._sync_summary_engine()
+        except Exception as e:
+            QMessageBox.critical(self, "校验失败", str(e))
+            return
+
+        result = compare_summary(self.summary_engine.to_dict(), self.summary_line, self._engine_problems)
+        if result["ok"]:
+            QMessageBox.information(self, "校验结果", format_verify_result(result))
+            return
+        reply = QMessageBox.question(
+            self, "校验结果",
+            format_verify_result(result) + "\n\n是否用重新计算的 motions / expressions 更新 summary？（保存后写入文件）",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self._apply_summary_engine()
+
+    def _apply_summary_engine(self):
+        expected = self.summary_engine.to_dict()
+        if self.summary_line is None:
+            self.summary_line = {}
+        self.summary_line["motions"] = expected["motions"]
+        self.summary_line["expressions"] = expected["expressions"]
+
+    def _summary_for_save(self):
+        """内存中的 summary（可能已重新计算过 motions / expressions）加上输入框里的 import"""
+        if self.summary_line is None:
+            return None
+        summary = dict(self.summary_line)
+        import_text = self.import_input.text().strip()
+        if import_text:
+            try:
+                summary["import"] = int(import_text)
+            except ValueError:
+                raise ValueError(f"import 参数必须是整数，当前值：{import_text}") from None
+        else:
+            # 如果输入框为空，删除 import 字段
+            summary.pop("import", None)
+        return summary
+
+    def _read_table_into_data(self, keys):
+        columns = ["index", "id", "path", "folder", "x", "y", "xscale", "yscale"]
+        for row, obj in enumerate(self.data):
+            for key in keys:
+                item = self.table.item(row, columns.index(key))
+                if item is not None:
+                    obj[key] = item.text().strip()
+
     def save_jsonl(self):
         if not self.jsonl_path or not os.path.isfile(self.jsonl_path):
             QMessageBox.warning(self, "未加载文件", "请先导入 JSONL 文件")
@@ -147,33 +235,22 @@ class JsonlEditorPage(QWidget):
                     except ValueError:
                         continue  # 跳过非法数字
 
-            # 读取原始 JSONL 并写回（保留 summary 行）
-            with open(self.jsonl_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            new_lines = []
-            idx = 0
-            for line in lines:
-                obj = json.loads(line)
-                if "motions" in obj or "expressions" in obj:
-                    # 更新 summary 行的 import 参数
-                    import_text = self.import_input.text().strip()
-                    if import_text:
-                        try:
-                            obj["import"] = int(import_text)
-                        except ValueError:
-                            QMessageBox.warning(self, "警告", f"import 参数必须是整数，当前值：{import_text}")
-                            return
-                    elif "import" in obj:
-                        # 如果输入框为空，删除 import 字段
-                        del obj["import"]
-                    new_lines.append(json.dumps(obj, ensure_ascii=False) + '\n')
-                else:
-                    new_lines.append(json.dumps(self.data[idx], ensure_ascii=False) + '\n')
-                    idx += 1
-
-            with open(self.jsonl_path, "w", encoding="utf-8") as f:
-                f.writelines(new_lines)
+            try:
+                summary = self._summary_for_save()
+            except ValueError as e:
+                QMessageBox.warning(self, "警告", str(e))
+                return
+
+            # 只写改动过的记录和 summary：不变长时原地覆盖，否则原子替换
+            doc = JsonlDocument(self.jsonl_path)
+            if len(doc) != len(self.data):
+                write_jsonl(self.jsonl_path, self.data, summary)
+            else:
+                dumped = [json.dumps(obj, ensure_ascii=False) for obj in self.data]
+                changed = {i: obj for i, (obj, text) in enumerate(zip(self.data, dumped))
+                           if i >= len(self._saved_records) or text != self._saved_records[i]}
+                doc.update(changed, summary if summary != doc.summary() else None)
+            self._saved_records = [json.dumps(obj, ensure_ascii=False) for obj in self.data]
 
             QMessageBox.information(self, "保存成功", f"已保存：{self.jsonl_path}")
         except Exception as e:
@@ -205,6 +282,14 @@ class JsonlEditorPage(QWidget):
             QMessageBox.critical(self, "⚠️", f"更新表格数据失败：{e}")
             return
 
+        # 已经建立过 summary 引擎时，path 的改动只重算改过的行并同步到 summary
+        if self.summary_engine is not None and [o.get("path", "") for o in self.data] != self._engine_paths:
+            try:
+                self._sync_summary_engine()
+                self._apply_summary_engine()
+            except Exception as e:
+                print(f"⚠️ 更新 summary 失败: {e}")
+
         # 选择保存路径
         # 优先使用上次保存的目录，其次使用当前文件所在目录
         config = load_config()
@@ -227,34 +312,12 @@ class JsonlEditorPage(QWidget):
             save_config({"jsonl_last_save_dir": save_dir})
 
         try:
-            # 构建新的 JSONL 内容
-            lines = []
-            for obj in self.data:
-                lines.append(json.dumps(obj, ensure_ascii=False) + "\n")
-
-            # 添加原始 JSONL 的 summary 行（更新 import 参数）
-            with open(self.jsonl_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        obj = json.loads(line.strip())
-                        if "motions" in obj or "expressions" in obj:
-                            # 更新 import 参数
-                            import_text = self.import_input.text().strip()
-                            if import_text:
-                                try:
-                                    obj["import"] = int(import_text)
-                                except ValueError:
-                                    QMessageBox.warning(self, "警告", f"import 参数必须是整数，当前值：{import_text}")
-                                    return
-                            elif "import" in obj:
-                                # 如果输入框为空，删除 import 字段
-                                del obj["import"]
-                            lines.append(json.dumps(obj, ensure_ascii=False) + "\n")
-                    except:
-                        continue
-
-            with open(save_path, "w", encoding="utf-8") as f:
-                f.writelines(lines)
+            try:
+                summary = self._summary_for_save()
+            except ValueError as e:
+                QMessageBox.warning(self, "警告", str(e))
+                return
+            write_jsonl(save_path, self.data, summary)
 
             QMessageBox.information(self, "保存成功", f"文件已保存为：{save_path}")
         except Exception as e:
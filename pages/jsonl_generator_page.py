@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 
 from sections.gen_jsonl import collect_jsons_to_jsonl, is_valid_live2d_json
+from sections.jsonl_document import JsonlDocument, write_jsonl
 from sections.py_live2d_editor import get_all_param_info_list
 from utils.common import save_config, load_config, get_resource_path, _norm_id, _pget, _to_key
 
@@ -175,16 +176,13 @@ class JsonlGeneratorPage(QWidget):
 
     def _inject_import_to_summary(self, output_path: str, import_val: int):
         try:
-            with open(output_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            if not lines:
+            # 只改写 summary 行，不重写前面的记录
+            doc = JsonlDocument(output_path)
+            summary = doc.summary()
+            if summary is None:
                 return
-            last_obj = json.loads(lines[-1].strip())
-            if isinstance(last_obj, dict):
-                last_obj["import"] = import_val
-                lines[-1] = json.dumps(last_obj, ensure_ascii=False) + "\n"
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.writelines(lines)
+            summary["import"] = import_val
+            doc.set_summary(summary)
         except Exception as e:
             print(f"⚠️ 注入 import 失败：{e}")
 
@@ -553,18 +551,10 @@ class JsonlPreviewDialog(QDialog):
 
         # 组装最终行：普通行 + summary 行（必要时覆盖 summary.import）
         try:
-            lines = []
-            for obj in self.data:
-                lines.append(json.dumps(obj, ensure_ascii=False) + "\n")
-
-            if self.summary_lines:
-                summary = self.summary_lines[-1]
-                if isinstance(summary, dict) and self.summary_import is not None:
-                    summary["import"] = self.summary_import
-                lines.append(json.dumps(summary, ensure_ascii=False) + "\n")
-
-            with open(save_path, "w", encoding="utf-8") as f:
-                f.writelines(lines)
+            summary = self.summary_lines[-1] if self.summary_lines else None
+            if isinstance(summary, dict) and self.summary_import is not None:
+                summary["import"] = self.summary_import
+            write_jsonl(save_path, self.data, summary)
 
             QMessageBox.information(self, "保存成功", f"已保存：{save_path}")
             self.accept()
@@ -4,7 +4,6 @@ JSONL 预览窗口 - 使用 pygame 和 live2d 预览 JSONL 文件中的所有模
 import os
 import json
 import pygame
-import tempfile
 
 try:
     import live2d.v2 as live2d_v2
@@ -24,7 +23,9 @@ except ImportError:
 
 LIVE2D_AVAILABLE = LIVE2D_V2_AVAILABLE or LIVE2D_V3_AVAILABLE
 
-from sections.py_live2d_editor import _load_json_without_motions_expressions
+from sections.jsonl_document import read_summary
+from sections.py_live2d_editor import _load_json_without_motions_expressions, shutdown_introspector
+from sections.stripped_json import release_stripped_json
 
 
 class JsonlPreviewWindow:
@@ -48,7 +49,6 @@ class JsonlPreviewWindow:
         # 模型列表
         self.models_v2 = []  # Live2D v2 模型
         self.models_v3 = []  # Live2D v3 模型
-        self.temp_files = []  # 临时文件列表，用于清理
         # 保存每个模型的配置信息（用于在 Resize 后重新应用）
         self.model_configs = []  # [(model, x, y, xscale, yscale, is_v3)]
         
@@ -64,22 +64,11 @@ class JsonlPreviewWindow:
     def _parse_import_from_jsonl(self):
         """从 JSONL 文件中解析 import 参数"""
         try:
-            with open(self.jsonl_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                        # 检查是否是 summary 行（包含 motions 或 expressions）
-                        if (obj.get("motions") is not None or 
-                            obj.get("expressions") is not None):
-                            if "import" in obj:
-                                self.param_import = int(obj["import"])
-                                print(f"检测到汇总 import = {self.param_import}")
-                                break
-                    except json.JSONDecodeError:
-                        continue
+            # 只读 summary 行
+            summary = read_summary(self.jsonl_path)
+            if summary and "import" in summary:
+                self.param_import = int(summary["import"])
+                print(f"检测到汇总 import = {self.param_import}")
         except Exception as e:
             print(f"解析 import 参数失败: {e}")
     
@@ -128,10 +117,6 @@ class JsonlPreviewWindow:
             is_v3 = full_path.endswith(".model3.json")
             
             try:
-                # 创建临时文件（移除 motions 和 expressions）
-                temp_path = _load_json_without_motions_expressions(full_path)
-                self.temp_files.append(temp_path)
-                
                 if is_v3:
                     if not LIVE2D_V3_AVAILABLE:
                         print(f"警告: 模型 {model_path} 是 v3 格式，但 live2d.v3 不可用，跳过")
@@ -143,7 +128,12 @@ class JsonlPreviewWindow:
                         continue
                     model = live2d_v2.LAppModel()
                 
-                model.LoadModelJson(temp_path)
+                # 移除 motions 和 expressions 后的 JSON（加载完立即释放）
+                temp_path = _load_json_without_motions_expressions(full_path)
+                try:
+                    model.LoadModelJson(temp_path)
+                finally:
+                    release_stripped_json(temp_path)
                 
                 # 读取配置
                 x = float(obj.get("x", 0.0))
@@ -252,6 +242,9 @@ class JsonlPreviewWindow:
             print("错误: live2d 库不可用，无法预览")
             return
         
+        # 预览窗口要独占 pygame 显示，先释放常驻解析线程的隐藏上下文（下次解析时会自动重建）
+        shutdown_introspector()
+        
         # 初始化 pygame
         pygame.init()
         
@@ -442,14 +435,6 @@ class JsonlPreviewWindow:
             except:
                 pass
         
-        # 删除临时文件
-        for temp_file in self.temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                print(f"删除临时文件失败 {temp_file}: {e}")
-        
         if LIVE2D_V2_AVAILABLE:
             live2d_v2.dispose()
         if LIVE2D_V3_AVAILABLE:
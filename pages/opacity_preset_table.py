@@ -0,0 +1,196 @@
+"""
+透明度预设页面的表格模型与委托
+
+每行只是一个 dict，勾选框 / 预设下拉 / 操作按钮都由委托绘制，
+只有正在编辑的那一格才会真正创建 QComboBox，几万行也不会卡。
+"""
+from PyQt5.QtWidgets import (
+    QStyledItemDelegate, QStyleOptionButton, QStyleOptionComboBox, QStyle,
+    QApplication, QComboBox
+)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+
+COL_CHECK, COL_PATH, COL_DETECTED, COL_PRESET, COL_ACTIONS = range(5)
+HEADERS = ["✔", "model.json 路径", "检测到的预设", "选择预设", "操作"]
+
+
+class OpacityPresetTableModel(QAbstractTableModel):
+    """
+    行数据：{"path": 绝对路径, "display": 显示用相对路径, "detected": 检测到的预设,
+             "suggestion": 自定义时最接近的预设, "preset": 选择的预设, "checked": bool}
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    # ----- Qt 接口 -----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        col = index.column()
+        if col == COL_CHECK:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if row["checked"] else Qt.Unchecked
+        elif col == COL_PATH:
+            if role in (Qt.DisplayRole, Qt.ToolTipRole):
+                return row["display"]
+            if role == Qt.UserRole:
+                return row["path"]
+        elif col == COL_DETECTED:
+            if role == Qt.DisplayRole:
+                if row["suggestion"]:
+                    return f"{row['detected']}（≈{row['suggestion']}）"
+                return row["detected"]
+            if role == Qt.ToolTipRole and row["suggestion"]:
+                return f"最接近的预设：{row['suggestion']}"
+        elif col == COL_PRESET:
+            if role in (Qt.DisplayRole, Qt.EditRole):
+                return row["preset"]
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid():
+            return False
+        row = self._rows[index.row()]
+        col = index.column()
+        if col == COL_CHECK and role == Qt.CheckStateRole:
+            row["checked"] = (value == Qt.Checked)
+        elif col == COL_PRESET and role == Qt.EditRole:
+            row["preset"] = str(value)
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        base = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if index.column() == COL_CHECK:
+            return base | Qt.ItemIsUserCheckable
+        if index.column() == COL_PRESET:
+            return base | Qt.ItemIsEditable
+        return base
+
+    # ----- 页面使用的便捷方法 -----
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+    def append_row(self, path: str, display: str, detected: str, preset: str,
+                   suggestion: str = "", checked: bool = True):
+        pos = len(self._rows)
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.append({
+            "path": path, "display": display, "detected": detected,
+            "suggestion": suggestion, "preset": preset, "checked": checked,
+        })
+        self.endInsertRows()
+
+    def row(self, row: int) -> dict:
+        return self._rows[row]
+
+    def checked_rows(self):
+        """[(行号, 行数据)]，只含勾选的行"""
+        return [(i, r) for i, r in enumerate(self._rows) if r["checked"]]
+
+    def set_preset(self, row: int, preset: str):
+        self.setData(self.index(row, COL_PRESET), preset)
+
+    def set_detected(self, row: int, detected: str, suggestion: str = ""):
+        self._rows[row]["detected"] = detected
+        self._rows[row]["suggestion"] = suggestion
+        idx = self.index(row, COL_DETECTED)
+        self.dataChanged.emit(idx, idx, [Qt.DisplayRole, Qt.ToolTipRole])
+
+
+class PresetComboDelegate(QStyledItemDelegate):
+    """平时画成下拉框的样子，点击时才创建真正的 QComboBox"""
+
+    def __init__(self, options_provider, parent=None):
+        super().__init__(parent)
+        self._options_provider = options_provider  # 返回可选预设列表的函数
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionComboBox()
+        opt.rect = option.rect.adjusted(2, 2, -2, -2)
+        opt.state = option.state | QStyle.State_Enabled
+        opt.currentText = index.data(Qt.DisplayRole) or ""
+        style = QApplication.style()
+        style.drawComplexControl(QStyle.CC_ComboBox, opt, painter)
+        style.drawControl(QStyle.CE_ComboBoxLabel, opt, painter)
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.addItems(self._options_provider())
+        # 选中即提交，不必再点别处
+        combo.activated.connect(lambda _=None, c=combo: self._commit(c))
+        return combo
+
+    def _commit(self, combo):
+        self.commitData.emit(combo)
+        self.closeEditor.emit(combo)
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole) or "")
+        editor.showPopup()
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+
+class RowButtonsDelegate(QStyledItemDelegate):
+    """绘制「查看」「详细」两个按钮，点击时发出对应行号"""
+    preview_clicked = pyqtSignal(int)
+    detail_clicked = pyqtSignal(int)
+
+    LABELS = ("查看", "详细")
+    BUTTON_WIDTH = 56
+    SPACING = 4
+
+    def _button_rects(self, rect: QRect):
+        h = min(rect.height() - 4, 28)
+        top = rect.top() + (rect.height() - h) // 2
+        left = rect.left() + 4
+        rects = []
+        for _ in self.LABELS:
+            rects.append(QRect(left, top, self.BUTTON_WIDTH, h))
+            left += self.BUTTON_WIDTH + self.SPACING
+        return rects
+
+    def paint(self, painter, option, index):
+        style = QApplication.style()
+        for text, rect in zip(self.LABELS, self._button_rects(option.rect)):
+            btn = QStyleOptionButton()
+            btn.rect = rect
+            btn.text = text
+            btn.state = QStyle.State_Enabled | QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, btn, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            preview_rect, detail_rect = self._button_rects(option.rect)
+            if preview_rect.contains(event.pos()):
+                self.preview_clicked.emit(index.row())
+                return True
+            if detail_rect.contains(event.pos()):
+                self.detail_clicked.emit(index.row())
+                return True
+        return False
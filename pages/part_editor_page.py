@@ -1,7 +1,5 @@
 import os
 import json
-import pygame
-import live2d.v2 as live2d
 import threading
 
 from PyQt5.QtWidgets import (
@@ -10,25 +8,12 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
-from sections.py_live2d_editor import list_model_info
+from sections.py_live2d_editor import list_model_info, get_all_parts
 from pages.single_model_preview_window import SingleModelPreviewWindow
 
 
 def list_model_parts(model_json_path):
-    pygame.init()
-    pygame.display.set_mode((1, 1), pygame.OPENGL | pygame.HIDDEN)
-    live2d.init()
-    live2d.glewInit()
-
-    model = live2d.LAppModel()
-    model.LoadModelJson(model_json_path)
-
-    part_ids = model.GetPartIds()
-
-    live2d.dispose()
-    pygame.quit()
-
-    return part_ids
+    return get_all_parts(model_json_path)
 
 
 class PartEditorPage(QWidget):
@@ -1,10 +1,7 @@
 """
 单个模型预览窗口 - 使用 pygame 和 live2d 预览单个 Live2D 模型（带预设的 init_opacities）
 """
-import os
-import json
 import pygame
-import tempfile
 import threading
 
 try:
@@ -23,7 +20,8 @@ except ImportError:
 
 LIVE2D_AVAILABLE = LIVE2D_V2_AVAILABLE or LIVE2D_V3_AVAILABLE
 
-from sections.py_live2d_editor import _load_json_without_motions_expressions
+from sections.py_live2d_editor import shutdown_introspector
+from sections.stripped_json import get_stripped_json, release_stripped_json
 
 
 class SingleModelPreviewWindow:
@@ -39,7 +37,6 @@ class SingleModelPreviewWindow:
         self.running = True  # 运行标志，用于外部控制关闭
         self.model_json_path = model_json_path
         self.init_opacities = init_opacities
-        self.temp_file = None  # 临时文件路径，用于清理
         
         # 模型
         self.model = None
@@ -52,17 +49,10 @@ class SingleModelPreviewWindow:
     def _create_virtual_json(self) -> str:
         """创建虚拟 JSON 文件（包含预设的 init_opacities，移除 motions/expressions）"""
         try:
-            # 读取原始 JSON
-            with open(self.model_json_path, "r", encoding="utf-8") as f:
-                model_data = json.load(f)
-            
-            # 移除 motions 和 expressions
-            model_data.pop("motions", None)
-            model_data.pop("expressions", None)
-            
-            # 应用预设的 init_opacities
+            # 应用预设的 init_opacities（motions/expressions 由缓存统一移除）
+            overrides = None
             if self.init_opacities is not None:
-                model_data["init_opacities"] = self.init_opacities
+                overrides = {"init_opacities": self.init_opacities}
                 print(f"✅ 已应用预设的 init_opacities: 共 {len(self.init_opacities)} 个部件")
                 # 打印前几个部件的信息用于调试
                 visible_parts = [item for item in self.init_opacities if item.get("value", 0.0) == 1.0]
@@ -72,16 +62,8 @@ class SingleModelPreviewWindow:
             else:
                 print("📌 使用原始 JSON 中的 init_opacities")
             
-            # 创建临时文件
-            temp_dir = os.path.dirname(self.model_json_path)
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".json", dir=temp_dir, text=True)
-            try:
-                with os.fdopen(temp_fd, "w", encoding="utf-8") as f:
-                    json.dump(model_data, f, ensure_ascii=False, indent=2)
-                return temp_path
-            except Exception:
-                os.close(temp_fd)
-                raise
+            # 同一模型 + 同一预设会复用同一个文件，不再每次写盘
+            return get_stripped_json(self.model_json_path, overrides)
         except Exception as e:
             print(f"创建虚拟 JSON 失败: {e}")
             import traceback
@@ -94,12 +76,6 @@ class SingleModelPreviewWindow:
             print("错误: live2d 库不可用")
             return False
         
-        # 创建虚拟 JSON
-        temp_path = self._create_virtual_json()
-        if not temp_path:
-            return False
-        self.temp_file = temp_path
-        
         # 判断是 v2 还是 v3 模型
         self.is_v3 = self.model_json_path.endswith(".model3.json")
         
@@ -115,8 +91,16 @@ class SingleModelPreviewWindow:
                     return False
                 self.model = live2d_v2.LAppModel()
             
-            # 加载模型
-            self.model.LoadModelJson(temp_path)
+            # 创建虚拟 JSON
+            temp_path = self._create_virtual_json()
+            if not temp_path:
+                return False
+            
+            # 加载模型（读完即可释放，模型目录里不留文件）
+            try:
+                self.model.LoadModelJson(temp_path)
+            finally:
+                release_stripped_json(temp_path)
             print(f"✅ 已加载模型: {self.model_json_path}")
             
             # 手动应用 init_opacities（确保预设正确应用）
@@ -159,6 +143,9 @@ class SingleModelPreviewWindow:
             print("错误: live2d 库不可用，无法预览")
             return
         
+        # 预览窗口要独占 pygame 显示，先释放常驻解析线程的隐藏上下文（下次解析时会自动重建）
+        shutdown_introspector()
+        
         # 初始化 pygame
         pygame.init()
         
@@ -279,13 +266,6 @@ class SingleModelPreviewWindow:
             except:
                 pass
         
-        # 删除临时文件
-        if self.temp_file and os.path.exists(self.temp_file):
-            try:
-                os.remove(self.temp_file)
-            except Exception as e:
-                print(f"删除临时文件失败 {self.temp_file}: {e}")
-        
         if LIVE2D_V2_AVAILABLE:
             live2d_v2.dispose()
         if LIVE2D_V3_AVAILABLE:
@@ -0,0 +1,241 @@
+"""
+批量向多个 model.json 添加动作/表情（事务方式）
+
+流程：
+  1) 选中的 .mtn / .exp.json 只校验一次
+  2) 并发准备：读取每个目标 model.json，生成新内容写入同目录临时文件并 fsync
+  3) 提交：逐个 os.replace 覆盖目标，最后替换 JSONL（summary 行按更新后的模型重新计算）
+  4) 任何一步失败：删除临时文件，已替换的文件用内存中的原内容恢复
+"""
+import os
+import json
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from sections.live2d_tool import safe_relpath, sanitize_path, _resolve_model_path
+from sections.jsonl_summary import model_names_from_data, summary_for_records
+
+
+class BatchAddError(RuntimeError):
+    pass
+
+
+def collect_new_files(new_files, prefix=""):
+    """校验并分类待添加文件，返回 [(绝对路径, "motion"/"expression", 名称)]，以及被跳过的 [(路径, 原因)]"""
+    valid, skipped = [], []
+    seen = set()
+    for new_file in new_files:
+        new_file = os.path.abspath(sanitize_path(new_file))
+        if new_file in seen:
+            continue
+        seen.add(new_file)
+        if not os.path.isfile(new_file):
+            skipped.append((new_file, "文件不存在"))
+            continue
+        file_name = os.path.basename(new_file)
+        if file_name.endswith(".mtn"):
+            valid.append((new_file, "motion", prefix + os.path.splitext(file_name)[0]))
+        elif file_name.endswith(".exp.json"):
+            exp_name = os.path.splitext(os.path.splitext(file_name)[0])[0]
+            valid.append((new_file, "expression", prefix + exp_name))
+        else:
+            skipped.append((new_file, "不支持的文件类型"))
+    return valid, skipped
+
+
+def _apply_additions(model_data: dict, model_json_path: str, new_files) -> int:
+    base_dir = os.path.dirname(model_json_path)
+    model_data.setdefault("motions", {})
+    model_data.setdefault("expressions", [])
+    # 已登记过的同名同文件条目不再重复添加，重复执行批量生成时保持幂等
+    existing_exps = {(e.get("name"), e.get("file")) for e in model_data["expressions"] if isinstance(e, dict)}
+    added = 0
+    for abs_path, kind, name in new_files:
+        relative_path = safe_relpath(abs_path, base_dir)
+        if kind == "motion":
+            group = model_data["motions"].setdefault(name, [])
+            if any(isinstance(m, dict) and m.get("file") == relative_path for m in group):
+                continue
+            group.append({"file": relative_path})
+        else:
+            if (name, relative_path) in existing_exps:
+                continue
+            existing_exps.add((name, relative_path))
+            model_data["expressions"].append({"name": name, "file": relative_path})
+        added += 1
+    return added
+
+
+def _write_temp(target_path: str, text: str) -> str:
+    folder = os.path.dirname(os.path.abspath(target_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=os.path.splitext(target_path)[1], dir=folder)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(target_path, tmp_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    return tmp_path
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _prepare_model(model_json_path: str, new_files):
+    """
+    返回 (原始字节, 临时文件路径, 更新后的 (动作名, 表情名), 实际新增的条目数)；
+    没有新增条目时不生成临时文件（临时文件路径为 None），原文件的格式和修改时间保持不变
+    """
+    with open(model_json_path, "rb") as f:
+        original = f.read()
+    model_data = json.loads(original.decode("utf-8"))
+    added = _apply_additions(model_data, model_json_path, new_files)
+    tmp_path = None
+    if added:
+        tmp_path = _write_temp(model_json_path, json.dumps(model_data, indent=4, ensure_ascii=False))
+    return original, tmp_path, model_names_from_data(model_data), added
+
+
+def _split_jsonl(lines):
+    """返回 (记录行, summary 字典或 None)；summary 判定与原逻辑一致：最后一行同时含 motions 和 expressions"""
+    if lines and '"motions"' in lines[-1] and '"expressions"' in lines[-1]:
+        try:
+            return lines[:-1], json.loads(lines[-1])
+        except ValueError:
+            return lines[:-1], {}
+    return lines, None
+
+
+def _recomputed_summary(records, jsonl_path, old_summary, prepared):
+    """用更新后的模型重新计算 summary；本次改过的模型直接用内存中的结果，其余的读文件"""
+    parsed = []
+    for line in records:
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(obj, dict):
+            parsed.append(obj)
+    known = {path: item[2] for path, item in prepared.items()}
+    import_value = (old_summary or {}).get("import")
+    summary, _ = summary_for_records(parsed, os.path.dirname(os.path.abspath(jsonl_path)), import_value, known)
+    return summary.to_dict()
+
+
+def batch_add_to_models(model_json_paths, new_files, prefix="", jsonl_path=None, max_workers=None):
+    """
+    把 new_files 添加到所有 model_json_paths；jsonl_path 不为空时同一事务内更新其 summary 行。
+    全部成功返回结果字典，失败抛出 BatchAddError（所有文件保持原样）。
+    """
+    valid_files, skipped_files = collect_new_files(new_files, prefix)
+    # added_per_model: {model.json 路径: 实际新增的条目数}（已登记过的同名同文件条目不重复添加）
+    result = {"updated": [], "skipped_files": skipped_files, "added_per_model": {}, "summary_updated": False}
+    if not valid_files:
+        return result
+
+    targets = []
+    for path in model_json_paths:
+        path = os.path.normpath(os.path.abspath(path))
+        if path not in targets:
+            targets.append(path)
+    if not targets:
+        return result
+
+    prepared = {}   # 目标 -> _prepare_model 的返回值
+    committed = []  # 已替换的目标
+    jsonl_original = jsonl_tmp = None
+    try:
+        # —— 准备阶段：并发生成所有新内容
+        max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4, len(targets))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_prepare_model, p, valid_files): p for p in targets}
+            errors = []
+            for fut, path in futures.items():
+                try:
+                    prepared[path] = fut.result()
+                except Exception as e:
+                    errors.append(f"{path}: {e}")
+            if errors:
+                raise BatchAddError("准备阶段失败：\n" + "\n".join(errors))
+
+        if jsonl_path:
+            with open(jsonl_path, "rb") as f:
+                jsonl_original = f.read()
+            lines = jsonl_original.decode("utf-8").splitlines(keepends=True)
+            records, old_summary = _split_jsonl(lines)
+            if records and not records[-1].endswith("\n"):
+                records[-1] += "\n"
+            summary = _recomputed_summary(records, jsonl_path, old_summary, prepared)
+            new_text = "".join(records) + json.dumps(summary, ensure_ascii=False) + "\n"
+            if new_text.encode("utf-8") != jsonl_original:
+                jsonl_tmp = _write_temp(jsonl_path, new_text)
+
+        # —— 提交阶段
+        for path in targets:
+            if prepared[path][1] is None:
+                continue  # 没有新增条目，不动原文件
+            os.replace(prepared[path][1], path)
+            committed.append(path)
+        if jsonl_tmp:
+            os.replace(jsonl_tmp, jsonl_path)
+            jsonl_tmp = None
+            result["summary_updated"] = True
+    except BaseException as e:
+        rollback_errors = []
+        for path in committed:
+            try:
+                restore_tmp = _write_temp(path, prepared[path][0].decode("utf-8"))
+                os.replace(restore_tmp, path)
+            except Exception as re:
+                rollback_errors.append(f"{path}: {re}")
+        for path, (_, tmp_path, _, _) in prepared.items():
+            if path not in committed and tmp_path:
+                _remove_quietly(tmp_path)
+        if jsonl_tmp:
+            _remove_quietly(jsonl_tmp)
+        if rollback_errors:
+            raise BatchAddError(f"写入失败且部分文件回滚失败：{e}\n" + "\n".join(rollback_errors)) from e
+        if isinstance(e, BatchAddError):
+            raise
+        raise BatchAddError(f"写入失败，已回滚全部修改：{e}") from e
+
+    # updated 只列出实际改写过的 model.json
+    result["updated"] = committed
+    result["added_per_model"] = {path: prepared[path][3] for path in targets}
+    return result
+
+
+def batch_add_to_jsonl(jsonl_path, new_files, prefix="", max_workers=None):
+    """解析 JSONL 中每行的 path，事务方式批量添加动作/表情并更新 summary"""
+    jsonl_dir = os.path.dirname(os.path.abspath(jsonl_path))
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    model_paths, invalid_lines = [], []
+    for idx, line in enumerate(lines):
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        model_path = obj.get("path") if isinstance(obj, dict) else None
+        if not model_path:
+            continue
+        abs_model_path = os.path.normpath(os.path.join(jsonl_dir, model_path))
+        if not os.path.isfile(abs_model_path):
+            abs_model_path = _resolve_model_path(jsonl_dir, model_path)
+        if not abs_model_path:
+            invalid_lines.append((idx + 1, model_path))
+            continue
+        model_paths.append(abs_model_path)
+
+    result = batch_add_to_models(model_paths, new_files, prefix, jsonl_path=jsonl_path, max_workers=max_workers)
+    result["invalid_lines"] = invalid_lines
+    return result
@@ -0,0 +1,152 @@
+"""
+批量解析整个 figure 目录下所有模型的部件/参数
+
+- 每个工作进程各自持有一个隐藏 GL 上下文（或直接用 .moc 读取器），互不干扰
+- 结果按完成顺序流式返回
+- 支持通过 threading.Event 取消：未开始的任务直接丢弃
+- 主进程先查元数据缓存，命中的模型不再派发给工作进程
+"""
+import os
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional
+
+from sections.gen_jsonl import is_valid_live2d_json
+from sections.moc_reader import resolve_moc_path
+from sections import py_live2d_editor
+
+
+@dataclass
+class IntrospectResult:
+    path: str
+    part_ids: List[str] = field(default_factory=list)
+    params: List[dict] = field(default_factory=list)  # [{"id", "default", "min", "max", "value"}]
+    error: Optional[str] = None
+    cached: bool = False
+
+
+def find_model_jsons(root_dir) -> List[str]:
+    """递归查找 root_dir 下所有 Live2D 的 model.json"""
+    found = []
+    for root, dirs, files in os.walk(root_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(".json"):
+                continue
+            full_path = os.path.normpath(os.path.join(root, name))
+            if is_valid_live2d_json(full_path):
+                found.append(full_path)
+    return found
+
+
+def _worker_init(backend):
+    # 工作进程里不碰 SQLite，缓存统一由主进程读写
+    py_live2d_editor.set_introspection_backend(backend)
+
+
+def _worker_introspect(model_json_path, backend):
+    part_ids, params = py_live2d_editor._introspect_uncached(model_json_path, backend)
+    return list(part_ids), list(params)
+
+
+def _cache_lookup(cache, model_json_path):
+    if cache is None:
+        return None, None
+    try:
+        moc_path = resolve_moc_path(model_json_path)
+        return moc_path, cache.get(moc_path)
+    except Exception:
+        return None, None
+
+
+def iter_introspect(model_paths: Iterable[str], backend=None, max_workers=None,
+                    cancel_event=None) -> Iterator[IntrospectResult]:
+    """
+    并行解析多个 model.json，按完成顺序 yield IntrospectResult。
+    cancel_event 被 set 后停止派发并丢弃尚未开始的任务。
+    """
+    backend = backend or py_live2d_editor.get_introspection_backend()
+    cache = py_live2d_editor.get_meta_cache()
+
+    pending_paths = []
+    moc_paths = {}
+    for path in model_paths:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        moc_path, cached = _cache_lookup(cache, path)
+        if cached is not None:
+            yield IntrospectResult(path, list(cached[0]), list(cached[1]), cached=True)
+            continue
+        moc_paths[path] = moc_path
+        pending_paths.append(path)
+
+    if not pending_paths:
+        return
+
+    max_workers = max_workers or min(len(pending_paths), os.cpu_count() or 1)
+    # 用 spawn 启动：fork 会把主进程里已有的 GL/pygame 状态复制过去
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_worker_init,
+        initargs=(backend,),
+    )
+    cancelled = False
+    try:
+        futures = {executor.submit(_worker_introspect, p, backend): p for p in pending_paths}
+        not_done = set(futures)
+        while not_done:
+            if cancel_event is not None and cancel_event.is_set():
+                cancelled = True
+                return
+            done, not_done = wait(not_done, timeout=0.2, return_when=FIRST_COMPLETED)
+            for fut in done:
+                path = futures[fut]
+                try:
+                    part_ids, params = fut.result()
+                except Exception as e:
+                    yield IntrospectResult(path, error=str(e))
+                    continue
+
+                moc_path = moc_paths.get(path)
+                if cache is not None and moc_path:
+                    try:
+                        cache.put(moc_path, part_ids, params)
+                    except Exception as e:
+                        print(f"⚠️ 写入元数据缓存失败: {moc_path}, 原因: {e}")
+                yield IntrospectResult(path, part_ids, params)
+    finally:
+        executor.shutdown(wait=not cancelled, cancel_futures=True)
+
+
+def introspect_tree(root_dir, backend=None, max_workers=None, cancel_event=None, progress_callback=None):
+    """
+    解析 root_dir（如 game/figure）下所有模型，返回 {model.json 路径: IntrospectResult}。
+    progress_callback(done, total, result) 每完成一个模型调用一次。
+    """
+    paths = find_model_jsons(root_dir)
+    results = {}
+    for result in iter_introspect(paths, backend, max_workers, cancel_event):
+        results[result.path] = result
+        if progress_callback:
+            progress_callback(len(results), len(paths), result)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    root = sys.argv[1] if len(sys.argv) > 1 else input("请输入 figure 目录路径：\n> ").strip().strip('"')
+    backend = sys.argv[2] if len(sys.argv) > 2 else None
+    t0 = time.perf_counter()
+
+    def _report(done, total, r):
+        mark = "❌" if r.error else ("⚡" if r.cached else "✅")
+        detail = r.error or f"部件 {len(r.part_ids)} 个，参数 {len(r.params)} 个"
+        print(f"{mark} [{done}/{total}] {os.path.relpath(r.path, root)}: {detail}")
+
+    all_results = introspect_tree(root, backend, progress_callback=_report)
+    failed = sum(1 for r in all_results.values() if r.error)
+    print(f"\n📊 共 {len(all_results)} 个模型，失败 {failed} 个，用时 {time.perf_counter() - t0:.1f} 秒")
@@ -0,0 +1,178 @@
+# sections/exp_merge.py
+"""
+一念神魔：按 exps.json 的左右脸分类合并 .exp.json 表情
+
+规则（与 merge_exp_faces_with_mapping 一致）：
+  - 左脸参数用左文件，右脸参数用右文件
+  - 中心参数优先用左文件，左文件没有时用右文件
+  - 未分类参数统一用右文件
+exps.json 只编译一次成 {参数 id: 侧} 查找表；输出参数顺序固定（左文件顺序在前，右文件新增的在后）。
+批量模式生成 左表情列表 × 右表情列表 的全部组合，文件名确定：<左>__<右>.exp.json
+（从目录收集时用相对路径，如 a-smile__b-cry.exp.json，保证不同子目录的同名表情不会互相覆盖），
+并行写出，可选把结果登记到一个或多个 model.json。
+"""
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.common import atomic_write_json
+
+LEFT, RIGHT, CENTER = "left", "right", "center"
+_SIDE_KEYS = (("left_face", LEFT), ("right_face", RIGHT), ("center_face", CENTER))
+EXP_SUFFIX = ".exp.json"
+
+
+def compile_face_map(face_map) -> dict:
+    """exps.json 路径或已加载的字典 -> {参数 id: left/right/center}"""
+    if isinstance(face_map, str):
+        with open(face_map, "r", encoding="utf-8") as f:
+            face_map = json.load(f)
+    lookup = {}
+    for key, side in _SIDE_KEYS:
+        for pid in face_map.get(key, []):
+            lookup.setdefault(pid, side)
+    return lookup
+
+
+def merge_exp_data(left_data: dict, right_data: dict, side_map: dict) -> dict:
+    left_params = {p["id"]: p for p in left_data.get("params", [])}
+    right_params = {p["id"]: p for p in right_data.get("params", [])}
+
+    merged_params = []
+    for pid in dict.fromkeys(list(left_params) + list(right_params)):
+        side = side_map.get(pid)
+        if side == LEFT:
+            param = left_params.get(pid)
+        elif side == CENTER:
+            param = left_params.get(pid) or right_params.get(pid)
+        else:
+            # 右脸和未分类 → 使用右脸的值
+            param = right_params.get(pid)
+        if param is not None:
+            merged_params.append(param)
+
+    return {
+        "fade_in": left_data.get("fade_in", 500),
+        "fade_out": left_data.get("fade_out", 500),
+        "params": merged_params
+    }
+
+
+def exp_stem(path: str) -> str:
+    """去掉 .exp.json；相对路径里的子目录用 - 连接（a/smile.exp.json -> a-smile）"""
+    name = path[:-len(EXP_SUFFIX)] if path.endswith(EXP_SUFFIX) else os.path.splitext(path)[0]
+    return "-".join(part for part in name.replace("\\", "/").split("/") if part)
+
+
+def combo_name(left_path: str, right_path: str) -> str:
+    return f"{exp_stem(os.path.basename(left_path))}__{exp_stem(os.path.basename(right_path))}"
+
+
+def _unique_labels(items) -> dict:
+    labels = {}
+    used = set()
+    for path, label in items:
+        if path in labels:
+            continue
+        final, i = label, 2
+        while final in used:
+            final = f"{label}_{i}"
+            i += 1
+        used.add(final)
+        labels[path] = final
+    return labels
+
+
+def _without_dir(paths, exclude_dir):
+    """去掉 exclude_dir（输出目录）下的文件，避免输出目录在来源目录里时把上次的结果当成输入"""
+    if not exclude_dir:
+        return paths
+    out_abs = os.path.abspath(exclude_dir)
+    return [p for p in paths if not os.path.abspath(p).startswith(out_abs + os.sep)]
+
+
+def _collect(paths_or_dir, exclude_dir=None):
+    """返回 {路径: 输出文件名用的标签}；目录按相对路径取标签，重名时加 _2、_3…"""
+    if isinstance(paths_or_dir, str):
+        if os.path.isdir(paths_or_dir):
+            paths = _without_dir(sorted(
+                os.path.join(root, f)
+                for root, _, files in os.walk(paths_or_dir)
+                for f in files if f.endswith(EXP_SUFFIX)
+            ), exclude_dir)
+            return _unique_labels((p, exp_stem(os.path.relpath(p, paths_or_dir))) for p in paths)
+        paths_or_dir = [p for p in paths_or_dir.split(";") if p.strip()]
+    paths = [p.strip().strip('"') for p in paths_or_dir]
+    return _unique_labels((p, exp_stem(os.path.basename(p))) for p in paths)
+
+
+def batch_merge_exp_faces(left_sources, right_sources, exps_json_path, output_dir,
+                          model_json_paths=None, prefix="", max_workers=None):
+    """
+    生成 左 × 右 的全部组合（左右为同一文件时跳过）。
+    left_sources / right_sources 可以是目录、用 ; 分隔的字符串或路径列表。
+    model_json_paths 不为空时，所有生成的表情以事务方式登记到这些 model.json（名称加 prefix）。
+    返回 [{"file", "action", "status", "reason"}]
+    """
+    side_map = compile_face_map(exps_json_path)
+    lefts = _collect(left_sources, output_dir)
+    rights = _collect(right_sources, output_dir)
+
+    # 每个表情只读一次
+    loaded = {}
+    for path in dict.fromkeys(list(lefts) + list(rights)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                loaded[path] = json.load(f)
+        except Exception as e:
+            loaded[path] = e
+
+    def _one(left_path, right_path, out_path):
+        result = {"file": out_path, "action": "合并表情", "status": "failed", "reason": ""}
+        for path in (left_path, right_path):
+            if isinstance(loaded[path], Exception):
+                result["reason"] = f"{os.path.basename(path)} 读取失败：{loaded[path]}"
+                return result
+        try:
+            atomic_write_json(out_path, merge_exp_data(loaded[left_path], loaded[right_path], side_map))
+        except Exception as e:
+            result["reason"] = str(e)
+            return result
+        result["status"] = "exported"
+        result["reason"] = f"左：{os.path.basename(left_path)}，右：{os.path.basename(right_path)}"
+        return result
+
+    os.makedirs(output_dir, exist_ok=True)
+    # 提交前检查输出文件名冲突：并发写同一个文件会互相覆盖，后出现的组合记为跳过
+    combos, collisions = [], []
+    owners = {}
+    for l in lefts:
+        for r in rights:
+            if os.path.abspath(l) == os.path.abspath(r):
+                continue
+            out_path = os.path.join(output_dir, f"{lefts[l]}__{rights[r]}{EXP_SUFFIX}")
+            key = os.path.normcase(os.path.abspath(out_path))
+            if key in owners:
+                collisions.append({"file": out_path, "action": "合并表情", "status": "skipped",
+                                   "reason": f"与 {owners[key]} 输出到同一文件，跳过：{l} + {r}"})
+                continue
+            owners[key] = f"{os.path.basename(l)} + {os.path.basename(r)}"
+            combos.append((l, r, out_path))
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda args: _one(*args), combos)) + collisions
+
+    if model_json_paths:
+        from sections.batch_add_engine import BatchAddError, batch_add_to_models
+        outputs = [r["file"] for r in results if r["status"] == "exported"]
+        try:
+            added = sum(batch_add_to_models(model_json_paths, outputs, prefix)["added_per_model"].values())
+            note = f"，已登记到 {len(model_json_paths)} 个 model.json"
+            print(f"✅ 已向 {len(model_json_paths)} 个 model.json 新增 {added} 个表情条目（已登记的跳过）")
+        except BatchAddError as e:
+            note = f"，登记 model.json 失败：{e}"
+            print(f"❌ 登记 model.json 失败：{e}")
+        for r in results:
+            if r["status"] == "exported":
+                r["reason"] += note
+    return results
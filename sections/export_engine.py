@@ -0,0 +1,238 @@
+"""
+动作/表情集中导出引擎（expnmtn）
+
+- 持久化分批进行：导出过程中不逐个 fsync，finish() 时每个目标目录统一落盘一次
+- 复制方式：普通复制 / 硬链接 / 写时复制（reflink，Linux 的 FICLONE），
+  源和目标不在同一文件系统或不支持时自动退回普通复制
+- 目标目录里已有相同内容的文件时直接跳过，不再生成 xxx_1 / xxx_2
+- 可在多个线程中并发调用 export()
+"""
+import os
+import errno
+import shutil
+import hashlib
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+EXPORT_MODES = ("copy", "move", "hardlink", "reflink")
+MODE_LABELS = {"copy": "复制", "move": "移动", "hardlink": "硬链接", "reflink": "写时复制"}
+
+# linux/fs.h: #define FICLONE _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+
+def _fsync_path(path: str, directory: bool = False):
+    try:
+        if directory:
+            if os.name == "nt":
+                return
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        else:
+            fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """尝试写时复制；不支持时返回 False 且不留下目标文件"""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as fs, open(dst, "xb") as fd:
+            fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+    except OSError:
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+class ExportEngine:
+    def __init__(self, mode: str = "copy"):
+        if mode not in EXPORT_MODES:
+            raise ValueError(f"未知的导出方式：{mode}")
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._dir_index = {}     # 目标目录 -> {文件大小: [路径]}
+        self._digests = {}       # 路径 -> sha1
+        self._pending_digests = {}  # 已预定但还没算摘要的目标 -> 它的源文件（需要比对时再算）
+        self._reserved = set()   # 已被预定但可能还没写完的目标路径
+        self._dirty_files = set()  # 结束时需要落盘的文件
+        self._dirty_dirs = set()   # 结束时需要落盘的目录
+
+    # ----- 目标目录索引 -----
+    def _index_for(self, export_dir: str) -> dict:
+        index = self._dir_index.get(export_dir)
+        if index is None:
+            index = {}
+            try:
+                with os.scandir(export_dir) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            index.setdefault(entry.stat().st_size, []).append(entry.path)
+            except FileNotFoundError:
+                pass
+            self._dir_index[export_dir] = index
+        return index
+
+    def _fill_digests(self, paths):
+        """
+        在锁外计算目标目录中已有文件的摘要（读不了的记为 None，不参与比较）。
+        本次导出时没算过摘要的目标，直接对它的源文件求摘要（目标可能还没写完）。
+        """
+        for path in paths:
+            with self._lock:
+                source = self._pending_digests.get(path, path)
+            try:
+                digest = _file_digest(source)
+            except OSError:
+                # 移动模式下源文件已经改名到目标
+                try:
+                    digest = _file_digest(path) if source != path else None
+                except OSError:
+                    digest = None
+            with self._lock:
+                self._pending_digests.pop(path, None)
+                self._digests.setdefault(path, digest)
+
+    def _reserve_name(self, dst_path: str) -> str:
+        name, ext = os.path.splitext(os.path.basename(dst_path))
+        folder = os.path.dirname(dst_path)
+        final_dst = dst_path
+        i = 1
+        while final_dst in self._reserved or os.path.exists(final_dst):
+            final_dst = os.path.join(folder, f"{name}_{i}{ext}")
+            i += 1
+        self._reserved.add(final_dst)
+        return final_dst
+
+    def _plan(self, src: str, export_dir: str):
+        """返回 (目标路径, None) 或 (None, 已存在的相同内容文件)"""
+        size = os.path.getsize(src)
+        digest = None  # 只有目标目录里有同大小的文件时才需要比对内容
+        while True:
+            with self._lock:
+                bucket = self._index_for(export_dir).setdefault(size, [])
+                missing = [p for p in bucket if p not in self._digests]
+                if not bucket or (digest is not None and not missing):
+                    for existing in bucket:
+                        if self._digests[existing] == digest:
+                            return None, existing
+                    final_dst = self._reserve_name(os.path.join(export_dir, os.path.basename(src)))
+                    # 先登记，让并发导出的同内容文件也能识别为重复
+                    bucket.append(final_dst)
+                    if digest is not None:
+                        self._digests[final_dst] = digest
+                    else:
+                        self._pending_digests[final_dst] = src
+                    return final_dst, None
+            # 哈希放在锁外做，不阻塞其它线程
+            if digest is None:
+                digest = _file_digest(src)
+            self._fill_digests(missing)
+
+    def _forget(self, final_dst: str, export_dir: str):
+        with self._lock:
+            for bucket in self._dir_index.get(export_dir, {}).values():
+                if final_dst in bucket:
+                    bucket.remove(final_dst)
+            self._digests.pop(final_dst, None)
+            self._pending_digests.pop(final_dst, None)
+
+    # ----- 导出 -----
+    def _copy(self, src: str, dst: str):
+        shutil.copy2(src, dst)
+        with self._lock:
+            self._dirty_files.add(dst)
+
+    def _transfer(self, src: str, dst: str) -> str:
+        """执行导出，返回实际使用的方式"""
+        if self.mode == "move":
+            try:
+                os.rename(src, dst)
+                with self._lock:
+                    self._dirty_dirs.add(os.path.dirname(src))
+                return "move"
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+            # 跨盘：先确保目标落盘再删源文件
+            shutil.copy2(src, dst)
+            _fsync_path(dst)
+            os.unlink(src)
+            with self._lock:
+                self._dirty_dirs.add(os.path.dirname(src))
+            return "move(复制+删除)"
+
+        if self.mode == "hardlink":
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except OSError:
+                self._copy(src, dst)
+                return "copy(硬链接不可用)"
+
+        if self.mode == "reflink":
+            if _reflink(src, dst):
+                return "reflink"
+            self._copy(src, dst)
+            return "copy(reflink 不可用)"
+
+        self._copy(src, dst)
+        return "copy"
+
+    def export(self, src: str, export_dir: str) -> dict:
+        """
+        导出单个文件，返回 {"file", "action", "status", "reason"}；
+        status: exported（已导出）/ skipped（目标已有相同内容）
+        """
+        action = MODE_LABELS[self.mode]
+        final_dst, duplicate = self._plan(src, export_dir)
+        if duplicate is not None:
+            reason = f"目标已有相同内容：{os.path.basename(duplicate)}"
+            if self.mode == "move":
+                # 内容已在 expnmtn 中，移动语义下源文件可以删掉
+                os.unlink(src)
+                with self._lock:
+                    self._dirty_dirs.add(os.path.dirname(src))
+                reason += "，已删除源文件"
+            return {"file": src, "action": action, "status": "skipped", "reason": reason}
+
+        try:
+            used = self._transfer(src, final_dst)
+        except BaseException:
+            self._forget(final_dst, export_dir)
+            raise
+        with self._lock:
+            self._dirty_dirs.add(export_dir)
+        return {"file": src, "action": action, "status": "exported", "reason": f"{used} → {final_dst}"}
+
+    def finish(self):
+        """统一落盘：先写入的文件，再每个目录一次"""
+        with self._lock:
+            files, dirs = list(self._dirty_files), list(self._dirty_dirs)
+            self._dirty_files.clear()
+            self._dirty_dirs.clear()
+        for path in files:
+            _fsync_path(path)
+        for path in dirs:
+            _fsync_path(path, directory=True)
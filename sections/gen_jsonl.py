@@ -2,18 +2,18 @@
 import codecs
 import os
 import json
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
+from sections.live2d_json_sniffer import get_json_cache
+from sections.jsonl_document import write_jsonl
+from sections.jsonl_summary import JsonlSummary, load_model_names
+
 
 def is_valid_live2d_json(file_path):
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        required_keys = ["version", "layout", "model"]
-        return all(k in data for k in required_keys)
-    except Exception:
-        return False
+    """只嗅探文件开头判断是否为模型 json，结果按 (路径, 大小, 修改时间) 持久缓存"""
+    return get_json_cache().is_valid(file_path)
 
 
 def find_live2d_json_file(folder_path, max_depth=2):
@@ -46,20 +46,41 @@ def find_live2d_json_file(folder_path, max_depth=2):
     _walk(folder_path, 0)
     return json_files
 
-def collect_jsons_to_jsonl(root_dir, output_path, id_prefix, base_folder_name, selected_relative_paths):
+def collect_jsons_to_jsonl(root_dir, output_path, id_prefix, base_folder_name, selected_relative_paths,
+                           max_workers=None):
     # Rename 'folder_list' to 'selected_relative_paths' for clarity as it contains relative file paths.
-    index = 0
-    records = []
-    motions_by_name = defaultdict(int)
-    expressions_by_name = set()
+    # model.json 在有界线程池里并发解析（最多同时排队 max_workers * 2 个），按原顺序逐条取结果写出，
+    # motions / expressions 统计由 JsonlSummary 边读边累加，不需要在内存里保留全部模型数据。
+    summary = JsonlSummary()
     index1_json_path = None
 
-    with open(output_path, 'w', encoding='utf-8') as outfile:
-        for relative_path_with_file in selected_relative_paths:
+    max_workers = max_workers or min(16, (os.cpu_count() or 1) + 4)
+    window = max_workers * 2
+    jobs = iter(enumerate(selected_relative_paths))
+    pending = deque()
+
+    with open(output_path, 'w', encoding='utf-8') as outfile, \
+            ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def _submit_next():
+            try:
+                index, relative_path_with_file = next(jobs)
+            except StopIteration:
+                return False
             # Construct the absolute path using os.path.join.
             # os.path.normpath will clean up redundant slashes and ensure
             # platform-appropriate separators.
             abs_path = os.path.normpath(os.path.join(root_dir, relative_path_with_file))
+            future = pool.submit(load_model_names, abs_path)
+            pending.append((index, relative_path_with_file, abs_path, future))
+            return True
+
+        while len(pending) < window and _submit_next():
+            pass
+
+        while pending:
+            index, relative_path_with_file, abs_path, future = pending.popleft()
+            _submit_next()
 
             # Extract the actual folder name from the relative path for the "folder" field
             # e.g., "爱音比心/爱音.model.json" -> "爱音比心"
@@ -67,7 +88,6 @@ def collect_jsons_to_jsonl(root_dir, output_path, id_prefix, base_folder_name, s
             if not folder_part: # If the file is directly in root_dir, folder_part would be empty
                 folder_part = "." # Or you can use a placeholder like "root" or ""
 
-
             record = {
                 "index": index,
                 "id": f"{id_prefix}{index}",
@@ -75,54 +95,28 @@ def collect_jsons_to_jsonl(root_dir, output_path, id_prefix, base_folder_name, s
                 "folder": folder_part
             }
             outfile.write(json.dumps(record, ensure_ascii=False) + '\n')
-            records.append(record)
 
             try:
-                # Use the normalized absolute path to open the file
-                with open(abs_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                motions = data.get("motions", {})
-                for motion_name in motions:
-                    motions_by_name[motion_name] += 1
-
-                expressions = data.get("expressions", [])
-                for exp in expressions:
-                    if isinstance(exp, dict) and "name" in exp:
-                        expressions_by_name.add(exp["name"])
+                summary.add_model(index, *future.result())
             except Exception as e:
+                # 解析失败的模型也计入模型数（动作交集因此为空）
+                summary.add_model(index)
                 print(f"❌ JSON解析失败: {abs_path}, 错误: {e}") # Print abs_path to debug if it fails again
 
             if index == 1:
                 index1_json_path = abs_path # Store the normalized absolute path
 
-            index += 1
-
-        # motions: 必须所有模型都有的
-        required_count = len(records)
-        filtered_motion_names = sorted([
-            name for name, count in motions_by_name.items()
-            if count == required_count
-        ])
-        filtered_expression_names = sorted(list(expressions_by_name))
-
-        # 添加 motions + expressions 行
-        meta_record = {
-            "motions": filtered_motion_names,
-            "expressions": filtered_expression_names
-        }
+        # 添加 motions + expressions 行（motions: 必须所有模型都有的）
+        meta_record = summary.to_dict()
         outfile.write(json.dumps(meta_record, ensure_ascii=False) + '\n')
 
 
-
 import os
 import json
 
 
-def conf_to_jsonl_with_summary(conf_path, figure_root_dir):
-    output_dir = os.path.join(os.path.dirname(conf_path), "converted_jsonl")
-    os.makedirs(output_dir, exist_ok=True)
-
+def parse_conf(conf_path):
+    """读取 conf，返回 (名称, 全部模型路径, 偏移列表, import 值或 None)"""
     with open(conf_path, "r", encoding="utf-8") as f:
         lines = [line.strip() for line in f if line.strip()]
 
@@ -130,52 +124,67 @@ def conf_to_jsonl_with_summary(conf_path, figure_root_dir):
         raise ValueError("conf 文件格式不正确，至少需要 8 行")
 
     name = lines[0]
-    change_lines = lines[1].split("\\n")
     main_path = lines[2]
-    transform_lines = lines[3].split("\\n")
-    # lines[4] 是 transform 的基础行，跳过
+    # lines[1] / lines[3] 是 changeFigure / setTransform，lines[4] 是 transform 的基础行，都不需要
     other_paths = lines[5].split("\\n") if lines[5] else []
     offsets = list(map(float, lines[6].split(","))) if lines[6] else []
     import_value = int(lines[7]) if lines[7].isdigit() else None
+    return name, [main_path] + other_paths, offsets, import_value
 
-    all_paths = [main_path] + other_paths
-    jsonl_lines = []
 
+def _conf_model_json(figure_root_dir, path):
+    return os.path.normpath(os.path.join(figure_root_dir, os.path.dirname(path), "model.json"))
+
+
+def _conf_records(all_paths, offsets):
+    records = []
     for idx, full_path in enumerate(all_paths):
-        id_str = f"myid{idx}"
-        filename = os.path.basename(full_path)
         entry = {
             "index": idx,
-            "id": id_str,
-            "path": filename,
+            "id": f"myid{idx}",
+            "path": os.path.basename(full_path),
             "folder": "."
         }
-
         # 动态偏移，只在非主模型上添加 y 值
         if idx > 0 and (2 * (idx - 1) + 1) < len(offsets):
             entry["y"] = float(offsets[2 * (idx - 1) + 1])
+        records.append(entry)
+    return records
 
-        jsonl_lines.append(entry)
 
-    # 扫描 motion / expression
+def _load_conf_model_names(model_json_paths, model_names=None, max_workers=None):
+    """
+    并行读取 model.json 的动作/表情名，结果写进 model_names 字典（{路径: (动作名, 表情名) 或 None}）。
+    已在字典里的路径不再读取；不存在或解析失败的记为 None。
+    """
+    model_names = {} if model_names is None else model_names
+    to_load = sorted({p for p in model_json_paths if p not in model_names})
+
+    def _load(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            return load_model_names(path)
+        except Exception:
+            return None
+
+    if to_load:
+        max_workers = max_workers or min(16, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for path, names in zip(to_load, pool.map(_load, to_load)):
+                model_names[path] = names
+    return model_names
+
+
+def _conf_summary(model_json_paths, model_names, import_value):
+    # conf 转出的 JSONL 沿用原来的规则：动作和表情都取并集
     motions_set = set()
     expressions_set = set()
-    for path in all_paths:
-        model_dir = os.path.join(figure_root_dir, os.path.dirname(path))
-        model_json_path = os.path.join(model_dir, "model.json")
-        if os.path.exists(model_json_path):
-            try:
-                with open(model_json_path, "r", encoding="utf-8") as mf:
-                    model_data = json.load(mf)
-                    motions = model_data.get("motions", {})
-                    expressions = model_data.get("expressions", {})
-
-                    for key in motions.keys():
-                        motions_set.add(key)
-                    for key in expressions.keys():
-                        expressions_set.add(key)
-            except Exception:
-                pass
+    for path in model_json_paths:
+        names = model_names.get(path)
+        if names:
+            motions_set.update(names[0])
+            expressions_set.update(names[1])
 
     summary = {
         "motions": sorted(motions_set),
@@ -183,11 +192,91 @@ def conf_to_jsonl_with_summary(conf_path, figure_root_dir):
     }
     if import_value is not None:
         summary["import"] = import_value
+    return summary
 
-    jsonl_output_path = os.path.join(output_dir, f"{name}.jsonl")
-    with open(jsonl_output_path, "w", encoding="utf-8") as f:
-        for line in jsonl_lines:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
-        f.write(json.dumps(summary, ensure_ascii=False) + "\n")
 
+def conf_to_jsonl_with_summary(conf_path, figure_root_dir, output_dir=None, model_names=None):
+    """
+    把一个 conf 转成 JSONL（默认输出到 conf 同目录的 converted_jsonl/）。
+    model_names: 可选的 {model.json 路径: (动作名, 表情名)} 缓存，批量转换时在多个 conf 间共用
+    """
+    output_dir = output_dir or os.path.join(os.path.dirname(conf_path), "converted_jsonl")
+    os.makedirs(output_dir, exist_ok=True)
+
+    name, all_paths, offsets, import_value = parse_conf(conf_path)
+    model_json_paths = [_conf_model_json(figure_root_dir, p) for p in all_paths]
+    model_names = _load_conf_model_names(model_json_paths, model_names)
+
+    jsonl_output_path = os.path.join(output_dir, f"{name}.jsonl")
+    write_jsonl(
+        jsonl_output_path,
+        _conf_records(all_paths, offsets),
+        _conf_summary(model_json_paths, model_names, import_value),
+    )
     return jsonl_output_path
+
+
+def batch_conf_to_jsonl(conf_dir, figure_root_dir, output_dir=None, max_workers=None):
+    """
+    把目录（含子目录）下的全部 .conf 转成 JSONL，默认输出到 conf_dir/converted_jsonl/。
+    先解析所有 conf，把引用到的 model.json 去重后并行读取一次，再并行写出各个 JSONL。
+    返回 [{"file", "action", "status", "reason"}]
+    """
+    output_dir = output_dir or os.path.join(conf_dir, "converted_jsonl")
+    conf_paths = sorted(
+        os.path.join(root, f)
+        for root, _, files in os.walk(conf_dir)
+        for f in files if f.lower().endswith(".conf")
+    )
+
+    results = []
+    parsed = []
+    seen_names = {}
+    for conf_path in conf_paths:
+        try:
+            name, all_paths, offsets, import_value = parse_conf(conf_path)
+        except Exception as e:
+            results.append({"file": conf_path, "action": "conf 转 JSONL", "status": "failed", "reason": str(e)})
+            continue
+        if name in seen_names:
+            # 名称相同会写到同一个 JSONL，保留先出现的
+            results.append({"file": conf_path, "action": "conf 转 JSONL", "status": "skipped",
+                            "reason": f"名称 {name} 与 {os.path.basename(seen_names[name])} 重复"})
+            continue
+        seen_names[name] = conf_path
+        model_json_paths = [_conf_model_json(figure_root_dir, p) for p in all_paths]
+        parsed.append((conf_path, name, all_paths, offsets, import_value, model_json_paths))
+
+    model_names = _load_conf_model_names(
+        [p for item in parsed for p in item[5]], max_workers=max_workers
+    )
+
+    def _one(item):
+        conf_path, name, all_paths, offsets, import_value, model_json_paths = item
+        out_path = os.path.join(output_dir, f"{name}.jsonl")
+        result = {"file": conf_path, "action": "conf 转 JSONL", "status": "failed", "reason": ""}
+        try:
+            write_jsonl(
+                out_path,
+                _conf_records(all_paths, offsets),
+                _conf_summary(model_json_paths, model_names, import_value),
+            )
+        except Exception as e:
+            result["reason"] = str(e)
+            return result
+        missing = sum(model_names.get(p) is None for p in model_json_paths)
+        result["status"] = "exported"
+        result["reason"] = f"→ {os.path.basename(out_path)}" + (
+            f"（{missing} 个 model.json 找不到或无法解析）" if missing else ""
+        )
+        return result
+
+    if parsed:
+        os.makedirs(output_dir, exist_ok=True)
+        max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results.extend(pool.map(_one, parsed))
+
+    ok = sum(r["status"] == "exported" for r in results)
+    print(f"✅ 已转换 {ok}/{len(conf_paths)} 个 conf，涉及 {len(model_names)} 个 model.json（每个只读取一次），输出到 {output_dir}")
+    return results
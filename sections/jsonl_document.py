@@ -0,0 +1,274 @@
+# sections/jsonl_document.py
+"""
+JSONL 文档层：按行字节偏移随机读写
+
+打开时顺序扫描一遍，记录每个非空行的 (偏移, 长度)，并找出 summary 行（含 motions/expressions 的最后一行）；
+索引按 (路径, 大小, 修改时间) 缓存在进程内，同一文件再次打开不用重新扫描。
+  - 读 summary / 某一条记录：seek 到对应偏移只读那一行
+  - 改一条记录或 summary：新内容不比原来长时，用空格补齐后原地覆盖（JSON 允许尾随空白）
+  - 新内容更长：整体写临时文件再 os.replace 原子替换，并平移后续行的偏移
+  - 追加记录：从 summary 行处开始只重写文件尾部
+文件被外部修改过（大小或修改时间对不上）时自动重建索引。
+"""
+import os
+import json
+import shutil
+import tempfile
+import threading
+
+from sections.jsonl_summary import is_summary_line
+from utils.common import atomic_write_text
+
+_index_cache = {}   # 绝对路径 -> (size, mtime_ns, spans, summary_pos)
+_cache_lock = threading.Lock()
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _scan(path):
+    """返回 (spans, summary_pos)；spans 为 [(偏移, 内容长度, 行尾长度)]，只含非空行"""
+    spans = []
+    summary_pos = None
+    offset = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            eol = 2 if raw.endswith(b"\r\n") else (1 if raw.endswith(b"\n") else 0)
+            content = raw[:len(raw) - eol]
+            if content.strip():
+                # 只有疑似 summary 的行才解析
+                if b'"motions"' in content or b'"expressions"' in content:
+                    try:
+                        if is_summary_line(json.loads(content.decode("utf-8"))):
+                            summary_pos = len(spans)
+                    except ValueError:
+                        pass
+                spans.append((offset, len(content), eol))
+            offset += len(raw)
+    return spans, summary_pos
+
+
+class JsonlDocument:
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._load_index()
+
+    # ----- 索引 -----
+    def _load_index(self, force=False):
+        st = os.stat(self.path)
+        with _cache_lock:
+            cached = _index_cache.get(self.path)
+        if not force and cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            self._spans, self._summary_pos = list(cached[2]), cached[3]
+        else:
+            self._spans, self._summary_pos = _scan(self.path)
+        self._remember()
+
+    def _remember(self):
+        st = os.stat(self.path)
+        with _cache_lock:
+            _index_cache[self.path] = (st.st_size, st.st_mtime_ns, tuple(self._spans), self._summary_pos)
+
+    def _ensure_fresh(self):
+        st = os.stat(self.path)
+        with _cache_lock:
+            cached = _index_cache.get(self.path)
+        if not cached or cached[0] != st.st_size or cached[1] != st.st_mtime_ns:
+            self._load_index(force=True)
+
+    def _record_positions(self):
+        return [i for i in range(len(self._spans)) if i != self._summary_pos]
+
+    def _read_span(self, f, pos):
+        offset, length, _ = self._spans[pos]
+        f.seek(offset)
+        return json.loads(f.read(length).decode("utf-8"))
+
+    # ----- 读取 -----
+    def __len__(self):
+        return len(self._spans) - (self._summary_pos is not None)
+
+    def summary(self):
+        """summary 行字典；没有时返回 None"""
+        self._ensure_fresh()
+        if self._summary_pos is None:
+            return None
+        with open(self.path, "rb") as f:
+            return self._read_span(f, self._summary_pos)
+
+    def record(self, i: int):
+        self._ensure_fresh()
+        with open(self.path, "rb") as f:
+            return self._read_span(f, self._record_positions()[i])
+
+    def records(self):
+        """按顺序返回全部记录（跳过无法解析的行）"""
+        self._ensure_fresh()
+        result = []
+        with open(self.path, "rb") as f:
+            for pos in self._record_positions():
+                try:
+                    result.append(self._read_span(f, pos))
+                except ValueError:
+                    continue
+        return result
+
+    # ----- 写入 -----
+    def set_record(self, i: int, obj):
+        self.update({i: obj})
+
+    def set_summary(self, obj):
+        self.update({}, summary=obj)
+
+    def update(self, records: dict = None, summary=None):
+        """
+        一次性替换若干记录（{记录下标: 新对象}）和/或 summary。
+        全部不变长时原地覆盖，否则整体原子替换一次。
+        """
+        self._ensure_fresh()
+        positions = self._record_positions()
+        changes = {positions[i]: _dumps(obj) for i, obj in (records or {}).items()}
+        if summary is not None:
+            if self._summary_pos is None:
+                self.append_records([], summary=summary)
+                if not changes:
+                    return
+                self._ensure_fresh()
+            else:
+                changes[self._summary_pos] = _dumps(summary)
+        if not changes:
+            return
+
+        if all(len(data) <= self._spans[pos][1] for pos, data in changes.items()):
+            self._write_in_place(changes)
+        else:
+            self._rewrite(changes)
+
+    def _write_in_place(self, changes):
+        with open(self.path, "r+b") as f:
+            for pos, data in sorted(changes.items()):
+                offset, length, _ = self._spans[pos]
+                f.seek(offset)
+                f.write(data + b" " * (length - len(data)))
+            f.flush()
+            os.fsync(f.fileno())
+        self._remember()
+
+    def _rewrite(self, changes):
+        folder = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".jsonl", dir=folder)
+        new_spans = []
+        try:
+            with open(self.path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                src_pos = 0
+                shift = 0
+                for pos, (offset, length, eol) in enumerate(self._spans):
+                    # 行之间原样复制（空行等）
+                    src.seek(src_pos)
+                    dst.write(src.read(offset - src_pos))
+                    if pos in changes:
+                        data = changes[pos]
+                    else:
+                        src.seek(offset)
+                        data = src.read(length)
+                    new_spans.append((offset + shift, len(data), eol))
+                    dst.write(data)
+                    src.seek(offset + length)
+                    dst.write(src.read(eol))
+                    shift += len(data) - length
+                    src_pos = offset + length + eol
+                src.seek(src_pos)
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            shutil.copymode(self.path, tmp_path)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._spans = new_spans
+        self._remember()
+
+    def append_records(self, objs, summary=None):
+        """
+        在 summary 行之前追加记录（没有 summary 行时追加到末尾）；
+        summary 不为 None 时同时替换 summary。只重写 summary 行起的文件尾部。
+        """
+        self._ensure_fresh()
+        if summary is None and self._summary_pos is not None:
+            offset, length, _ = self._spans[self._summary_pos]
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                summary_data = f.read(length)
+        else:
+            summary_data = _dumps(summary) if summary is not None else None
+
+        if self._summary_pos is not None:
+            start = self._spans[self._summary_pos][0]
+            kept = self._spans[:self._summary_pos] + self._spans[self._summary_pos + 1:]
+            tail_spans = [s for s in kept if s[0] > start]
+            if tail_spans:
+                # summary 后面还有记录：统一走整体重写，保持 summary 在最后
+                records = self.records()
+                records.extend(objs)
+                self._write_all(records, summary if summary is not None else self.summary())
+                return
+            spans = kept
+        else:
+            st = os.stat(self.path)
+            start = st.st_size
+            spans = list(self._spans)
+
+        eol = b"\r\n" if self._spans and self._spans[0][2] == 2 else b"\n"
+        with open(self.path, "r+b") as f:
+            if start and not self._ends_with_newline(f, start):
+                f.seek(start)
+                f.write(eol)
+                start += len(eol)
+            f.seek(start)
+            offset = start
+            for obj in objs:
+                data = _dumps(obj)
+                f.write(data + eol)
+                spans.append((offset, len(data), len(eol)))
+                offset += len(data) + len(eol)
+            summary_pos = None
+            if summary_data is not None:
+                f.write(summary_data + eol)
+                summary_pos = len(spans)
+                spans.append((offset, len(summary_data), len(eol)))
+                offset += len(summary_data) + len(eol)
+            f.truncate(offset)
+            f.flush()
+            os.fsync(f.fileno())
+        self._spans, self._summary_pos = spans, summary_pos
+        self._remember()
+
+    @staticmethod
+    def _ends_with_newline(f, end):
+        f.seek(end - 1)
+        return f.read(1) == b"\n"
+
+    def _write_all(self, records, summary):
+        write_jsonl(self.path, records, summary)
+        self._load_index(force=True)
+
+
+def write_jsonl(path, records, summary=None):
+    """整体写出（原子替换）一个 JSONL"""
+    lines = [json.dumps(r, ensure_ascii=False) + "\n" for r in records]
+    if summary is not None:
+        lines.append(json.dumps(summary, ensure_ascii=False) + "\n")
+    atomic_write_text(path, "".join(lines))
+
+
+def read_summary(jsonl_path):
+    """只读取 summary 行；文件不存在或没有 summary 时返回 None"""
+    try:
+        return JsonlDocument(jsonl_path).summary()
+    except (OSError, ValueError):
+        return None
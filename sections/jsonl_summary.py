@@ -0,0 +1,244 @@
+# sections/jsonl_summary.py
+"""
+JSONL summary 行（最后一行）的增量维护
+
+summary = {
+    "motions":     所有模型都有的动作分组（交集）,
+    "expressions": 任一模型有的表情（并集）,
+    "import":      可选
+}
+
+JsonlSummary 记录每个模型的动作/表情名，以及每个名字出现在几个模型里：
+  - 动作按出现次数分桶（by_count），交集 = 次数等于模型数的那个桶
+  - 表情只记次数，并集 = 次数 > 0 的名字
+增删改一个模型只移动它自己的名字，O(改动的名字数)；读取结果时才排序。
+解析失败或找不到的模型按「没有任何动作/表情」计入，与 collect_jsons_to_jsonl 的规则一致。
+"""
+import os
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_model_names(model_json_path):
+    """读取 model.json，返回 (动作分组名列表, 表情名列表)"""
+    with open(model_json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return model_names_from_data(data)
+
+
+def model_names_from_data(data: dict):
+    motion_names = list(data.get("motions", {}))
+    expression_names = [
+        exp["name"] for exp in data.get("expressions", [])
+        if isinstance(exp, dict) and "name" in exp
+    ]
+    return motion_names, expression_names
+
+
+def is_summary_line(obj) -> bool:
+    return isinstance(obj, dict) and ("motions" in obj or "expressions" in obj)
+
+
+class JsonlSummary:
+    def __init__(self, import_value=None):
+        self.import_value = import_value
+        self._models = {}                      # key -> (动作集合, 表情集合)
+        self._motion_counts = {}               # 动作名 -> 出现的模型数
+        self._by_count = defaultdict(set)      # 模型数 -> 动作名集合
+        self._exp_counts = {}                  # 表情名 -> 出现的模型数
+
+    def __len__(self):
+        return len(self._models)
+
+    def __contains__(self, key):
+        return key in self._models
+
+    # ----- 计数 -----
+    def _shift_motion(self, name, delta):
+        old = self._motion_counts.get(name, 0)
+        new = old + delta
+        if old:
+            bucket = self._by_count[old]
+            bucket.discard(name)
+            if not bucket:
+                del self._by_count[old]
+        if new:
+            self._motion_counts[name] = new
+            self._by_count[new].add(name)
+        else:
+            self._motion_counts.pop(name, None)
+
+    def _shift_expression(self, name, delta):
+        new = self._exp_counts.get(name, 0) + delta
+        if new:
+            self._exp_counts[name] = new
+        else:
+            self._exp_counts.pop(name, None)
+
+    # ----- 增删改 -----
+    def add_model(self, key, motions=(), expressions=()):
+        if key in self._models:
+            self.update_model(key, motions, expressions)
+            return
+        motions, expressions = frozenset(motions), frozenset(expressions)
+        self._models[key] = (motions, expressions)
+        for name in motions:
+            self._shift_motion(name, 1)
+        for name in expressions:
+            self._shift_expression(name, 1)
+
+    def remove_model(self, key):
+        motions, expressions = self._models.pop(key)
+        for name in motions:
+            self._shift_motion(name, -1)
+        for name in expressions:
+            self._shift_expression(name, -1)
+
+    def update_model(self, key, motions=(), expressions=()):
+        if key not in self._models:
+            self.add_model(key, motions, expressions)
+            return
+        old_motions, old_expressions = self._models[key]
+        motions, expressions = frozenset(motions), frozenset(expressions)
+        for name in motions - old_motions:
+            self._shift_motion(name, 1)
+        for name in old_motions - motions:
+            self._shift_motion(name, -1)
+        for name in expressions - old_expressions:
+            self._shift_expression(name, 1)
+        for name in old_expressions - expressions:
+            self._shift_expression(name, -1)
+        self._models[key] = (motions, expressions)
+
+    # ----- 结果 -----
+    @property
+    def motions(self):
+        if not self._models:
+            return []
+        return sorted(self._by_count.get(len(self._models), ()))
+
+    @property
+    def expressions(self):
+        return sorted(self._exp_counts)
+
+    def to_dict(self) -> dict:
+        summary = {"motions": self.motions, "expressions": self.expressions}
+        if self.import_value is not None:
+            summary["import"] = self.import_value
+        return summary
+
+
+# ----- 与 JSONL 文件配合 -----
+def read_jsonl_records(jsonl_path):
+    """返回 (记录列表, summary 字典或 None)；无法解析的行跳过"""
+    records, summary = [], None
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                continue
+            if is_summary_line(obj):
+                summary = obj
+            elif isinstance(obj, dict):
+                records.append(obj)
+    return records, summary
+
+
+def resolve_record_path(jsonl_dir, raw_path):
+    """与批量添加相同的规则：先按 JSONL 所在目录拼接，找不到再走 _resolve_model_path"""
+    from sections.live2d_tool import _resolve_model_path
+    if not raw_path:
+        return None
+    abs_path = os.path.normpath(os.path.join(jsonl_dir, raw_path))
+    if os.path.isfile(abs_path):
+        return abs_path
+    return _resolve_model_path(jsonl_dir, raw_path)
+
+
+def summary_for_records(records, jsonl_dir, import_value=None, known_names=None, max_workers=None):
+    """
+    按记录计算 summary；key 为记录在列表中的下标。
+    known_names: {model.json 绝对路径: (动作名, 表情名)}，命中时不再读文件（例如刚在内存里改过的模型）。
+    返回 (JsonlSummary, 找不到/解析失败的 [(下标, path, 原因)])
+    """
+    known_names = known_names or {}
+    paths = [resolve_record_path(jsonl_dir, r.get("path", "")) for r in records]
+    to_load = sorted({p for p in paths if p and p not in known_names})
+
+    loaded, problems = dict(known_names), []
+    if to_load:
+        max_workers = max_workers or min(16, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {p: pool.submit(load_model_names, p) for p in to_load}
+            for p, fut in futures.items():
+                try:
+                    loaded[p] = fut.result()
+                except Exception as e:
+                    loaded[p] = e
+
+    summary = JsonlSummary(import_value)
+    for i, (record, path) in enumerate(zip(records, paths)):
+        names = loaded.get(path) if path else None
+        if path is None:
+            problems.append((i, record.get("path", ""), "找不到 model.json"))
+            names = ((), ())
+        elif isinstance(names, Exception):
+            problems.append((i, record.get("path", ""), str(names)))
+            names = ((), ())
+        summary.add_model(i, *names)
+    return summary, problems
+
+
+def verify_jsonl_summary(jsonl_path, max_workers=None) -> dict:
+    """
+    用模型重新计算 summary 并与文件中的对比。返回：
+      ok, expected（应有的 summary 字典）, actual（文件中的，可能为 None）,
+      missing_motions / extra_motions / missing_expressions / extra_expressions, problems
+    """
+    records, actual = read_jsonl_records(jsonl_path)
+    import_value = actual.get("import") if actual else None
+    summary, problems = summary_for_records(
+        records, os.path.dirname(os.path.abspath(jsonl_path)), import_value, max_workers=max_workers
+    )
+    return compare_summary(summary.to_dict(), actual, problems)
+
+
+def compare_summary(expected: dict, actual, problems=()) -> dict:
+    """对比应有的 summary 与现有的 summary（字典或 None），返回格式同 verify_jsonl_summary"""
+    actual_motions = set((actual or {}).get("motions", []))
+    actual_exps = set((actual or {}).get("expressions", []))
+    result = {
+        "expected": expected,
+        "actual": actual,
+        "missing_motions": sorted(set(expected["motions"]) - actual_motions),
+        "extra_motions": sorted(actual_motions - set(expected["motions"])),
+        "missing_expressions": sorted(set(expected["expressions"]) - actual_exps),
+        "extra_expressions": sorted(actual_exps - set(expected["expressions"])),
+        "problems": list(problems),
+    }
+    result["ok"] = actual is not None and not any(
+        result[k] for k in ("missing_motions", "extra_motions", "missing_expressions", "extra_expressions")
+    )
+    return result
+
+
+def format_verify_result(result: dict) -> str:
+    if result["ok"]:
+        return "✅ summary 与模型一致"
+    lines = ["❌ 文件中没有 summary 行"] if result["actual"] is None else ["⚠️ summary 与模型不一致"]
+    labels = (("missing_motions", "缺少动作"), ("extra_motions", "多余动作"),
+              ("missing_expressions", "缺少表情"), ("extra_expressions", "多余表情"))
+    for key, label in labels:
+        if result[key]:
+            names = result[key]
+            shown = "、".join(names[:15]) + ("……" if len(names) > 15 else "")
+            lines.append(f"{label}（{len(names)}）：{shown}")
+    if result["problems"]:
+        lines.append(f"有 {len(result['problems'])} 个模型无法读取，按空模型计算：")
+        lines.extend(f"  第 {i + 1} 条 {path}：{reason}" for i, path, reason in result["problems"][:10])
+    return "\n".join(lines)
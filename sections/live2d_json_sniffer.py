@@ -0,0 +1,189 @@
+"""
+快速判断一个 .json 是否为 Cubism 2 模型描述文件（顶层同时含 version / layout / model）
+
+- 已知不是模型的后缀（.exp.json / .physics.json / Cubism 3 的各种 json 等）直接跳过，不打开文件
+- 只读取开头一段，用正则逐个取出字符串和括号，只跟踪顶层键；
+  三个键都出现就判定为是，顶层对象结束还没凑齐就判定为否
+- 前缀内判断不出来时（超大的 model.json）再完整解析一次
+- 结果按 (路径, 大小, 修改时间) 缓存到 SQLite，下次启动直接命中；写入攒批提交
+"""
+import os
+import re
+import json
+import sqlite3
+import atexit
+import codecs
+import threading
+
+CACHE_DB_PATH = "live2d_json_cache.db"
+SNIFF_BYTES = 64 * 1024
+_FLUSH_EVERY = 500
+REQUIRED_KEYS = ("version", "layout", "model")
+
+SKIP_SUFFIXES = (
+    ".exp.json", ".physics.json", ".pose.json", ".stripped.json",
+    ".model3.json", ".exp3.json", ".motion3.json", ".physics3.json",
+    ".pose3.json", ".cdi3.json", ".userdata3.json",
+)
+
+# 完整字符串 | 结构符号 | 落单的引号（前缀在字符串中间被截断）
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]:,]|"')
+
+
+def _sniff_text(text: str, truncated: bool):
+    """返回 True / False；前缀不够判断时返回 None"""
+    s = text.lstrip(" \t\r\n")
+    if not s:
+        return None if truncated else False
+    if s[0] != "{":
+        return False
+
+    required = set(REQUIRED_KEYS)
+    depth = 0
+    expect_key = False
+    pending_key = None
+    for m in _TOKEN_RE.finditer(s):
+        tok = m.group()
+        c = tok[0]
+        if c == '"':
+            if len(tok) == 1:
+                return None
+            if depth == 1 and expect_key:
+                pending_key = json.loads(tok) if "\\" in tok else tok[1:-1]
+                expect_key = False
+        elif c == ":":
+            if depth == 1 and pending_key is not None:
+                required.discard(pending_key)
+                pending_key = None
+                if not required:
+                    return True
+        elif c == ",":
+            if depth == 1:
+                expect_key = True
+        elif c in "{[":
+            depth += 1
+            if depth == 1:
+                expect_key = True
+        else:
+            depth -= 1
+            if depth == 0:
+                return False
+    return None if truncated else False
+
+
+def _full_check(path: str) -> bool:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return all(k in data for k in REQUIRED_KEYS)
+    except Exception:
+        return False
+
+
+def sniff_live2d_json(path: str) -> bool:
+    """不查缓存，直接判断"""
+    if path.lower().endswith(SKIP_SUFFIXES):
+        return False
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            truncated = bool(f.read(1))
+        # 和 json.load 一样不接受 BOM
+        if head.startswith(codecs.BOM_UTF8):
+            return False
+        text = codecs.getincrementaldecoder("utf-8")().decode(head, final=not truncated)
+    except (OSError, UnicodeDecodeError):
+        return False
+    result = _sniff_text(text, truncated)
+    if result is None:
+        return _full_check(path)
+    return result
+
+
+class Live2DJsonCache:
+    def __init__(self, db_path=CACHE_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._entries = None   # 路径 -> (size, mtime_ns, 结果)
+        self._dirty = {}
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            try:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS live2d_json ("
+                    "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                    "mtime_ns INTEGER NOT NULL, valid INTEGER NOT NULL)"
+                )
+                for path, size, mtime_ns, valid in conn.execute("SELECT path, size, mtime_ns, valid FROM live2d_json"):
+                    self._entries[path] = (size, mtime_ns, bool(valid))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ 读取 {self.db_path} 失败，本次不使用缓存: {e}")
+
+    def is_valid(self, path: str) -> bool:
+        if path.lower().endswith(SKIP_SUFFIXES):
+            return False
+        abs_path = os.path.abspath(path)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return False
+        with self._lock:
+            self._load()
+            entry = self._entries.get(abs_path)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+
+        result = sniff_live2d_json(abs_path)
+        with self._lock:
+            value = (st.st_size, st.st_mtime_ns, result)
+            self._entries[abs_path] = value
+            self._dirty[abs_path] = value
+            need_flush = len(self._dirty) >= _FLUSH_EVERY
+        if need_flush:
+            self.flush()
+        return result
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [(p, s, m, int(v)) for p, (s, m, v) in self._dirty.items()]
+            self._dirty.clear()
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            try:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO live2d_json VALUES (?, ?, ?, ?)", rows)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ 写入 {self.db_path} 失败: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty.clear()
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            try:
+                with conn:
+                    conn.execute("DELETE FROM live2d_json")
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+
+_cache = Live2DJsonCache()
+atexit.register(_cache.flush)
+
+
+def get_json_cache() -> Live2DJsonCache:
+    return _cache
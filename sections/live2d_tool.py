@@ -1,5 +1,7 @@
 ﻿import os
 import json
+import time
+import multiprocessing
 from collections import defaultdict
 
 
@@ -18,22 +20,62 @@ def sanitize_path(path):
     """去除路径两侧的引号，防止误识别"""
     return path.strip().strip('"')
 
+class DirListingCache:
+    """
+    目录列表缓存：每个目录只 scandir 一次，之后判断文件是否存在都查内存。
+    批量处理多个 model.json（共用动作目录）时传同一个实例即可。
+    """
+
+    def __init__(self):
+        self._listings = {}
+
+    def _listing(self, dir_path: str) -> set:
+        key = os.path.normcase(os.path.abspath(dir_path))
+        names = self._listings.get(key)
+        if names is None:
+            names = set()
+            try:
+                with os.scandir(dir_path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_file():
+                                names.add(os.path.normcase(entry.name))
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+            self._listings[key] = names
+        return names
+
+    def isfile(self, path: str) -> bool:
+        dir_path, name = os.path.split(path)
+        return os.path.normcase(name) in self._listing(dir_path or ".")
+
+    def invalidate(self, dir_path: str = None):
+        if dir_path is None:
+            self._listings.clear()
+        else:
+            self._listings.pop(os.path.normcase(os.path.abspath(dir_path)), None)
+
+
 def remove_duplicates_and_check_files(model_json_path,
                                       skip_check: bool = False,
-                                      auto_remove_missing: bool = True):
+                                      auto_remove_missing: bool = True,
+                                      listing_cache: DirListingCache = None):
     with open(model_json_path, "r", encoding="utf-8") as f:
         model = json.load(f)
 
     base_dir = os.path.dirname(model_json_path)
+    isfile = listing_cache.isfile if listing_cache is not None else DirListingCache().isfile
 
     new_motions = defaultdict(list)
     seen_motion_files = set()
     missing_motion_entries = []
 
+    # 倒序遍历保留最后一次出现的条目；先 append 再整体翻转，避免 insert(0) 的平方复杂度
     for motion_name, motion_list in (model.get("motions") or {}).items():
-        reversed_list = list(reversed(motion_list))
         clean_list = []
-        for motion in reversed_list:
+        for motion in reversed(motion_list):
             file_path = motion.get("file", "")
             if not file_path:
                 # 没有 file 字段的异常数据直接丢弃
@@ -41,30 +83,31 @@ def remove_duplicates_and_check_files(model_json_path,
             abs_path = os.path.normpath(os.path.join(base_dir, file_path))
             if file_path in seen_motion_files:
                 continue
-            if (not skip_check) and (not os.path.isfile(abs_path)):
+            if (not skip_check) and (not isfile(abs_path)):
                 missing_motion_entries.append((motion_name, motion))
             else:
                 seen_motion_files.add(file_path)
-                clean_list.insert(0, motion)
+                clean_list.append(motion)
+        clean_list.reverse()
         new_motions[motion_name] = clean_list
 
     seen_expression_files = set()
     new_expressions = []
     missing_expressions = []
 
-    reversed_exps = list(reversed(model.get("expressions") or []))
-    for expression in reversed_exps:
+    for expression in reversed(model.get("expressions") or []):
         file_path = expression.get("file", "")
         if not file_path:
             continue
         abs_path = os.path.normpath(os.path.join(base_dir, file_path))
         if file_path in seen_expression_files:
             continue
-        if (not skip_check) and (not os.path.isfile(abs_path)):
+        if (not skip_check) and (not isfile(abs_path)):
             missing_expressions.append(expression)
         else:
             seen_expression_files.add(file_path)
-            new_expressions.insert(0, expression)
+            new_expressions.append(expression)
+    new_expressions.reverse()
 
     # ✅ 无交互：按参数决定是否删除缺失项
     if skip_check:
@@ -98,8 +141,107 @@ def remove_duplicates_and_check_files(model_json_path,
         json.dump(model, f, ensure_ascii=False, indent=2)
 
 
-def scan_live2d_directory(directory):
-    """遍历 Live2D 资源目录并生成 model.json"""
+SCAN_CACHE_NAME = ".live2d_scan_cache.json"
+_SCAN_CACHE_VERSION = 1
+
+
+def _classify_live2d_file(file):
+    if file.endswith(".moc"):
+        return "moc"
+    if file.endswith(".physics.json"):
+        return "physics"
+    if file.endswith(".png"):
+        return "png"
+    if file.endswith(".mtn"):
+        return "mtn"
+    if file.endswith(".exp.json"):
+        return "exp"
+    return None
+
+
+def _load_scan_cache(directory):
+    path = os.path.join(directory, SCAN_CACHE_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == _SCAN_CACHE_VERSION and isinstance(cache.get("dirs"), dict):
+            return cache["dirs"]
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _save_scan_cache(directory, dirs):
+    path = os.path.join(directory, SCAN_CACHE_NAME)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"version": _SCAN_CACHE_VERSION, "dirs": dirs}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️ 扫描缓存写入失败: {e}")
+
+
+def _walk_classified(directory, incremental):
+    """
+    按 os.walk 的顺序产出 (相对路径, 文件名, 分类)。
+    incremental=True 时目录 mtime 没变就直接用侧车缓存里的结果，不再列目录；
+    目录的 mtime 只在其直接子项增删时变化，所以每个目录仍需 stat 一次。
+    """
+    old_dirs = _load_scan_cache(directory) if incremental else {}
+    cache_path = os.path.join(directory, SCAN_CACHE_NAME)
+    if incremental and not os.path.exists(cache_path):
+        # 先占位：否则第一次写缓存会改变根目录 mtime，导致下次根目录白白重扫
+        _save_scan_cache(directory, {})
+    new_dirs = {}
+    rescanned = 0
+
+    def _visit(abs_dir, rel_dir):
+        nonlocal rescanned
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            return
+        cached = old_dirs.get(rel_dir)
+        if cached and cached.get("mtime_ns") == mtime_ns:
+            entry = cached
+        else:
+            rescanned += 1
+            files, subdirs = {}, []
+            try:
+                with os.scandir(abs_dir) as it:
+                    for e in it:
+                        try:
+                            if e.is_dir():
+                                # 与 os.walk 一致：不进入符号链接目录
+                                if not e.is_symlink():
+                                    subdirs.append(e.name)
+                            elif e.is_file():
+                                kind = _classify_live2d_file(e.name)
+                                if kind:
+                                    files[e.name] = kind
+                        except OSError:
+                            pass
+            except OSError as e:
+                print(f"❌ 访问失败: {abs_dir}, 错误: {e}")
+            entry = {"mtime_ns": mtime_ns, "files": files, "subdirs": subdirs}
+        new_dirs[rel_dir] = entry
+
+        for name, kind in entry["files"].items():
+            rel_file = f"{rel_dir}/{name}" if rel_dir != "." else name
+            yield rel_file, name, kind
+        for sub in entry["subdirs"]:
+            yield from _visit(os.path.join(abs_dir, sub), f"{rel_dir}/{sub}" if rel_dir != "." else sub)
+
+    yield from _visit(directory, ".")
+    if incremental:
+        _save_scan_cache(directory, new_dirs)
+        print(f"🔍 增量扫描：{len(new_dirs)} 个目录，其中 {rescanned} 个重新列出")
+
+
+def scan_live2d_directory(directory, incremental: bool = False):
+    """
+    遍历 Live2D 资源目录并生成 model.json
+    incremental=True 时使用目录下的 .live2d_scan_cache.json，只重新列出有变化的目录
+    """
     model_json = {
         "version": "Sample 1.0.0",
         "layout": {"center_x": 0, "center_y": 0, "width": 2},
@@ -115,28 +257,73 @@ def scan_live2d_directory(directory):
 
     physics_found = False
 
-    for root, _, files in os.walk(directory):
-        for file in files:
-            relative_path = os.path.relpath(os.path.join(root, file), directory).replace("\\", "/")
-
-            if file.endswith(".moc"):
-                model_json["model"] = relative_path
-            elif file.endswith(".physics.json"):
-                model_json["physics"] = relative_path
-                physics_found = True
-            elif file.endswith(".png"):
-                model_json["textures"].append(relative_path)
-            elif file.endswith(".mtn"):
-                motion_name = os.path.splitext(file)[0]
-                model_json["motions"].setdefault(motion_name, []).append({"file": relative_path})
-            elif file.endswith(".exp.json"):
-                model_json["expressions"].append({"name": os.path.splitext(file)[0], "file": relative_path})
+    for relative_path, file, kind in _walk_classified(directory, incremental):
+        if kind == "moc":
+            model_json["model"] = relative_path
+        elif kind == "physics":
+            model_json["physics"] = relative_path
+            physics_found = True
+        elif kind == "png":
+            model_json["textures"].append(relative_path)
+        elif kind == "mtn":
+            motion_name = os.path.splitext(file)[0]
+            model_json["motions"].setdefault(motion_name, []).append({"file": relative_path})
+        elif kind == "exp":
+            model_json["expressions"].append({"name": os.path.splitext(file)[0], "file": relative_path})
 
     # 如果没有找到 physics，则确保它不出现在最终 JSON 中
     if not physics_found and "physics" in model_json:
         del model_json["physics"]
 
     return model_json
+
+
+def merge_scanned_model_json(existing: dict, scanned: dict) -> dict:
+    """
+    把扫描结果中的新文件合并进已有的 model.json：
+      - 已有字段（layout、hit_areas、init_opacities、分组名等手动修改）全部保留
+      - 只追加尚未被引用的贴图 / 动作 / 表情；动作按文件判断是否已存在（不管在哪个分组）
+      - model / physics 只在原来为空时补上
+    """
+    merged = dict(existing)
+
+    for key in ("model", "physics"):
+        if not merged.get(key) and scanned.get(key):
+            merged[key] = scanned[key]
+
+    textures = list(merged.get("textures") or [])
+    known_textures = {_normalize_rel(t) for t in textures if isinstance(t, str)}
+    for tex in scanned.get("textures") or []:
+        if _normalize_rel(tex) not in known_textures:
+            textures.append(tex)
+            known_textures.add(_normalize_rel(tex))
+    merged["textures"] = textures
+
+    motions = {k: list(v) for k, v in (merged.get("motions") or {}).items() if isinstance(v, list)}
+    known_motions = {
+        _normalize_rel(m.get("file", ""))
+        for group in motions.values() for m in group if isinstance(m, dict)
+    }
+    for name, entries in (scanned.get("motions") or {}).items():
+        for m in entries:
+            key = _normalize_rel(m.get("file", ""))
+            if key not in known_motions:
+                motions.setdefault(name, []).append(m)
+                known_motions.add(key)
+    merged["motions"] = motions
+
+    expressions = list(merged.get("expressions") or [])
+    known_exps = {_normalize_rel(e.get("file", "")) for e in expressions if isinstance(e, dict)}
+    for e in scanned.get("expressions") or []:
+        key = _normalize_rel(e.get("file", ""))
+        if key not in known_exps:
+            expressions.append(e)
+            known_exps.add(key)
+    merged["expressions"] = expressions
+
+    return merged
+
+
 def _normalize_rel(p: str) -> str:
     # 去引号、去前导 ./ 、统一斜杠
     return p.strip().strip('"').strip("'").lstrip("./").replace("\\", "/")
@@ -190,19 +377,136 @@ def _resolve_model_path(jsonl_dir: str, raw_path: str) -> str or None:
     if os.path.isfile(cand2):
         return cand2
 
-    # 候选 3：在 game_root 下扫描尾部匹配
+    # 候选 3：在 game_root 下按“尾部匹配”查索引
     # 例如 rel = '祥子妈后发/model.json'，找到以该尾部结尾的真实路径
-    tail = rel.replace("/", os.sep)
-    for dirpath, _, files in os.walk(game_root):
-        for fn in files:
-            if fn.lower() != "model.json":
+    return _get_model_path_index(game_root).lookup(rel)
+
+
+MODEL_PATH_INDEX_NAME = ".model_path_index.json"
+_MODEL_PATH_INDEX_VERSION = 1
+_LEAF = "\0"  # 后缀树节点中存放命中路径的键
+
+
+class ModelPathIndex:
+    """
+    game_root 下所有 model.json 的后缀索引（按路径分量倒序建树）。
+      - 查找尾部匹配只需走「路径深度」步
+      - 持久化到 game_root/.model_path_index.json，记录每个目录的 mtime，
+        任一目录增删过文件就整体重建
+    """
+    REVALIDATE_INTERVAL = 1.0  # 秒
+
+    def __init__(self, game_root: str):
+        self.game_root = os.path.normpath(game_root)
+        self.index_path = os.path.join(self.game_root, MODEL_PATH_INDEX_NAME)
+        self._dirs = {}    # 相对目录 -> mtime_ns
+        self._files = []   # 相对路径（/ 分隔）
+        self._tree = {}
+        self._validated_at = 0.0
+        if not self._load():
+            self.rebuild()
+
+    def _build_tree(self):
+        tree = {}
+        for rel_file in self._files:
+            node = tree
+            for part in reversed(rel_file.lower().split("/")):
+                node = node.setdefault(part, {})
+                # 同一尾部有多个候选时保留遍历顺序中的第一个（与原来的 os.walk 行为一致）
+                node.setdefault(_LEAF, rel_file)
+        self._tree = tree
+
+    def _load(self) -> bool:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != _MODEL_PATH_INDEX_VERSION:
+            return False
+        self._dirs = data.get("dirs") or {}
+        self._files = data.get("files") or []
+        if not self.is_fresh():
+            return False
+        self._build_tree()
+        self._validated_at = time.monotonic()
+        return True
+
+    def is_fresh(self) -> bool:
+        """所有记录的目录 mtime 都没变（每个目录一次 stat，不列目录）"""
+        if not self._dirs:
+            return False
+        for rel_dir, mtime_ns in self._dirs.items():
+            try:
+                if os.stat(os.path.join(self.game_root, rel_dir)).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def rebuild(self):
+        if not os.path.exists(self.index_path):
+            # 先占位：否则写索引会改变根目录 mtime，下次加载时误判为过期
+            try:
+                open(self.index_path, "a", encoding="utf-8").close()
+            except OSError:
+                pass
+        dirs, files = {}, []
+        for dirpath, _, filenames in os.walk(self.game_root):
+            rel_dir = os.path.relpath(dirpath, self.game_root).replace("\\", "/")
+            try:
+                dirs[rel_dir] = os.stat(dirpath).st_mtime_ns
+            except OSError:
                 continue
-            full = os.path.normpath(os.path.join(dirpath, fn))
-            # 尾部匹配：full 以 .../<tail> 结尾
-            if full.lower().endswith(tail.lower()):
-                return full
+            for fn in filenames:
+                if fn.lower() == "model.json":
+                    files.append(fn if rel_dir == "." else f"{rel_dir}/{fn}")
+        self._dirs, self._files = dirs, files
+        self._build_tree()
+        self._validated_at = time.monotonic()
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump({"version": _MODEL_PATH_INDEX_VERSION, "dirs": dirs, "files": files},
+                          f, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️ model.json 索引写入失败: {e}")
+
+    def _lookup_once(self, rel: str):
+        node = self._tree
+        for part in reversed([p for p in rel.lower().split("/") if p]):
+            node = node.get(part)
+            if node is None:
+                return None
+        rel_file = node.get(_LEAF)
+        return os.path.normpath(os.path.join(self.game_root, rel_file)) if rel_file else None
+
+    def lookup(self, rel: str):
+        """按尾部匹配查找；未命中或命中的文件已不存在时，若目录有变化则重建后再查一次"""
+        found = self._lookup_once(rel)
+        if found and os.path.isfile(found):
+            return found
+        # 批量处理时连续未命中不必每次都 stat 全部目录
+        if time.monotonic() - self._validated_at < self.REVALIDATE_INTERVAL:
+            return None
+        self._validated_at = time.monotonic()
+        if not self.is_fresh():
+            self.rebuild()
+            found = self._lookup_once(rel)
+            if found and os.path.isfile(found):
+                return found
+        return None
+
+
+_model_path_indexes = {}
 
-    return None
+
+def _get_model_path_index(game_root: str) -> ModelPathIndex:
+    key = os.path.normcase(os.path.abspath(game_root))
+    index = _model_path_indexes.get(key)
+    if index is None:
+        index = ModelPathIndex(game_root)
+        _model_path_indexes[key] = index
+    return index
 
 
 def update_model_json_bulk(model_json_path, new_files_or_dir, prefix=""):
@@ -271,37 +575,12 @@ def update_model_json_bulk(model_json_path, new_files_or_dir, prefix=""):
         print("⚠️ 没有可添加的文件，未修改 model.json")
 
 
-def batch_update_mtn_param_text(directory, param_name, new_value):
-    """批量更新指定目录下所有 .mtn 文件中的指定参数值为新值（文本格式）"""
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".mtn"):
-                file_path = os.path.join(root, file)
-                try:
-                    # 读取文件所有行
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-
-                    # 修改包含指定参数的行
-                    modified = False
-                    for i, line in enumerate(lines):
-                        if line.strip().startswith(f"{param_name}="):
-                            lines[i] = f"{param_name}={new_value}\n"
-                            modified = True
-                            print(f"已更新 {param_name} 在 {file_path} 为 {new_value}")
-                            break
-
-                    if not modified:
-                        # 如果没有找到就添加
-                        lines.append(f"{param_name}={new_value}\n")
-                        print(f"未找到 {param_name}，已在 {file_path} 添加为 {new_value}")
-
-                    # 写回文件
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.writelines(lines)
-
-                except Exception as e:
-                    print(f"处理 {file_path} 时出错: {e}")
+def batch_update_mtn_param_text(directory, param_name, new_value, dry_run=False):
+    """批量更新指定目录下所有 .mtn 文件中的指定参数值为新值（文本格式），返回统计字典"""
+    from sections.mtn_rewrite import rewrite_mtn_files, format_rewrite_stats
+    stats = rewrite_mtn_files(directory, {param_name: new_value}, dry_run=dry_run)
+    print(f"{param_name}={new_value}：" + format_rewrite_stats(stats, dry_run))
+    return stats
 
 # 一念神魔
 def merge_exp_faces_with_mapping(left_exp_path, right_exp_path, exps_json_path, output_path):
@@ -319,49 +598,15 @@ def merge_exp_faces_with_mapping(left_exp_path, right_exp_path, exps_json_path,
     exps_json_path = sanitize_path(exps_json_path)
     output_path = sanitize_path(output_path)
 
+    from sections.exp_merge import compile_face_map, merge_exp_data
+
     # 加载文件
     with open(left_exp_path, "r", encoding="utf-8") as f:
         left_data = json.load(f)
     with open(right_exp_path, "r", encoding="utf-8") as f:
         right_data = json.load(f)
-    with open(exps_json_path, "r", encoding="utf-8") as f:
-        face_map = json.load(f)
-
-    # 参数映射表
-    left_params = {p["id"]: p for p in left_data.get("params", [])}
-    right_params = {p["id"]: p for p in right_data.get("params", [])}
-
-    # 已知分类
-    left_ids = set(face_map.get("left_face", []))
-    right_ids = set(face_map.get("right_face", []))
-    center_ids = set(face_map.get("center_face", []))
-
-    all_ids = set(left_params) | set(right_params)
-    merged_params = []
-
-    for pid in all_ids:
-        if pid in left_ids:
-            if pid in left_params:
-                merged_params.append(left_params[pid])
-        elif pid in right_ids:
-            if pid in right_params:
-                merged_params.append(right_params[pid])
-        elif pid in center_ids:
-            if pid in left_params:
-                merged_params.append(left_params[pid])
-            elif pid in right_params:
-                merged_params.append(right_params[pid])
-        else:
-            # 未分类 → 使用右脸的值
-            if pid in right_params:
-                merged_params.append(right_params[pid])
-
-    # 构建新表情
-    merged_data = {
-        "fade_in": left_data.get("fade_in", 500),
-        "fade_out": left_data.get("fade_out", 500),
-        "params": merged_params
-    }
+
+    merged_data = merge_exp_data(left_data, right_data, compile_face_map(exps_json_path))
 
     # 保存文件
     with open(output_path, "w", encoding="utf-8") as f:
@@ -370,27 +615,12 @@ def merge_exp_faces_with_mapping(left_exp_path, right_exp_path, exps_json_path,
     print(f"✅ 合并完成：{output_path}")
 
 
-def batch_remove_mtn_param_text(directory, param_name="PARAM_IMPORT"):
-    """批量删除指定目录下所有 .mtn 文件中的指定参数行"""
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".mtn"):
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        lines = f.readlines()
-
-                    new_lines = [line for line in lines if not line.strip().startswith(f"{param_name}=")]
-
-                    if len(new_lines) < len(lines):
-                        with open(file_path, "w", encoding="utf-8") as f:
-                            f.writelines(new_lines)
-                        print(f"✅ 删除了 {file_path} 中的 {param_name} 参数行")
-                    else:
-                        print(f"⏭️ 未发现 {param_name} 于 {file_path}，跳过")
-
-                except Exception as e:
-                    print(f"处理 {file_path} 时出错: {e}")
+def batch_remove_mtn_param_text(directory, param_name="PARAM_IMPORT", dry_run=False):
+    """批量删除指定目录下所有 .mtn 文件中的指定参数行，返回统计字典"""
+    from sections.mtn_rewrite import rewrite_mtn_files, format_rewrite_stats
+    stats = rewrite_mtn_files(directory, {param_name: None}, dry_run=dry_run)
+    print(f"删除 {param_name}：" + format_rewrite_stats(stats, dry_run))
+    return stats
 
 
 def main():
@@ -404,13 +634,21 @@ def main():
         print("4. 去重 model.json 中重复的动作/表情,并删除不存在的动作和表情路径")
         print("5. 批量更改 mtn 文件中的 PARAM_IMPORT 参数")
         print("6. 新功能！断手断脚和一念神魔！")
+        print("7. 断手断脚：按身体区域批量拼接 mtn 动作")
+        print("8. 批量将 conf 转换为 JSONL")
+        print("9. 预解析 figure 目录下所有模型的部件/参数（多进程，写入元数据缓存）")
         print("q. 退出程序")
-        choice = input("请选择操作 (1/2/3/4/5/q): ").strip()
+        choice = input("请选择操作 (1/2/3/4/5/6/7/8/9/q): ").strip()
 
         if choice == "1":
             directory = sanitize_path(input("请输入 Live2D 资源目录路径: "))
             save_path = os.path.join(directory, "model.json")
-            model_data = scan_live2d_directory(directory)
+            model_data = scan_live2d_directory(directory, incremental=True)
+            if os.path.isfile(save_path):
+                merge = input("已存在 model.json，是否只合并新文件并保留手动修改？(Y/n): ").strip().lower()
+                if merge != "n":
+                    with open(save_path, "r", encoding="utf-8") as f:
+                        model_data = merge_scanned_model_json(json.load(f), model_data)
             with open(save_path, "w", encoding="utf-8") as f:
                 json.dump(model_data, f, indent=4, ensure_ascii=False)
             print(f"model.json 已生成: {save_path}")
@@ -457,9 +695,28 @@ def main():
                     print("错误：请输入一个有效的整数值。")
         elif choice == "6":
             print("🎭 一念神魔功能启动！")
+            exps_json = "exps.json"
+            if input("是否使用批量模式（左右表情全部组合）？(y/N): ").strip().lower() == "y":
+                from sections.exp_merge import batch_merge_exp_faces
+                if not os.path.isfile(exps_json):
+                    print("❌ 找不到 exps.json！")
+                    continue
+                left_src = sanitize_path(input("请输入左脸表情目录或文件（多个用 ; 分隔）: "))
+                right_src = sanitize_path(input("请输入右脸表情目录或文件（多个用 ; 分隔）: "))
+                output_dir = sanitize_path(input("请输入输出目录: "))
+                models_text = input("要登记到的 model.json（多个用 ; 分隔，留空不登记）: ").strip()
+                model_paths = [sanitize_path(p) for p in models_text.split(";") if p.strip()]
+                prefix = input("登记时表情名称的前缀（可留空）: ").strip() if model_paths else ""
+                results = batch_merge_exp_faces(left_src, right_src, exps_json, output_dir, model_paths, prefix)
+                ok = sum(r["status"] == "exported" for r in results)
+                for r in results:
+                    if r["status"] == "failed":
+                        print(f"❌ {os.path.basename(r['file'])}: {r['reason']}")
+                print(f"✅ 共生成 {ok}/{len(results)} 个表情，保存在 {output_dir}")
+                continue
+
             left_exp = sanitize_path(input("请输入左脸表情文件路径 (.exp.json): ").strip())
             right_exp = sanitize_path(input("请输入右脸表情文件路径 (.exp.json): ").strip())
-            exps_json = "exps.json"
 
             if not all(os.path.isfile(p) for p in [left_exp, right_exp, exps_json]):
                 print("❌ 输入的文件路径有误，请检查所有文件是否存在！")
@@ -473,12 +730,72 @@ def main():
                     output_exp = os.path.join(left_dir, save_name + ".exp.json")
                     merge_exp_faces_with_mapping(left_exp, right_exp, exps_json, output_exp)
 
+        elif choice == "7":
+            from sections.mtn_splice import load_region_map, batch_splice, ARM_REGIONS
+            if not os.path.isfile("mtn.json"):
+                print("❌ 找不到 mtn.json！")
+                continue
+            region_map = load_region_map("mtn.json")
+            print("可用区域：" + "、".join(region_map))
+            base_src = sanitize_path(input("请输入底动作的目录或文件（多个用 ; 分隔）: "))
+            part_src = sanitize_path(input("请输入提供替换区域的动作目录或文件（多个用 ; 分隔）: "))
+            regions_text = input(f"请输入要替换的区域（用 , 分隔，留空为 {','.join(ARM_REGIONS)}）: ").strip()
+            regions = [r.strip() for r in regions_text.split(",") if r.strip()] or list(ARM_REGIONS)
+            fade_text = input("请输入交叉淡入秒数（留空为 0）: ").strip()
+            output_dir = sanitize_path(input("请输入输出目录: "))
+            try:
+                fade = float(fade_text) if fade_text else 0.0
+                results = batch_splice(base_src, part_src, regions, output_dir, region_map, fade=fade)
+            except ValueError as e:
+                print(f"❌ {e}")
+                continue
+            ok = sum(r["status"] == "exported" for r in results)
+            for r in results:
+                if r["status"] == "failed":
+                    print(f"❌ {os.path.basename(r['file'])}: {r['reason']}")
+            print(f"✅ 共生成 {ok}/{len(results)} 个动作，保存在 {output_dir}")
+
+        elif choice == "8":
+            from sections.gen_jsonl import batch_conf_to_jsonl
+            conf_dir = sanitize_path(input("请输入 conf 所在目录: "))
+            figure_dir = sanitize_path(input("请输入 WebGAL 的 figure 目录: "))
+            if not os.path.isdir(conf_dir) or not os.path.isdir(figure_dir):
+                print("错误：指定的路径不是一个目录或不存在。")
+                continue
+            output_dir = sanitize_path(input("请输入输出目录（留空为 conf 目录下的 converted_jsonl）: ")) or None
+            results = batch_conf_to_jsonl(conf_dir, figure_dir, output_dir)
+            for r in results:
+                if r["status"] != "exported":
+                    mark = "⏭" if r["status"] == "skipped" else "❌"
+                    print(f"{mark} {os.path.basename(r['file'])}: {r['reason']}")
+
+        elif choice == "9":
+            from sections.batch_introspect import introspect_tree
+            figure_dir = sanitize_path(input("请输入 figure 目录路径: "))
+            if not os.path.isdir(figure_dir):
+                print("错误：指定的路径不是一个目录或不存在。")
+                continue
+            workers_text = input("请输入工作进程数（留空为 CPU 核数）: ").strip()
+            max_workers = int(workers_text) if workers_text.isdigit() and int(workers_text) > 0 else None
+            t0 = time.perf_counter()
+
+            def _report(done, total, r):
+                mark = "❌" if r.error else ("⚡" if r.cached else "✅")
+                detail = r.error or f"部件 {len(r.part_ids)} 个，参数 {len(r.params)} 个"
+                print(f"{mark} [{done}/{total}] {os.path.relpath(r.path, figure_dir)}: {detail}")
+
+            results = introspect_tree(figure_dir, max_workers=max_workers, progress_callback=_report)
+            failed = sum(1 for r in results.values() if r.error)
+            print(f"📊 共 {len(results)} 个模型，失败 {failed} 个，用时 {time.perf_counter() - t0:.1f} 秒")
+
         elif choice.lower() == "q":
             print("感谢使用，再见喵~")
             break
         else:
-            print("无效输入，请输入 1、2、3、5 或 q。")
+            print("无效输入，请输入 1~9 或 q。")
 
 
 if __name__ == "__main__":
+    # 选项 9 用 spawn 启动工作进程，打包后需要这一行
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,421 @@
+# sections/moc_reader.py
+"""
+纯 Python 的 Cubism 2 .moc 元数据读取器（不需要 pygame / OpenGL / live2d 原生库）
+
+.moc 是 Cubism 2 运行时的序列化对象图：
+  "moc" + 1 字节版本号，之后是 ModelImpl 对象：
+    ModelImpl  -> ParamDefSet（参数 id/min/max/default）
+               -> PartsData 列表（部件 id + 该部件下的变形器/网格）
+               -> 画布宽高
+
+参数定义排在最前面，只要参数时读完 ParamDefSet 就停止；
+部件 ID 夹在变形器/网格数据之间，需要顺序跳过这些数据，但不会构造任何绘制用的结构。
+文件通过 mmap 只读映射，不会整体读入内存。
+"""
+import os
+import json
+import mmap
+import struct
+from dataclasses import dataclass, field
+from typing import List
+
+
+class MocFormatError(Exception):
+    """.moc 文件损坏、版本不支持，或包含本读取器不认识的对象类型"""
+
+
+# 文件格式版本
+_FORMAT_V2_8_TEX_OPTION = 8
+_FORMAT_V2_10_SDK2 = 10
+_FORMAT_V2_11_SDK2_1 = 11
+_FORMAT_VERSION_MAX = _FORMAT_V2_11_SDK2_1
+
+# 对象类型编号
+_CNO_NULL = 0
+_CNO_STRING = 1
+_CNO_COLOR = 10
+_CNO_RECT_DOUBLE = 11
+_CNO_RECT_FLOAT = 12
+_CNO_POINT_DOUBLE = 13
+_CNO_POINT_FLOAT = 14
+_CNO_OBJECT_ARRAY = 15
+_CNO_INT_ARRAY = 16
+_CNO_AFFINE = 17
+_CNO_RECT_INT = 21
+_CNO_POINT_INT = 22
+_CNO_INT_ARRAY2 = 25
+_CNO_DOUBLE_ARRAY = 26
+_CNO_FLOAT_ARRAY = 27
+_CNO_OBJECT_REF = 33
+_CNO_BASE_DATA_ID = 50
+_CNO_DRAW_DATA_ID = 51
+_CNO_PARAM_ID = 60
+_CNO_PARTS_DATA_ID = 134
+
+_CNO_WARP_DEFORMER = 65
+_CNO_PIVOT_MANAGER = 66
+_CNO_PARAM_PIVOTS = 67
+_CNO_ROTATION_DEFORMER = 68
+_CNO_AFFINE_ENT = 69
+_CNO_MESH = 70
+_CNO_PARAM_DEF_FLOAT = 131
+_CNO_PARTS_DATA = 133
+_CNO_MODEL_IMPL = 136
+_CNO_PARAM_DEF_SET = 137
+
+_ID_CLASSES = (_CNO_BASE_DATA_ID, _CNO_DRAW_DATA_ID, _CNO_PARAM_ID, _CNO_PARTS_DATA_ID)
+
+
+@dataclass
+class MocMetadata:
+    version: int
+    params: List[dict] = field(default_factory=list)  # [{"id", "default", "min", "max", "value"}]
+    part_ids: List[str] = field(default_factory=list)
+    canvas_width: int = 0
+    canvas_height: int = 0
+
+
+class _BReader:
+    """Cubism 2 的二进制读取器（大端序，变长整数，位读取，对象引用表）"""
+
+    def __init__(self, buf, pos=0):
+        self.buf = buf
+        self.pos = pos
+        self.size = len(buf)
+        self.format_version = 0
+        self.objects = []
+        self._bit_count = 0
+        self._bit_buff = 0
+
+    # ---------- 基础类型 ----------
+    def _need(self, n):
+        if self.pos + n > self.size:
+            raise MocFormatError(f"意外的文件结尾（偏移 {self.pos}，还需要 {n} 字节）")
+
+    def _check_bits(self):
+        self._bit_count = 0
+
+    def _raw_byte(self):
+        self._need(1)
+        b = self.buf[self.pos]
+        self.pos += 1
+        return b
+
+    def read_byte(self):
+        self._check_bits()
+        return self._raw_byte()
+
+    def read_num(self):
+        self._check_bits()
+        ret = 0
+        for _ in range(4):
+            b = self._raw_byte()
+            if not b & 0x80:
+                return (ret << 7) | b
+            ret = (ret << 7) | (b & 0x7F)
+        raise MocFormatError(f"变长整数过长（偏移 {self.pos}）")
+
+    def _unpack(self, fmt, size):
+        self._check_bits()
+        self._need(size)
+        value = struct.unpack_from(fmt, self.buf, self.pos)[0]
+        self.pos += size
+        return value
+
+    def read_int(self):
+        return self._unpack(">i", 4)
+
+    def read_float(self):
+        return self._unpack(">f", 4)
+
+    def read_double(self):
+        return self._unpack(">d", 8)
+
+    def read_bit(self):
+        if self._bit_count == 0:
+            self._bit_buff = self._raw_byte()
+        elif self._bit_count == 8:
+            self._bit_buff = self._raw_byte()
+            self._bit_count = 0
+        bit = (self._bit_buff >> (7 - self._bit_count)) & 1
+        self._bit_count += 1
+        return bit == 1
+
+    def read_utf8(self):
+        n = self.read_num()
+        self._need(n)
+        raw = bytes(self.buf[self.pos:self.pos + n])
+        self.pos += n
+        return raw.decode("utf-8", errors="replace")
+
+    def _read_array(self, code, size):
+        n = self.read_num()
+        self._need(n * size)
+        values = struct.unpack_from(f">{n}{code}", self.buf, self.pos)
+        self.pos += n * size
+        return values
+
+    def read_int_array(self):
+        return self._read_array("i", 4)
+
+    def read_float_array(self):
+        return self._read_array("f", 4)
+
+    def read_double_array(self):
+        return self._read_array("d", 8)
+
+    def skip(self, n):
+        self._check_bits()
+        self._need(n)
+        self.pos += n
+
+    # ---------- 对象 ----------
+    def read_object(self, cno=-1):
+        self._check_bits()
+        if cno < 0:
+            cno = self.read_num()
+        if cno == _CNO_OBJECT_REF:
+            ref = self.read_int()
+            if not 0 <= ref < len(self.objects):
+                raise MocFormatError(f"非法的对象引用 {ref}（偏移 {self.pos}）")
+            return self.objects[ref]
+        obj = self._read_object_body(cno)
+        self.objects.append(obj)
+        return obj
+
+    def _read_object_body(self, cno):
+        if cno == _CNO_NULL:
+            return None
+        if cno in _ID_CLASSES:
+            return self.read_utf8()
+        reader = _CLASS_READERS.get(cno)
+        if reader is not None:
+            return reader(self)
+        if cno == _CNO_STRING:
+            return self.read_utf8()
+        if cno == _CNO_COLOR:
+            return self.read_int()
+        if cno == _CNO_RECT_DOUBLE:
+            self.skip(8 * 4)
+            return None
+        if cno == _CNO_RECT_FLOAT:
+            self.skip(4 * 4)
+            return None
+        if cno == _CNO_POINT_DOUBLE:
+            self.skip(8 * 2)
+            return None
+        if cno == _CNO_POINT_FLOAT:
+            self.skip(4 * 2)
+            return None
+        if cno == _CNO_OBJECT_ARRAY:
+            n = self.read_num()
+            return [self.read_object() for _ in range(n)]
+        if cno in (_CNO_INT_ARRAY, _CNO_INT_ARRAY2):
+            return self.read_int_array()
+        if cno == _CNO_AFFINE:
+            self.skip(8 * 6)
+            return None
+        if cno == _CNO_RECT_INT:
+            self.skip(4 * 4)
+            return None
+        if cno == _CNO_POINT_INT:
+            self.skip(4 * 2)
+            return None
+        if cno == _CNO_DOUBLE_ARRAY:
+            return self.read_double_array()
+        if cno == _CNO_FLOAT_ARRAY:
+            return self.read_float_array()
+        raise MocFormatError(f"不支持的对象类型编号 {cno}（偏移 {self.pos}）")
+
+
+# ========= 各类对象的反序列化（只保留需要的字段，其余按格式跳过）=========
+def _read_base_data(br):
+    br.read_object()  # baseDataID
+    br.read_object()  # targetBaseDataID
+
+
+def _read_base_opacity(br):
+    if br.format_version >= _FORMAT_V2_10_SDK2:
+        br.read_float_array()  # pivotOpacity
+
+
+def _read_rotation_deformer(br):
+    _read_base_data(br)
+    br.read_object()  # pivotMgr
+    br.read_object()  # affines
+    _read_base_opacity(br)
+    return None
+
+
+def _read_warp_deformer(br):
+    _read_base_data(br)
+    br.read_num()     # row
+    br.read_num()     # col
+    br.read_object()  # pivotMgr
+    br.read_object()  # pivotPoints
+    _read_base_opacity(br)
+    return None
+
+
+def _read_affine_ent(br):
+    for _ in range(5):  # originX/originY/scaleX/scaleY/rotationDeg
+        br.read_float()
+    if br.format_version >= _FORMAT_V2_10_SDK2:
+        br.read_bit()  # reflectX
+        br.read_bit()  # reflectY
+    return None
+
+
+def _read_pivot_manager(br):
+    br.read_object()  # paramPivotTable
+    return None
+
+
+def _read_param_pivots(br):
+    br.read_object()  # paramID
+    br.read_num()     # pivotCount
+    br.read_object()  # pivotValue
+    return None
+
+
+def _read_draw_data(br):
+    br.read_object()       # drawDataID
+    br.read_object()       # targetBaseDataID
+    br.read_object()       # pivotMgr
+    br.read_num()          # averageDrawOrder
+    br.read_int_array()    # pivotDrawOrder
+    br.read_float_array()  # pivotOpacity
+    if br.format_version >= _FORMAT_V2_11_SDK2_1:
+        br.read_object()   # clipID
+
+
+def _read_mesh(br):
+    _read_draw_data(br)
+    br.read_num()     # textureNo
+    br.read_num()     # numPts
+    br.read_num()     # numPolygons
+    br.read_object()  # indexArray
+    br.read_object()  # pivotPoints
+    br.read_object()  # uvmap
+    if br.format_version >= _FORMAT_V2_8_TEX_OPTION:
+        option_flag = br.read_num()
+        if option_flag & 1:
+            br.read_num()  # 纹理选项颜色
+    return None
+
+
+def _read_param_def_float(br):
+    pmin = br.read_float()
+    pmax = br.read_float()
+    pdefault = br.read_float()
+    pid = br.read_object()
+    return {
+        "id": pid or "",
+        "default": float(pdefault),
+        "min": float(pmin),
+        "max": float(pmax),
+        "value": float(pdefault),
+    }
+
+
+def _read_param_def_set(br):
+    return br.read_object() or []
+
+
+def _read_parts_data(br):
+    br.read_bit()           # locked
+    br.read_bit()           # visible
+    part_id = br.read_object()
+    br.read_object()        # baseDataList
+    br.read_object()        # drawDataList
+    return part_id or ""
+
+
+_CLASS_READERS = {
+    _CNO_WARP_DEFORMER: _read_warp_deformer,
+    _CNO_PIVOT_MANAGER: _read_pivot_manager,
+    _CNO_PARAM_PIVOTS: _read_param_pivots,
+    _CNO_ROTATION_DEFORMER: _read_rotation_deformer,
+    _CNO_AFFINE_ENT: _read_affine_ent,
+    _CNO_MESH: _read_mesh,
+    _CNO_PARAM_DEF_FLOAT: _read_param_def_float,
+    _CNO_PARTS_DATA: _read_parts_data,
+    _CNO_PARAM_DEF_SET: _read_param_def_set,
+}
+
+
+# ========= 对外接口 =========
+def _parse(buf, want_parts: bool) -> MocMetadata:
+    if len(buf) < 4 or bytes(buf[:3]) != b"moc":
+        raise MocFormatError("不是 Cubism 2 的 .moc 文件（缺少 moc 文件头）")
+    version = buf[3]
+    if version > _FORMAT_VERSION_MAX:
+        raise MocFormatError(f"不支持的 .moc 版本：{version}")
+
+    br = _BReader(buf, 4)
+    br.format_version = version
+    meta = MocMetadata(version=version)
+
+    # ModelImpl 需要手动展开：读完参数定义后可以提前结束
+    cno = br.read_num()
+    if cno != _CNO_MODEL_IMPL:
+        raise MocFormatError(f"根对象不是 ModelImpl（类型编号 {cno}）")
+
+    meta.params = [p for p in br.read_object() or [] if isinstance(p, dict)]
+    if not want_parts:
+        return meta
+
+    parts = br.read_object() or []
+    meta.part_ids = [p for p in parts if isinstance(p, str)]
+    meta.canvas_width = br.read_num()
+    meta.canvas_height = br.read_num()
+    return meta
+
+
+def read_moc_metadata(moc_path, want_parts: bool = True) -> MocMetadata:
+    """读取 .moc 的参数定义（以及部件 ID）；want_parts=False 时只读到参数定义为止"""
+    with open(moc_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # 空文件无法映射
+            raise MocFormatError(f"无法映射 .moc 文件：{e}") from e
+        with mm:
+            return _parse(mm, want_parts)
+
+
+def resolve_moc_path(model_json_path) -> str:
+    """从 model.json 的 "model" 字段解析 .moc 绝对路径"""
+    with open(model_json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    moc_rel = data.get("model") if isinstance(data, dict) else None
+    if not moc_rel:
+        raise MocFormatError(f"model.json 中没有 model 字段：{model_json_path}")
+    base_dir = os.path.dirname(os.path.abspath(model_json_path))
+    return os.path.normpath(os.path.join(base_dir, moc_rel))
+
+
+def read_model_metadata(model_json_path) -> MocMetadata:
+    return read_moc_metadata(resolve_moc_path(model_json_path))
+
+
+def read_model_parts(model_json_path) -> List[str]:
+    return read_model_metadata(model_json_path).part_ids
+
+
+def read_model_params(model_json_path) -> List[dict]:
+    return read_moc_metadata(resolve_moc_path(model_json_path), want_parts=False).params
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for arg in sys.argv[1:]:
+        t0 = time.perf_counter()
+        path = resolve_moc_path(arg) if arg.lower().endswith(".json") else arg
+        meta = read_moc_metadata(path)
+        dt = (time.perf_counter() - t0) * 1000
+        print(f"📄 {path} (v{meta.version}, {meta.canvas_width}x{meta.canvas_height}, {dt:.1f} ms)")
+        print(f"  🧩 部件 {len(meta.part_ids)} 个: {', '.join(meta.part_ids)}")
+        for p in meta.params:
+            print(f"  🎛 {p['id']}: [{p['min']}, {p['max']}] 默认 {p['default']}")
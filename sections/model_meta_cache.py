@@ -0,0 +1,158 @@
+"""
+模型元数据缓存（SQLite）
+
+缓存 .moc 的部件 ID 列表和参数表，避免每次打开模型都重新解析：
+  - 主键：.moc 路径 + 文件大小 + 修改时间（纳秒）
+  - 路径/时间对不上时，用内容哈希兜底（复制出来的同一个 .moc 也能命中）
+  - 按最后访问时间做 LRU 淘汰
+  - 记录命中/未命中次数，便于排查
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+CACHE_DB_PATH = "model_meta_cache.db"
+DEFAULT_MAX_ENTRIES = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_meta (
+    path        TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    digest      TEXT NOT NULL,
+    parts       TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_model_meta_digest ON model_meta(digest);
+CREATE INDEX IF NOT EXISTS idx_model_meta_access ON model_meta(last_access);
+"""
+
+
+def _file_digest(path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelMetaCache:
+    def __init__(self, db_path=CACHE_DB_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        # 未命中后紧接着 put 时复用刚算好的哈希：{(path, size, mtime_ns): digest}
+        self._pending_digests = {}
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _digest_for(self, path, st):
+        key = (path, st.st_size, st.st_mtime_ns)
+        digest = self._pending_digests.get(key)
+        if digest is None:
+            digest = _file_digest(path)
+            if len(self._pending_digests) > 64:
+                self._pending_digests.clear()
+            self._pending_digests[key] = digest
+        return digest
+
+    def get(self, moc_path):
+        """返回 (part_ids, params)；未命中返回 None"""
+        path = os.path.abspath(moc_path)
+        st = os.stat(path)
+        with self._lock:
+            conn = self._connect()
+            now = time.time()
+            row = conn.execute(
+                "SELECT size, mtime_ns, parts, params FROM model_meta WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                conn.execute("UPDATE model_meta SET last_access = ? WHERE path = ?", (now, path))
+                conn.commit()
+                self.hits += 1
+                return json.loads(row[2]), json.loads(row[3])
+
+            # 路径或修改时间不一致：按内容哈希再找一次
+            digest = self._digest_for(path, st)
+            row = conn.execute(
+                "SELECT parts, params FROM model_meta WHERE digest = ? AND size = ? LIMIT 1",
+                (digest, st.st_size),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "INSERT OR REPLACE INTO model_meta VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, digest, row[0], row[1], now),
+            )
+            self._evict(conn)
+            conn.commit()
+            self.hits += 1
+            return json.loads(row[0]), json.loads(row[1])
+
+    def put(self, moc_path, part_ids, params):
+        path = os.path.abspath(moc_path)
+        st = os.stat(path)
+        with self._lock:
+            digest = self._digest_for(path, st)
+            self._pending_digests.pop((path, st.st_size, st.st_mtime_ns), None)
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO model_meta VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path, st.st_size, st.st_mtime_ns, digest,
+                    json.dumps(list(part_ids), ensure_ascii=False),
+                    json.dumps(list(params), ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM model_meta").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM model_meta WHERE path IN "
+                "(SELECT path FROM model_meta ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+
+    def invalidate(self, moc_path):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM model_meta WHERE path = ?", (os.path.abspath(moc_path),))
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM model_meta")
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM model_meta").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
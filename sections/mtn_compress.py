@@ -0,0 +1,145 @@
+# sections/mtn_compress.py
+"""
+.mtn 动作压缩：在给定误差容差内去掉冗余采样
+
+.mtn 没有关键帧时间，只能按帧存采样；运行时某条曲线比动作短时会一直保持最后一帧的值。
+所以可以安全去掉的冗余只有两类：
+  1) 曲线末尾的保持段（常量曲线就只剩 1 个值）
+  2) 多余的小数位：按容差量化到 d 位小数，使 0.5 * 10^-d <= 容差
+为保证动作时长不变，至少保留一条曲线为原始帧数。
+压缩后把两者都展开成稠密矩阵逐帧对比，最大误差超过容差时放弃该文件。
+"""
+import os
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sections.mtn_format import loads_mtn
+from sections.mtn_rewrite import iter_mtn_files
+from utils.common import atomic_write_text
+
+DEFAULT_TOLERANCE = 0.001
+# float32 的舍入误差余量
+_EPS = 1e-6
+
+
+def decimals_for_tolerance(tolerance: float):
+    """容差对应的保留小数位；容差为 0 时不量化"""
+    if tolerance <= 0:
+        return None
+    return max(0, math.ceil(-math.log10(2 * tolerance)))
+
+
+def max_error(original, compressed) -> float:
+    """两个动作展开成稠密矩阵后的最大逐帧误差（按原动作帧数比较）"""
+    frames = original.frame_count
+    a = original.held()
+    b = compressed.held()
+    if b.shape[1] < frames:
+        b = np.hstack([b, np.repeat(b[:, -1:], frames - b.shape[1], axis=1)]) if b.shape[1] else b
+    b = b[:, :frames]
+    if a.shape != b.shape:
+        return math.inf
+    mask = ~np.isnan(a)
+    if not mask.any():
+        return 0.0
+    diff = np.abs(a - b)[mask]
+    return math.inf if np.isnan(diff).any() else float(diff.max())
+
+
+def compress_motion(motion, tolerance: float = DEFAULT_TOLERANCE):
+    """返回 (压缩后的副本, 最大误差)；原对象不变"""
+    result = motion.copy()
+    if not motion.param_ids or motion.frame_count == 0:
+        return result, 0.0
+
+    orig = motion.held()
+    lengths = motion.lengths.astype(np.int64)
+    decimals = decimals_for_tolerance(tolerance)
+    q = np.round(orig, decimals).astype(np.float32) if decimals is not None else orig.copy()
+
+    rows = np.arange(len(lengths))
+    cols = np.arange(orig.shape[1])
+    valid = cols[None, :] < lengths[:, None]
+    last = q[rows, np.maximum(lengths - 1, 0)]
+
+    # 从第 k 帧起所有原始采样都落在 last ± 容差内，就只保留到 k（并把第 k 帧改成 last）
+    violates = (np.abs(orig - last[:, None]) > tolerance) & valid
+    has_violation = violates.any(axis=1)
+    last_violation = np.where(has_violation, orig.shape[1] - 1 - np.argmax(violates[:, ::-1], axis=1), -1)
+    new_lengths = np.minimum(last_violation + 2, lengths)
+    new_lengths[lengths == 0] = 0
+    cut = np.maximum(new_lengths - 1, 0)
+    nonempty = new_lengths > 0
+    q[rows[nonempty], cut[nonempty]] = last[nonempty]
+
+    # 保持动作时长：最长的那条曲线补回原始帧数
+    frames = motion.frame_count
+    if new_lengths.max() < frames:
+        keep = int(np.argmax(lengths))
+        q[keep, new_lengths[keep]:frames] = q[keep, cut[keep]]
+        new_lengths[keep] = frames
+
+    result.set_matrix(q, new_lengths)
+    return result, max_error(motion, result)
+
+
+def compress_mtn_file(path: str, tolerance: float = DEFAULT_TOLERANCE, dry_run: bool = False) -> dict:
+    """
+    压缩单个文件，返回 {"file", "action", "status", "reason", "before", "after", "max_error"}
+    status: updated / skipped（没有变小或误差超限）/ failed
+    """
+    result = {"file": path, "action": "压缩", "status": "skipped", "reason": "",
+              "before": 0, "after": 0, "max_error": 0.0}
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        before = len(text.encode("utf-8"))
+        motion = loads_mtn(text)
+        compressed, err = compress_motion(motion, tolerance)
+        new_text = compressed.dumps()
+        after = len(new_text.encode("utf-8"))
+        result.update(before=before, after=after, max_error=err)
+
+        if err > tolerance + _EPS:
+            result["reason"] = f"校验失败：最大误差 {err:.6g} 超过容差 {tolerance:g}"
+            return result
+        if after >= before:
+            result["reason"] = "已经是最小，无需压缩"
+            result["after"] = before
+            return result
+        if not dry_run:
+            atomic_write_text(path, new_text)
+        saved = before - after
+        result["status"] = "updated"
+        result["reason"] = (f"{before} → {after} 字节（-{saved * 100 / before:.1f}%），"
+                            f"最大误差 {err:.6g}" + ("（预览，未写入）" if dry_run else ""))
+    except Exception as e:
+        result["status"] = "failed"
+        result["reason"] = str(e)
+    return result
+
+
+def batch_compress_mtn(directory, tolerance: float = DEFAULT_TOLERANCE, dry_run: bool = False, max_workers=None):
+    """压缩目录下所有 .mtn，返回 (结果列表, 汇总字典)"""
+    files = list(iter_mtn_files(directory))
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda p: compress_mtn_file(p, tolerance, dry_run), files))
+
+    totals = {"files": len(files), "compressed": 0, "failed": 0, "before": 0, "after": 0}
+    for r in results:
+        totals["compressed"] += r["status"] == "updated"
+        totals["failed"] += r["status"] == "failed"
+        totals["before"] += r["before"]
+        totals["after"] += r["after"] if r["status"] == "updated" else r["before"]
+    return results, totals
+
+
+def format_compress_totals(totals: dict, dry_run: bool = False) -> str:
+    saved = totals["before"] - totals["after"]
+    ratio = saved * 100 / totals["before"] if totals["before"] else 0
+    verb = "可压缩" if dry_run else "已压缩"
+    return (f"共 {totals['files']} 个 .mtn，{verb} {totals['compressed']} 个，失败 {totals['failed']} 个；"
+            f"{totals['before']} → {totals['after']} 字节，节省 {saved} 字节（{ratio:.1f}%）")
@@ -0,0 +1,265 @@
+# sections/mtn_format.py
+"""
+Cubism 2 .mtn 动作文件的列式解析 / 写回
+
+.mtn 是纯文本：
+  # 注释
+  $fps=30
+  $fadein=1000
+  $fadein:PARAM_ANGLE_X=500      （参数级淡入淡出，也算头部键）
+  PARAM_ANGLE_X=0,0.5,1,1.5,...   （每帧一个采样）
+
+解析结果 MtnMotion：
+  param_ids  参数 id 列表，index 为 id -> 行号
+  values     float32 矩阵 (参数数, 最大帧数)，短曲线右侧用 NaN 填充
+  lengths    每条曲线的实际帧数
+所有数值在一次 numpy 转换里完成，之后的校验、重采样、拼接、统计都直接对矩阵做向量运算。
+
+写回是无损的：注释、空行、未知行、行尾符、BOM 原样保留；
+头部键和曲线没有被修改时输出原始文本，修改过的曲线按 float32 最短表示输出。
+"""
+import numpy as np
+
+from utils.common import atomic_write_text
+
+
+class MtnFormatError(Exception):
+    """.mtn 文件中含有无法解析的数值"""
+
+
+_RAW, _HEADER, _PARAM = 0, 1, 2
+
+
+def _split_tokens(value: str):
+    return [t for t in value.split(",") if t.strip()]
+
+
+def _format_values(arr: np.ndarray) -> str:
+    """float32 数组 -> "a,b,c"；相同的值只格式化一次"""
+    if arr.size == 0:
+        return ""
+    uniq, inverse = np.unique(arr, return_inverse=True)
+    texts = [np.format_float_positional(v, unique=True, trim="-") for v in uniq]
+    return ",".join(texts[i] for i in inverse.ravel())
+
+
+class MtnMotion:
+    def __init__(self):
+        self.header = {}            # "$fps" -> "30"（保持文件中的顺序）
+        self.param_ids = []
+        self.index = {}
+        self.values = np.empty((0, 0), dtype=np.float32)
+        self.lengths = np.empty(0, dtype=np.int32)
+        self.newline = "\n"
+        self.trailing_newline = True
+        self.bom = False
+        self._layout = []           # [(类型, 原始行文本 / 键 / 参数 id)]
+        self._orig_header = {}      # 键 -> (值, 原始行)
+        self._orig_curves = {}      # 参数 id -> (float32 数组, 原始行)
+
+    # ----- 基本属性 -----
+    @property
+    def fps(self) -> float:
+        try:
+            return float(self.header.get("$fps", 30))
+        except ValueError:
+            return 30.0
+
+    @fps.setter
+    def fps(self, value):
+        self.header["$fps"] = np.format_float_positional(float(value), trim="-")
+
+    @property
+    def frame_count(self) -> int:
+        return int(self.lengths.max()) if self.lengths.size else 0
+
+    @property
+    def duration(self) -> float:
+        """时长（秒）"""
+        return self.frame_count / self.fps if self.fps > 0 else 0.0
+
+    # ----- 曲线访问 -----
+    def curve(self, param_id: str) -> np.ndarray:
+        row = self.index[param_id]
+        return self.values[row, :self.lengths[row]]
+
+    def _ensure_width(self, width: int):
+        if width > self.values.shape[1]:
+            pad = np.full((self.values.shape[0], width - self.values.shape[1]), np.nan, dtype=np.float32)
+            self.values = np.hstack([self.values, pad])
+
+    def set_curve(self, param_id: str, data):
+        """设置（或新增）一条曲线"""
+        data = np.asarray(data, dtype=np.float32).ravel()
+        self._ensure_width(data.size)
+        row = self.index.get(param_id)
+        if row is None:
+            row = len(self.param_ids)
+            self.param_ids.append(param_id)
+            self.index[param_id] = row
+            self.values = np.vstack([self.values, np.full((1, self.values.shape[1]), np.nan, dtype=np.float32)])
+            self.lengths = np.append(self.lengths, np.int32(0))
+        self.values[row, :] = np.nan
+        self.values[row, :data.size] = data
+        self.lengths[row] = data.size
+
+    def remove_param(self, param_id: str):
+        row = self.index.pop(param_id)
+        self.param_ids.pop(row)
+        self.values = np.delete(self.values, row, axis=0)
+        self.lengths = np.delete(self.lengths, row)
+        self.index = {pid: i for i, pid in enumerate(self.param_ids)}
+
+    def set_matrix(self, values, lengths=None):
+        """整体替换矩阵（重采样 / 裁剪后用）；行顺序与 param_ids 一致"""
+        values = np.asarray(values, dtype=np.float32)
+        if values.ndim != 2 or values.shape[0] != len(self.param_ids):
+            raise ValueError("矩阵行数必须与参数数量一致")
+        if lengths is None:
+            lengths = np.full(values.shape[0], values.shape[1], dtype=np.int32)
+        self.values = values.copy()
+        self.lengths = np.asarray(lengths, dtype=np.int32).copy()
+        cols = np.arange(self.values.shape[1])
+        self.values[cols[None, :] >= self.lengths[:, None]] = np.nan
+
+    def held(self) -> np.ndarray:
+        """把每条曲线末尾的 NaN 用最后一帧的值补齐，得到稠密矩阵（空曲线仍为 NaN）"""
+        if self.values.size == 0:
+            return self.values.copy()
+        cols = np.arange(self.values.shape[1])
+        valid = cols[None, :] < self.lengths[:, None]
+        idx = np.where(valid, cols[None, :], 0)
+        np.maximum.accumulate(idx, axis=1, out=idx)
+        return np.take_along_axis(self.values, idx, axis=1)
+
+    def copy(self) -> "MtnMotion":
+        other = MtnMotion()
+        other.header = dict(self.header)
+        other.param_ids = list(self.param_ids)
+        other.index = dict(self.index)
+        other.values = self.values.copy()
+        other.lengths = self.lengths.copy()
+        other.newline, other.trailing_newline, other.bom = self.newline, self.trailing_newline, self.bom
+        other._layout = list(self._layout)
+        other._orig_header = dict(self._orig_header)
+        other._orig_curves = dict(self._orig_curves)
+        return other
+
+    # ----- 写回 -----
+    def _header_line(self, key: str) -> str:
+        value = self.header[key]
+        orig = self._orig_header.get(key)
+        if orig is not None and orig[0] == value:
+            return orig[1]
+        return f"{key}={value}"
+
+    def _param_line(self, param_id: str) -> str:
+        data = self.curve(param_id)
+        orig = self._orig_curves.get(param_id)
+        if orig is not None and orig[0].size == data.size and np.array_equal(orig[0], data):
+            return orig[1]
+        return f"{param_id}={_format_values(data)}"
+
+    def dumps(self) -> str:
+        out = []
+        written_header, written_params = set(), set()
+        last_header_pos = 0
+        for kind, item in self._layout:
+            if kind == _RAW:
+                out.append(item)
+            elif kind == _HEADER:
+                if item in self.header:
+                    out.append(self._header_line(item))
+                    written_header.add(item)
+                    last_header_pos = len(out)
+            elif item in self.index:
+                out.append(self._param_line(item))
+                written_params.add(item)
+
+        new_header = [f"{k}={v}" for k, v in self.header.items() if k not in written_header]
+        out[last_header_pos:last_header_pos] = new_header
+        out.extend(self._param_line(pid) for pid in self.param_ids if pid not in written_params)
+
+        text = self.newline.join(out)
+        if self.trailing_newline and out:
+            text += self.newline
+        return ("\ufeff" + text) if self.bom else text
+
+
+def loads_mtn(text: str) -> MtnMotion:
+    motion = MtnMotion()
+    if text.startswith("\ufeff"):
+        motion.bom = True
+        text = text[1:]
+    if "\r\n" in text:
+        motion.newline = "\r\n"
+    motion.trailing_newline = text.endswith("\n")
+
+    param_lines, param_values = [], []
+    for line_no, line in enumerate(text.splitlines(), 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or "=" not in stripped:
+            motion._layout.append((_RAW, line))
+            continue
+        key, value = stripped.split("=", 1)
+        key, value = key.strip(), value.strip()
+        if key.startswith("$"):
+            if key in motion.header:
+                motion._layout.append((_RAW, line))
+                continue
+            motion.header[key] = value
+            motion._orig_header[key] = (value, line)
+            motion._layout.append((_HEADER, key))
+        else:
+            if key in motion.index:
+                # 重复的参数行只保留第一条参与计算，其余原样写回
+                motion._layout.append((_RAW, line))
+                continue
+            motion.index[key] = len(motion.param_ids)
+            motion.param_ids.append(key)
+            param_lines.append((line_no, line))
+            param_values.append(_split_tokens(value))
+            motion._layout.append((_PARAM, key))
+
+    lengths = np.fromiter((len(t) for t in param_values), dtype=np.int32, count=len(param_values))
+    flat_tokens = [t for tokens in param_values for t in tokens]
+    try:
+        flat = np.array(flat_tokens, dtype=np.float32)
+    except ValueError:
+        # 定位出错的行
+        for (line_no, _), tokens in zip(param_lines, param_values):
+            try:
+                np.array(tokens, dtype=np.float32)
+            except ValueError as e:
+                raise MtnFormatError(f"第 {line_no} 行数值无效：{e}") from None
+        raise
+
+    width = int(lengths.max()) if lengths.size else 0
+    values = np.full((len(param_values), width), np.nan, dtype=np.float32)
+    if flat.size:
+        rows = np.repeat(np.arange(len(param_values)), lengths)
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        values[rows, np.arange(flat.size) - starts] = flat
+    motion.values, motion.lengths = values, lengths
+
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    for row, (pid, (_, line)) in enumerate(zip(motion.param_ids, param_lines)):
+        motion._orig_curves[pid] = (flat[offsets[row]:offsets[row + 1]].copy(), line)
+    return motion
+
+
+def read_mtn(path: str) -> MtnMotion:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    try:
+        return loads_mtn(text)
+    except MtnFormatError as e:
+        raise MtnFormatError(f"{path}: {e}") from None
+
+
+def dumps_mtn(motion: MtnMotion) -> str:
+    return motion.dumps()
+
+
+def write_mtn(path: str, motion: MtnMotion):
+    atomic_write_text(path, motion.dumps())
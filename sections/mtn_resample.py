@@ -0,0 +1,133 @@
+# sections/mtn_resample.py
+"""
+.mtn 帧率重采样 / 裁剪 / 循环
+
+全部在 MtnMotion 的稠密矩阵上一次完成（所有参数曲线同时插值），
+头部（$fadein / $fadeout / 参数级淡入淡出 / 注释）原样保留，只改 $fps。
+目录批处理用线程池并行，可覆盖原文件或输出到另一个目录（保持相对路径）。
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sections.mtn_format import loads_mtn
+from sections.mtn_rewrite import iter_mtn_files
+from utils.common import atomic_write_text
+
+
+def _apply_dense(motion, dense: np.ndarray, lengths: np.ndarray):
+    result = motion.copy()
+    result.set_matrix(dense, lengths)
+    return result
+
+
+def resample_motion(motion, target_fps: float):
+    """线性插值到目标帧率，时长不变"""
+    src_fps = motion.fps
+    frames = motion.frame_count
+    result = motion.copy()
+    if target_fps == src_fps:
+        return result
+    result.fps = target_fps
+    if frames == 0 or src_fps <= 0:
+        return result
+
+    ratio = target_fps / src_fps
+    new_frames = max(1, int(round(frames * ratio)))
+    dense = motion.held()
+    pos = np.arange(new_frames, dtype=np.float64) / ratio
+    i0 = np.minimum(np.floor(pos).astype(np.int64), frames - 1)
+    i1 = np.minimum(i0 + 1, frames - 1)
+    w = (pos - i0).astype(np.float32)
+    resampled = dense[:, i0] * (1 - w) + dense[:, i1] * w
+
+    lengths = motion.lengths.astype(np.int64)
+    new_lengths = np.clip(np.round(lengths * ratio).astype(np.int64), 1, new_frames)
+    new_lengths[lengths == 0] = 0
+    result.set_matrix(resampled, new_lengths)
+    return result
+
+
+def trim_motion(motion, start: float = 0.0, end: float = None):
+    """按秒裁剪 [start, end)；end 为空表示到结尾"""
+    frames = motion.frame_count
+    fps = motion.fps
+    first = min(frames, max(0, int(round(start * fps))))
+    last = frames if end is None else min(frames, max(first, int(round(end * fps))))
+    if first == 0 and last == frames:
+        return motion.copy()
+
+    dense = motion.held()[:, first:last]
+    lengths = motion.lengths.astype(np.int64)
+    new_lengths = np.clip(lengths - first, 1, last - first) if last > first else np.zeros_like(lengths)
+    new_lengths[lengths == 0] = 0
+    return _apply_dense(motion, dense, new_lengths)
+
+
+def loop_motion(motion, count: int):
+    """整段重复 count 次"""
+    if count <= 1 or motion.frame_count == 0:
+        return motion.copy()
+    dense = np.tile(motion.held(), (1, count))
+    lengths = np.where(motion.lengths > 0, dense.shape[1], 0)
+    return _apply_dense(motion, dense, lengths)
+
+
+def transform_motion(motion, target_fps=None, start=0.0, end=None, loop=1):
+    """依次执行：裁剪 → 循环 → 重采样"""
+    if start or end is not None:
+        motion = trim_motion(motion, start, end)
+    if loop and loop > 1:
+        motion = loop_motion(motion, loop)
+    if target_fps:
+        motion = resample_motion(motion, target_fps)
+    return motion
+
+
+def transform_mtn_file(path: str, output_path: str = None, dry_run: bool = False, **options) -> dict:
+    """
+    处理单个文件，options 同 transform_motion；
+    返回 {"file", "action", "status", "reason"}，status: updated / skipped / failed
+    """
+    result = {"file": path, "action": "重采样", "status": "skipped", "reason": ""}
+    output_path = output_path or path
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            old_text = f.read()
+        motion = loads_mtn(old_text)
+        new_motion = transform_motion(motion, **options)
+        new_text = new_motion.dumps()
+        if new_text == old_text and output_path == path:
+            result["reason"] = "无需改动"
+            return result
+        if not dry_run:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            atomic_write_text(output_path, new_text)
+        result["status"] = "updated"
+        result["reason"] = (f"{motion.fps:g}fps × {motion.frame_count} 帧 → "
+                            f"{new_motion.fps:g}fps × {new_motion.frame_count} 帧"
+                            + ("（预览，未写入）" if dry_run else ""))
+    except Exception as e:
+        result["status"] = "failed"
+        result["reason"] = str(e)
+    return result
+
+
+def batch_transform_mtn(directory, output_dir=None, dry_run=False, max_workers=None, **options):
+    """
+    批量处理目录下所有 .mtn；output_dir 为空时覆盖原文件，否则按相对路径输出到 output_dir。
+    返回结果列表。
+    """
+    files = list(iter_mtn_files(directory))
+    if output_dir and os.path.abspath(output_dir).startswith(os.path.abspath(directory) + os.sep):
+        out_abs = os.path.abspath(output_dir)
+        files = [f for f in files if not os.path.abspath(f).startswith(out_abs + os.sep)]
+
+    def _one(path):
+        out = os.path.join(output_dir, os.path.relpath(path, directory)) if output_dir else None
+        return transform_mtn_file(path, out, dry_run=dry_run, **options)
+
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_one, files))
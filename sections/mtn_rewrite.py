@@ -0,0 +1,96 @@
+"""
+批量改写 .mtn 参数行
+
+- 线程池并行扫描
+- 一次遍历可同时处理多个参数：edits = {"PARAM_IMPORT": "50", "PARAM_XXX": None}
+  值为 None 表示删除该参数行，否则设置为该值（找不到就追加到末尾）
+- 内容没有变化的文件不写盘；有变化的用临时文件 + os.replace 原子替换
+- dry_run=True 时只统计，不写入
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.common import atomic_write_text
+
+
+def _line_ending(line: str) -> str:
+    if line.endswith("\r\n"):
+        return "\r\n"
+    if line.endswith("\n"):
+        return "\n"
+    return ""
+
+
+def rewrite_mtn_text(text: str, edits: dict) -> str:
+    """对 .mtn 文本应用 edits，保留原有换行符；返回新文本"""
+    lines = text.splitlines(keepends=True)
+    default_eol = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+
+    for name, value in edits.items():
+        prefix = f"{name}="
+        if value is None:
+            lines = [line for line in lines if not line.strip().startswith(prefix)]
+            continue
+        new_body = f"{name}={value}"
+        for i, line in enumerate(lines):
+            if line.strip().startswith(prefix):
+                lines[i] = new_body + (_line_ending(line) or default_eol)
+                break
+        else:
+            if lines and not _line_ending(lines[-1]):
+                lines[-1] += default_eol
+            lines.append(new_body + default_eol)
+    return "".join(lines)
+
+
+def iter_mtn_files(directory):
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith(".mtn"):
+                yield os.path.join(root, file)
+
+
+def _process_one(file_path: str, edits: dict, dry_run: bool):
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    new_text = rewrite_mtn_text(text, edits)
+    if new_text == text:
+        return False
+    if not dry_run:
+        atomic_write_text(file_path, new_text)
+    return True
+
+
+def rewrite_mtn_files(directory, edits: dict, dry_run: bool = False, max_workers=None) -> dict:
+    """
+    返回统计：{"scanned", "changed", "unchanged", "failed", "changed_files", "errors"}
+    dry_run 时 changed / changed_files 表示「将会修改」的文件
+    """
+    files = list(iter_mtn_files(directory))
+    stats = {"scanned": len(files), "changed": 0, "unchanged": 0, "failed": 0,
+             "changed_files": [], "errors": []}
+    if not files or not edits:
+        stats["unchanged"] = len(files)
+        return stats
+
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [(path, pool.submit(_process_one, path, edits, dry_run)) for path in files]
+        for path, fut in futures:
+            try:
+                if fut.result():
+                    stats["changed"] += 1
+                    stats["changed_files"].append(path)
+                else:
+                    stats["unchanged"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                stats["errors"].append((path, str(e)))
+                print(f"处理 {path} 时出错: {e}")
+    return stats
+
+
+def format_rewrite_stats(stats: dict, dry_run: bool = False) -> str:
+    verb = "将修改" if dry_run else "已修改"
+    return (f"共扫描 {stats['scanned']} 个 .mtn：{verb} {stats['changed']} 个，"
+            f"无需改动 {stats['unchanged']} 个，失败 {stats['failed']} 个")
@@ -0,0 +1,208 @@
+# sections/mtn_splice.py
+"""
+断手断脚：按 mtn.json 的身体区域拼接多个 .mtn 动作
+
+mtn.json 把参数分成 left_hand / right_hand / left_arm / right_arm / upper_body 等区域。
+以一个动作为底（base），指定区域的参数改用其他动作的曲线，例如「手臂用 A，身体用 B」：
+  - 其他来源的帧率与底动作不同时先重采样
+  - 长度以底动作为准，来源更短时保持最后一帧，更长时截断
+  - 每个区域可设置交叉淡入时长：开头从底动作的值过渡到来源动作的值
+  - 来源动作里没有的参数保持底动作的值
+批量模式对「底动作列表 × 来源动作列表」生成全部组合，并行写出。
+"""
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sections.mtn_format import read_mtn
+from sections.mtn_resample import resample_motion
+from sections.mtn_rewrite import iter_mtn_files
+from utils.common import atomic_write_text
+
+DEFAULT_REGION_MAP = "mtn.json"
+ARM_REGIONS = ("left_hand", "right_hand", "left_arm", "right_arm")
+
+
+def load_region_map(path: str = DEFAULT_REGION_MAP) -> dict:
+    """读取 mtn.json，返回 {区域: [参数 id]}"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {region: list(ids) for region, ids in data.items() if isinstance(ids, list)}
+
+
+def compile_region_map(region_map: dict) -> dict:
+    """{区域: [参数 id]} -> {参数 id: 区域}；同一参数出现在多个区域时以先出现的为准"""
+    lookup = {}
+    for region, ids in region_map.items():
+        for pid in ids:
+            lookup.setdefault(pid, region)
+    return lookup
+
+
+def _fit_frames(dense: np.ndarray, frames: int) -> np.ndarray:
+    """截断或保持最后一帧，使列数等于 frames"""
+    if dense.shape[1] >= frames:
+        return dense[:, :frames]
+    if dense.shape[1] == 0:
+        return np.full((dense.shape[0], frames), np.nan, dtype=np.float32)
+    return np.hstack([dense, np.repeat(dense[:, -1:], frames - dense.shape[1], axis=1)])
+
+
+def splice_motions(base, parts: dict, region_map: dict, fades: dict = None):
+    """
+    Args:
+        base: 底动作 MtnMotion
+        parts: {区域: MtnMotion}，这些区域的参数改用对应动作
+        region_map: {区域: [参数 id]}（load_region_map 的结果）
+        fades: {区域: 交叉淡入秒数}，缺省为 0（直接切换）
+    Returns:
+        新的 MtnMotion（头部沿用底动作）
+    """
+    fades = fades or {}
+    result = base.copy()
+    frames = base.frame_count
+    base_dense = base.held()
+
+    for region, source in parts.items():
+        ids = region_map.get(region)
+        if not ids or source is None:
+            continue
+        if source.fps != base.fps:
+            source = resample_motion(source, base.fps)
+        src_ids = [pid for pid in ids if pid in source.index]
+        if not src_ids:
+            continue
+        if frames == 0:
+            frames = source.frame_count
+            base_dense = _fit_frames(base_dense, frames)
+
+        src_rows = np.fromiter((source.index[pid] for pid in src_ids), dtype=np.int64, count=len(src_ids))
+        src = _fit_frames(source.held()[src_rows], frames)
+
+        fade_frames = int(round(fades.get(region, 0) * base.fps))
+        if fade_frames > 0:
+            w = np.clip(np.arange(frames, dtype=np.float32) / fade_frames, 0, 1)
+            start = np.stack([
+                base_dense[base.index[pid]] if pid in base.index else src[i]
+                for i, pid in enumerate(src_ids)
+            ])
+            start = np.where(np.isnan(start), src, start)
+            src = start * (1 - w) + src * w
+
+        for i, pid in enumerate(src_ids):
+            result.set_curve(pid, src[i])
+    return result
+
+
+def splice_files(base_path: str, part_paths: dict, region_map: dict, output_path: str, fades: dict = None):
+    """文件版 splice_motions；part_paths: {区域: .mtn 路径}"""
+    base = read_mtn(base_path)
+    parts = {region: read_mtn(path) for region, path in part_paths.items()}
+    atomic_write_text(output_path, splice_motions(base, parts, region_map, fades).dumps())
+    return output_path
+
+
+def _without_dir(paths, exclude_dir):
+    """去掉 exclude_dir（输出目录）下的文件，避免输出目录在来源目录里时把上次的结果当成输入"""
+    if not exclude_dir:
+        return paths
+    out_abs = os.path.abspath(exclude_dir)
+    return [p for p in paths if not os.path.abspath(p).startswith(out_abs + os.sep)]
+
+
+def _collect(paths_or_dir, exclude_dir=None):
+    """返回 {路径: 输出文件名用的标签}；目录按相对路径取标签，重名时加 _2、_3…"""
+    if isinstance(paths_or_dir, str):
+        if os.path.isdir(paths_or_dir):
+            paths = _without_dir(sorted(iter_mtn_files(paths_or_dir)), exclude_dir)
+            return _unique_labels((p, _stem(os.path.relpath(p, paths_or_dir))) for p in paths)
+        paths_or_dir = [p for p in paths_or_dir.split(";") if p.strip()]
+    paths = [p.strip().strip('"') for p in paths_or_dir]
+    return _unique_labels((p, _stem(os.path.basename(p))) for p in paths)
+
+
+def _stem(path: str) -> str:
+    """去掉扩展名；子目录部分用 - 连接（a/idle.mtn -> a-idle）"""
+    stem = os.path.splitext(path)[0]
+    return "-".join(part for part in stem.replace("\\", "/").split("/") if part)
+
+
+def _unique_labels(items) -> dict:
+    labels = {}
+    used = set()
+    for path, label in items:
+        if path in labels:
+            continue
+        final, i = label, 2
+        while final in used:
+            final = f"{label}_{i}"
+            i += 1
+        used.add(final)
+        labels[path] = final
+    return labels
+
+
+def batch_splice(base_files, part_files, regions, output_dir, region_map=None,
+                 fade: float = 0.0, dry_run: bool = False, max_workers=None):
+    """
+    生成 底动作 × 来源动作 的全部组合：每个组合把 regions 中的区域替换为来源动作的曲线。
+    base_files / part_files 可以是目录、用 ; 分隔的字符串或路径列表。
+    输出文件名：<底动作>__<来源动作>.mtn（从目录收集时用相对路径，如 a-idle__b-wave.mtn）
+    返回 [{"file", "action", "status", "reason"}]
+    """
+    region_map = region_map if region_map is not None else load_region_map()
+    unknown = [r for r in regions if r not in region_map]
+    if unknown:
+        raise ValueError(f"mtn.json 中没有这些区域：{', '.join(unknown)}")
+
+    bases = _collect(base_files, output_dir)
+    sources = _collect(part_files, output_dir)
+    fades = {region: fade for region in regions}
+
+    # 每个文件只解析一次
+    cache = {}
+    for path in dict.fromkeys(list(bases) + list(sources)):
+        try:
+            cache[path] = read_mtn(path)
+        except Exception as e:
+            cache[path] = e
+
+    def _one(base_path, part_path, out_path):
+        result = {"file": out_path, "action": "拼接", "status": "failed", "reason": ""}
+        base, part = cache[base_path], cache[part_path]
+        for path, motion in ((base_path, base), (part_path, part)):
+            if isinstance(motion, Exception):
+                result["reason"] = f"{os.path.basename(path)} 解析失败：{motion}"
+                return result
+        try:
+            spliced = splice_motions(base, {region: part for region in regions}, region_map, fades)
+            if not dry_run:
+                atomic_write_text(out_path, spliced.dumps())
+            result["status"] = "exported"
+            result["reason"] = f"底：{os.path.basename(base_path)}，{'/'.join(regions)}：{os.path.basename(part_path)}"
+        except Exception as e:
+            result["reason"] = str(e)
+        return result
+
+    if not dry_run:
+        os.makedirs(output_dir, exist_ok=True)
+    # 提交前检查输出文件名冲突：并发写同一个文件会互相覆盖，后出现的组合记为跳过
+    combos, results = [], []
+    owners = {}
+    for b in bases:
+        for p in sources:
+            if os.path.abspath(b) == os.path.abspath(p):
+                continue
+            out_path = os.path.join(output_dir, f"{bases[b]}__{sources[p]}.mtn")
+            key = os.path.normcase(os.path.abspath(out_path))
+            if key in owners:
+                results.append({"file": out_path, "action": "拼接", "status": "skipped",
+                                "reason": f"与 {owners[key]} 输出到同一文件，跳过：{b} + {p}"})
+                continue
+            owners[key] = f"{os.path.basename(b)} + {os.path.basename(p)}"
+            combos.append((b, p, out_path))
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda args: _one(*args), combos)) + results
@@ -0,0 +1,79 @@
+"""
+部件预设的位图索引
+
+只给预设里出现过的部件 ID 分配比特位（每个索引一张表），
+预设和模型的「可见部件集合」都表示成一个 int 位图；
+模型里不属于任何预设的部件不分配比特位，只记个数：
+  - 精确匹配：有未知部件时不可能与任何预设一致，否则位图直接查字典
+  - 相近预设：按 Jaccard 相似度（交集位数 / 并集位数）挑最接近的，未知部件只计入并集大小
+扫描再多模型，位图的位数也不会超过预设中的部件总数。
+"""
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+class PresetIndex:
+    def __init__(self, presets: dict = None):
+        self._bits: Dict[str, int] = {}        # 部件 ID -> 比特位（只含预设中的部件）
+        self._masks: Dict[str, int] = {}       # 预设名 -> 位图
+        self._by_mask: Dict[int, str] = {}     # 位图 -> 预设名（同一位图只记第一个）
+        self._sizes: Dict[str, int] = {}       # 预设名 -> 部件数
+        if presets:
+            self.load(presets)
+
+    def load(self, presets: dict):
+        """presets: parts.json 的内容 {预设名: [部件 ID, ...]}"""
+        # 先建好新表再整体替换，扫描线程读到的总是一致的一套
+        bits, masks, by_mask, sizes = {}, {}, {}, {}
+        for name, part_ids in presets.items():
+            mask = 0
+            for pid in part_ids or []:
+                bit = bits.get(pid)
+                if bit is None:
+                    bit = bits[pid] = 1 << len(bits)
+                mask |= bit
+            masks[name] = mask
+            sizes[name] = _popcount(mask)
+            by_mask.setdefault(mask, name)
+        self._bits, self._masks, self._by_mask, self._sizes = bits, masks, by_mask, sizes
+
+    def __len__(self):
+        return len(self._masks)
+
+    def _to_mask(self, part_ids: Iterable[str]) -> Tuple[int, int]:
+        """返回 (已知部件的位图, 不属于任何预设的部件个数)"""
+        bits = self._bits
+        mask = 0
+        unknown = set()
+        for pid in part_ids:
+            bit = bits.get(pid)
+            if bit is None:
+                unknown.add(pid)
+            else:
+                mask |= bit
+        return mask, len(unknown)
+
+    def detect(self, visible_parts: Iterable[str]) -> Optional[str]:
+        """可见部件集合与某个预设完全一致时返回预设名，否则 None"""
+        mask, unknown = self._to_mask(visible_parts)
+        if unknown:
+            return None
+        return self._by_mask.get(mask)
+
+    def closest(self, visible_parts: Iterable[str]) -> Tuple[Optional[str], float]:
+        """返回 (最接近的预设名, Jaccard 相似度)；没有任何交集时返回 (None, 0.0)"""
+        mask, unknown = self._to_mask(visible_parts)
+        size = _popcount(mask) + unknown
+        best_name, best_score = None, 0.0
+        for name, preset_mask in self._masks.items():
+            inter = _popcount(mask & preset_mask)
+            if not inter:
+                continue
+            # |A ∪ B| = |A| + |B| - |A ∩ B|
+            score = inter / (size + self._sizes[name] - inter)
+            if score > best_score:
+                best_name, best_score = name, score
+        return best_name, best_score
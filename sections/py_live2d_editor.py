@@ -1,147 +1,262 @@
 import os
-import json
-import tempfile
-import pygame
-import live2d.v2 as live2d
+import atexit
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
 
-from utils.common import _norm_id
+try:
+    import pygame
+    import live2d.v2 as live2d
+    _GL_AVAILABLE = True
+except ImportError:
+    # 无头构建机上可以只装纯 Python 依赖，此时只能使用 .moc 直读后端
+    pygame = None
+    live2d = None
+    _GL_AVAILABLE = False
+
+from sections.model_meta_cache import ModelMetaCache
+from sections.moc_reader import MocFormatError, read_model_metadata, resolve_moc_path
+from sections.stripped_json import get_stripped_json, release_stripped_json
+from utils.common import _norm_id, load_config
+
+# 解析后端：
+#   "gl"   —— 用 live2d 原生库在隐藏 GL 上下文里加载模型（与运行时完全一致）
+#   "moc"  —— 纯 Python 直接读取 .moc 文件，不需要 pygame/OpenGL，速度快
+#   "auto" —— 先尝试 .moc 直读，失败再回退到 GL
+INTROSPECTION_BACKENDS = ("auto", "moc", "gl")
+_config = load_config()
+_backend = _config.get("introspection_backend") or ("gl" if _GL_AVAILABLE else "moc")
+
+# 部件/参数元数据缓存，可在 config.json 中设置 "model_meta_cache": false 关闭
+_meta_cache = ModelMetaCache() if _config.get("model_meta_cache", True) else None
 
 
 def _load_json_without_motions_expressions(model_json_path):
-    """读取 JSON 文件，移除 motions 和 expressions 字段，返回临时文件路径"""
-    with open(model_json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    # 移除 motions 和 expressions 字段
-    if "motions" in data:
-        del data["motions"]
-    if "expressions" in data:
-        del data["expressions"]
-    
-    
-    # 2. 保留 groups 数组（可能包含透明度组设置）
-    if "groups" in data:
-        # 保持 groups 数组完整
-        pass
-    
-    if "init_opacities" in data:
-        # 保持 init_opacities 完整
-        pass
-    
-    # 创建临时文件
-    temp_dir = os.path.dirname(model_json_path)
-    temp_fd, temp_path = tempfile.mkstemp(suffix=".json", dir=temp_dir, text=True)
-    try:
-        with os.fdopen(temp_fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return temp_path
-    except Exception:
-        os.close(temp_fd)
-        raise
-
-def get_all_parts(model_path):
-    temp_path = None
-    try:
-        # 创建不包含 motions 和 expressions 的临时 JSON 文件
-        temp_path = _load_json_without_motions_expressions(model_path)
-        
-        pygame.init()
-        pygame.display.set_mode((1, 1), pygame.OPENGL | pygame.HIDDEN)
-        live2d.init()
-        live2d.glewInit()
-        model = live2d.LAppModel()
-        model.LoadModelJson(temp_path)
-        part_ids = model.GetPartIds()
-        live2d.dispose()
-        pygame.quit()
-        return part_ids
-    finally:
-        # 清理临时文件
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-
-def get_all_param_info_list(model_json_path):
-    temp_path = None
-    try:
-        # 创建不包含 motions 和 expressions 的临时 JSON 文件
-        temp_path = _load_json_without_motions_expressions(model_json_path)
-        
-        pygame.init()
-        pygame.display.set_mode((1, 1), pygame.OPENGL | pygame.HIDDEN)
-        live2d.init()
-        live2d.glewInit()
-
-        model = live2d.LAppModel()
-        model.LoadModelJson(temp_path)
-
-        info_list = []
+    """返回移除 motions 和 expressions 字段后的 JSON 路径（内容不变时复用缓存文件；加载完后调用 release_stripped_json）"""
+    return get_stripped_json(model_json_path)
+
+
+# ========= 常驻解析线程 =========
+class Live2DIntrospector:
+    """
+    常驻的 Live2D 解析线程：
+      - 第一次请求时才创建隐藏的 pygame/OpenGL 窗口并初始化 live2d（懒启动）
+      - 之后所有请求排队在同一个 GL 上下文里执行，不再反复 init/dispose
+      - shutdown() 会在处理完已排队的请求后释放上下文；下次请求会自动重新启动
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._ready = None
+        self._stopping = None   # 已发出结束标记、可能还在收尾的上一代线程
+        self._lock = threading.Lock()
+
+    def _ensure_started_locked(self):
+        """调用方需持有 _lock。每一代解析线程使用自己的队列，旧线程的结束标记不会被新线程取走"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        previous = self._thread or self._stopping
+        self._stopping = None
+        self._queue = queue.Queue()
+        self._ready = Future()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._queue, self._ready, previous),
+            name="Live2DIntrospector", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, func, *args) -> Future:
+        """把 func(*args) 放到解析线程中执行，返回 Future"""
+        fut = Future()
+        with self._lock:
+            self._ensure_started_locked()
+            ready = self._ready
+            self._queue.put((func, args, fut))
+        # 初始化失败时把异常抛给调用方
+        ready.result()
+        return fut
+
+    def call(self, func, *args):
+        """同步执行：阻塞直到解析线程返回结果（异常会原样抛出）"""
+        return self.submit(func, *args).result()
+
+    def is_running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def shutdown(self, timeout=None):
+        """处理完已排队的请求后释放 GL 上下文"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return
+            self._queue.put(None)
+            # 之后的 submit 会启动新一代线程（新队列），新线程会先等这一代退出再初始化
+            self._thread = None
+            self._stopping = thread
+        thread.join(timeout)
+
+    def _run(self, jobs: queue.Queue, ready: Future, previous=None):
+        # 上一代线程可能还在处理剩余请求；等它 dispose/quit 完再初始化，避免两个线程同时操作 pygame
+        if previous is not None:
+            previous.join()
         try:
-            count = model.GetParameterCount()
-            for i in range(count):
-                p = model.GetParameter(i)
-                pid = _norm_id(getattr(p, "id", ""))
-                pdefault = float(getattr(p, "default", 0.0) or 0.0)
-                pmin = float(getattr(p, "min", 0.0) or 0.0)
-                pmax = float(getattr(p, "max", 1.0) or 1.0)
-                pvalue = float(getattr(p, "value", pdefault) or pdefault)
-
-                info_list.append({
-                    "id": pid,
-                    "default": pdefault,
-                    "min": pmin,
-                    "max": pmax,
-                    "value": pvalue,
-                })
+            pygame.init()
+            pygame.display.set_mode((1, 1), pygame.OPENGL | pygame.HIDDEN)
+            live2d.init()
+            live2d.glewInit()
+        except BaseException as e:
+            pygame.quit()
+            ready.set_exception(e)
+            return
+        ready.set_result(None)
+
+        try:
+            while True:
+                item = jobs.get()
+                if item is None:
+                    break
+                func, args, fut = item
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    fut.set_result(func(*args))
+                except BaseException as e:
+                    fut.set_exception(e)
         finally:
-            # 先抽取完，再释放上下文
             live2d.dispose()
             pygame.quit()
 
-        return info_list
-    finally:
-        # 清理临时文件
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-
-def list_model_info(model_json_path):
-    temp_path = None
-    try:
-        # 创建不包含 motions 和 expressions 的临时 JSON 文件
-        temp_path = _load_json_without_motions_expressions(model_json_path)
-        
-        pygame.init()
-        pygame.display.set_mode((1, 1), pygame.OPENGL | pygame.HIDDEN)
-        live2d.init()
-        live2d.glewInit()
 
-        model = live2d.LAppModel()
-        model.LoadModelJson(temp_path)
+_introspector = Live2DIntrospector()
 
-        part_ids = model.GetPartIds()
 
-        param_info_list = []
-        for i in range(model.GetParameterCount()):
-            param = model.GetParameter(i)
-            param_info_list.append(param)  # 是 Parameter 类型，含 default/value/id 等
+def get_introspector() -> Live2DIntrospector:
+    return _introspector
 
-        live2d.dispose()
-        pygame.quit()
 
-        return part_ids, param_info_list
+def shutdown_introspector(timeout=None):
+    """释放常驻解析线程的 GL 上下文（退出程序、或其它窗口要独占 pygame 显示时调用）"""
+    _introspector.shutdown(timeout)
+
+
+atexit.register(shutdown_introspector, 2.0)
+
+
+# ========= 以下函数只在解析线程中执行 =========
+def _load_model(model_json_path):
+    # 使用不包含 motions 和 expressions 的 JSON（由 stripped_json 缓存统一管理）
+    model = live2d.LAppModel()
+    stripped_path = _load_json_without_motions_expressions(model_json_path)
+    try:
+        model.LoadModelJson(stripped_path)
     finally:
-        # 清理临时文件
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
+        release_stripped_json(stripped_path)
+    return model
+
+
+def _read_param_info_list(model):
+    info_list = []
+    count = model.GetParameterCount()
+    for i in range(count):
+        p = model.GetParameter(i)
+        pid = _norm_id(getattr(p, "id", ""))
+        pdefault = float(getattr(p, "default", 0.0) or 0.0)
+        pmin = float(getattr(p, "min", 0.0) or 0.0)
+        pmax = float(getattr(p, "max", 1.0) or 1.0)
+        pvalue = float(getattr(p, "value", pdefault) or pdefault)
+
+        info_list.append({
+            "id": pid,
+            "default": pdefault,
+            "min": pmin,
+            "max": pmax,
+            "value": pvalue,
+        })
+    return info_list
+
+
+def _introspect_all(model_json_path):
+    model = _load_model(model_json_path)
+    return list(model.GetPartIds()), _read_param_info_list(model)
+
+
+# ========= .moc 直读后端 =========
+def _moc_all(model_json_path):
+    meta = read_model_metadata(model_json_path)
+    return meta.part_ids, meta.params
+
+
+# ========= 对外接口（任意线程可调用）=========
+def set_introspection_backend(name: str):
+    global _backend
+    if name not in INTROSPECTION_BACKENDS:
+        raise ValueError(f"未知的解析后端：{name}（可选 {', '.join(INTROSPECTION_BACKENDS)}）")
+    _backend = name
+
+
+def get_introspection_backend() -> str:
+    return _backend
+
+
+def get_meta_cache():
+    """返回元数据缓存（未启用时为 None），可用 .stats() 查看命中情况"""
+    return _meta_cache
+
+
+def _introspect_uncached(model_json_path, backend):
+    if backend in ("auto", "moc"):
+        try:
+            return _moc_all(model_json_path)
+        except (MocFormatError, OSError, ValueError) as e:
+            if backend == "moc" or not _GL_AVAILABLE:
+                raise
+            print(f"⚠️ .moc 直读失败，回退到 GL 解析: {model_json_path}, 原因: {e}")
+
+    if not _GL_AVAILABLE:
+        raise RuntimeError("未安装 pygame / live2d-py，无法使用 GL 解析后端")
+    return _introspector.call(_introspect_all, model_json_path)
+
+
+def _introspect(model_json_path, backend=None):
+    backend = backend or _backend
+    if backend not in INTROSPECTION_BACKENDS:
+        raise ValueError(f"未知的解析后端：{backend}")
+
+    moc_path = None
+    if _meta_cache is not None:
+        try:
+            moc_path = resolve_moc_path(model_json_path)
+            cached = _meta_cache.get(moc_path)
+            if cached is not None:
+                return cached
+        except (MocFormatError, OSError, ValueError, sqlite3.Error) as e:
+            print(f"⚠️ 读取元数据缓存失败: {model_json_path}, 原因: {e}")
+            moc_path = None
+
+    part_ids, info_list = _introspect_uncached(model_json_path, backend)
+
+    if moc_path is not None:
+        try:
+            _meta_cache.put(moc_path, part_ids, info_list)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ 写入元数据缓存失败: {moc_path}, 原因: {e}")
+    return list(part_ids), info_list
+
+
+def get_all_parts(model_path, backend=None):
+    return _introspect(model_path, backend)[0]
+
+def get_all_param_info_list(model_json_path, backend=None):
+    return _introspect(model_json_path, backend)[1]
 
+def list_model_info(model_json_path, backend=None):
+    """返回 (部件 ID 列表, 参数列表)；参数为带 id/default/min/max/value 属性的对象"""
+    part_ids, info_list = _introspect(model_json_path, backend)
+    return part_ids, [SimpleNamespace(**info) for info in info_list]
 
 
 if __name__ == "__main__":
@@ -159,4 +274,4 @@ if __name__ == "__main__":
 
         print("\n🎛 参数名列表（含默认值）：")
         for i, param in enumerate(params):
-            print(f"  {i+1}. {param.id} | 默认值: {param.default} | 当前值: {param.value}")
\ No newline at end of file
+            print(f"  {i+1}. {param.id} | 默认值: {param.default} | 当前值: {param.value}")
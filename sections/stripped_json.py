@@ -0,0 +1,185 @@
+"""
+去掉 motions / expressions 的 model.json 缓存
+
+加载模型时只需要模型本体，原来每次都在模型目录里 mkstemp 写一份再删掉。
+这里按「源文件内容 + 覆盖字段」做内容寻址：源文件没变就复用同一个文件，
+程序退出时统一清理。
+
+存放位置由 config.json 的 "stripped_json_dir" 决定（每个进程一个子目录）：
+  - 不设置（默认）：系统临时目录
+  - "ram"：放到内存盘（/dev/shm，没有则用系统临时目录）
+  - 其它字符串：放到该目录
+v2 模型的资源路径会改写成绝对路径，所以不用写进模型目录。
+v3 模型（.model3.json）的路径由原生库拼接，只能放在模型目录里（隐藏文件）；
+这类文件在加载完后要调用 release_stripped_json，最后一个使用者释放时立即删除，不在模型目录里留到退出。
+每次 get_stripped_json 都要对应一次 release_stripped_json（按引用计数管理）。
+"""
+import os
+import json
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+
+from utils.common import load_config
+
+# v2 model.json 中引用资源文件的字段
+_V2_PATH_KEYS = ("model", "physics", "pose")
+
+_lock = threading.Lock()
+_owned_files = set()      # 本进程生成的文件，退出时删除
+_latest = {}              # (源文件绝对路径, 覆盖字段摘要) -> 当前有效的缓存文件
+_refs = {}                # 缓存文件 -> 已取得但还没 release 的次数（多个加载器可能共用同一个文件）
+_stale = set()            # 已被新版本取代、等引用归零后再删的文件
+_external_dir = None      # 模型目录以外的存放目录（懒创建）
+
+
+def _resolve_external_dir():
+    global _external_dir
+    if _external_dir is not None:
+        return _external_dir
+
+    setting = load_config().get("stripped_json_dir")
+    if not setting:
+        base = tempfile.gettempdir()
+    elif setting == "ram":
+        base = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+    else:
+        base = setting
+    try:
+        os.makedirs(base, exist_ok=True)
+        # 每个进程一个子目录，批量解析的多个工作进程互不影响
+        _external_dir = tempfile.mkdtemp(prefix="live2d_stripped_", dir=base)
+    except OSError as e:
+        print(f"⚠️ 无法创建去动作 JSON 缓存目录 {base}，改为放在模型目录: {e}")
+        _external_dir = ""
+    return _external_dir
+
+
+def _absolutize_v2_paths(data, base_dir):
+    def _abs(p):
+        return os.path.normpath(os.path.join(base_dir, p)) if isinstance(p, str) and p else p
+
+    for key in _V2_PATH_KEYS:
+        if key in data:
+            data[key] = _abs(data[key])
+    if isinstance(data.get("textures"), list):
+        data["textures"] = [_abs(t) for t in data["textures"]]
+
+
+def get_stripped_json(model_json_path, overrides: dict = None) -> str:
+    """
+    返回去掉 motions / expressions（并应用 overrides 覆盖字段，如 init_opacities）后的
+    model.json 路径。源文件与 overrides 不变时直接复用，不会重复写盘。
+    返回的文件由本模块管理，调用方不要自己删除；加载完成后调用 release_stripped_json。
+    """
+    src_path = os.path.abspath(model_json_path)
+    with open(src_path, "rb") as f:
+        raw = f.read()
+
+    overrides_blob = json.dumps(overrides, ensure_ascii=False, sort_keys=True).encode("utf-8") if overrides else b""
+    h = hashlib.sha1(src_path.encode("utf-8"))
+    h.update(b"\0")
+    h.update(raw)
+    h.update(b"\0")
+    h.update(overrides_blob)
+    digest = h.hexdigest()[:16]
+
+    is_v3 = src_path.endswith(".model3.json")
+    src_dir = os.path.dirname(src_path)
+    out_dir = "" if is_v3 else _resolve_external_dir()
+    stem = os.path.basename(src_path)[:-len(".json")]
+    if out_dir:
+        out_path = os.path.join(out_dir, f"{stem}.{digest}.json")
+    else:
+        out_path = os.path.join(src_dir, f".{stem}.{digest}.stripped.json")
+
+    latest_key = (src_path, hashlib.sha1(overrides_blob).hexdigest())
+    with _lock:
+        if out_path in _owned_files and os.path.exists(out_path):
+            _refs[out_path] = _refs.get(out_path, 0) + 1
+            _stale.discard(out_path)
+            return out_path
+
+        data = json.loads(raw.decode("utf-8-sig"))
+        data.pop("motions", None)
+        data.pop("expressions", None)
+        if overrides:
+            data.update(overrides)
+        if out_dir:
+            _absolutize_v2_paths(data, src_dir)
+
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, out_path)
+        _owned_files.add(out_path)
+        _refs[out_path] = _refs.get(out_path, 0) + 1
+
+        # 源文件变了：上一版缓存文件已经没用；还有加载器在读时等它释放后再删
+        previous = _latest.get(latest_key)
+        _latest[latest_key] = out_path
+        if previous and previous != out_path:
+            if _refs.get(previous):
+                _stale.add(previous)
+            else:
+                _discard_locked(previous)
+    return out_path
+
+
+def release_stripped_json(path):
+    """
+    加载器读完之后调用。引用归零时：放在模型目录里的文件（v3 模型，或临时目录不可用时）
+    以及已被新版本取代的文件立即删除；临时目录里的当前版本保留复用，退出时统一清理。
+    """
+    if not path:
+        return
+    with _lock:
+        if path not in _owned_files:
+            return
+        count = _refs.get(path, 0) - 1
+        if count > 0:
+            _refs[path] = count
+            return
+        _refs.pop(path, None)
+        in_external = bool(_external_dir) and os.path.dirname(path) == _external_dir
+        if path in _stale or not in_external:
+            _discard_locked(path)
+
+
+def _discard_locked(path):
+    """调用方需持有 _lock"""
+    _remove_quietly(path)
+    _owned_files.discard(path)
+    _refs.pop(path, None)
+    _stale.discard(path)
+    for key in [k for k, v in _latest.items() if v == path]:
+        del _latest[key]
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"删除临时文件失败 {path}: {e}")
+
+
+def cleanup_stripped_jsons():
+    """删除本进程生成的所有去动作 JSON"""
+    global _external_dir
+    with _lock:
+        for path in list(_owned_files):
+            _remove_quietly(path)
+        _owned_files.clear()
+        _latest.clear()
+        _refs.clear()
+        _stale.clear()
+        if _external_dir:
+            shutil.rmtree(_external_dir, ignore_errors=True)
+        _external_dir = None
+
+
+atexit.register(cleanup_stripped_jsons)
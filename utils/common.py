@@ -2,6 +2,8 @@
 import os
 import json
 import sys
+import shutil
+import tempfile
 
 import numpy as np
 
@@ -71,4 +73,28 @@ def _to_key(s):
     try:
         return str(int(round(float(s))))  # e.g. "50.0" -> "50"
     except Exception:
-        return s
\ No newline at end of file
+        return s
+
+def atomic_write_text(path: str, text: str, encoding: str = "utf-8"):
+    """先写同目录临时文件并 fsync，再 os.replace 覆盖目标；中途出错不会留下半截文件"""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=os.path.splitext(path)[1], dir=folder)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 建出来的是 0600，保持原文件的权限
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, data, indent=2):
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=indent))